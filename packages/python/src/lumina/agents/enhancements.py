@@ -2,109 +2,347 @@
 Agent enhancements using Python ML capabilities
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Union
+from contextlib import contextmanager
+import time
+import numpy as np
+import pandas as pd
 from ..ai.embeddings import EmbeddingService
 from ..ai.classifier import TextClassifier
-from ..ai.analyzer import DataAnalyzer
+from ..ai.embedding_heads import URGENT_LABEL, EmbeddingHeads
+from ..ai.analyzer import DataAnalyzer, PreparedSeries, to_columns
+from ..ai.lexicon import sentiment_from_scores
+from ..ai.vector_index import normalize_rows, top_k as top_k_indices
+from .knowledge_base import KnowledgeBaseStore
+from .lead_store import LeadVectorStore
+
+
+# Text fields joined (in this order) into the text a lead is embedded from
+LEAD_TEXT_FIELDS = ('description', 'company', 'notes')
+LEAD_FIELDS = ('id',) + LEAD_TEXT_FIELDS + ('company_size',)
+
+_RECOMMENDATIONS = {
+    (False, False): [],
+    (True, False): ['High engagement detected - prioritize follow-up'],
+    (False, True): ['Strong signal - ready for qualification call'],
+    (True, True): [
+        'High engagement detected - prioritize follow-up',
+        'Strong signal - ready for qualification call',
+    ],
+}
+
+
+@contextmanager
+def _timed(timings: Dict[str, float], stage: str) -> Iterator[None]:
+    """Record the wall time of a block in milliseconds"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = (time.perf_counter() - started) * 1000
 
 
 class AgentEnhancements:
     """Enhanced capabilities for AI agents"""
 
-    def __init__(self):
-        self.embedding_service = EmbeddingService()
-        self.classifier = TextClassifier()
-        self.analyzer = DataAnalyzer()
+    def __init__(
+        self,
+        embedding_service: Optional[EmbeddingService] = None,
+        classifier: Optional[TextClassifier] = None,
+        analyzer: Optional[DataAnalyzer] = None,
+        knowledge_base_dir: Optional[str] = None,
+        heads: Optional[EmbeddingHeads] = None,
+        lead_store_dir: Optional[str] = None
+    ):
+        """
+        Initialize agent enhancements
+
+        Args:
+            embedding_service: Shared embedding service (created if omitted)
+            classifier: Shared text classifier (created if omitted)
+            analyzer: Shared data analyzer (created if omitted)
+            knowledge_base_dir: Directory for persisted knowledge-base collections
+            heads: Embedding heads used instead of the lexicons once trained
+            lead_store_dir: Directory for persisted lead embeddings
+        """
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.classifier = classifier or TextClassifier()
+        self.analyzer = analyzer or DataAnalyzer()
+        self.heads = heads or EmbeddingHeads(self.embedding_service)
+        self.knowledge_bases = KnowledgeBaseStore.from_env(
+            self.embedding_service,
+            knowledge_base_dir
+        )
+        self.leads = LeadVectorStore.from_env(lead_store_dir)
 
     def enhance_customer_support(
         self,
         ticket_text: str,
-        knowledge_base: List[str]
+        knowledge_base: Optional[List[str]] = None,
+        knowledge_base_id: Optional[str] = None,
+        top_k: int = 3
     ) -> Dict[str, Any]:
         """
         Enhance customer support with semantic search
 
         Args:
             ticket_text: Customer ticket text
-            knowledge_base: List of knowledge base articles
+            knowledge_base: Inline list of knowledge base articles (small ad-hoc calls)
+            knowledge_base_id: Name of a stored knowledge-base collection
+            top_k: Number of relevant articles to return
 
         Returns:
             Enhanced support analysis
         """
-        # Generate embedding for ticket
-        ticket_embedding = self.embedding_service.embed(ticket_text)
+        # One embedding per ticket serves the article search and the heads
+        ticket_vector = self.embedding_service.embed_matrix([ticket_text])[0]
+
+        if knowledge_base_id is not None:
+            relevant_articles = self.knowledge_bases.query_vector(
+                knowledge_base_id,
+                ticket_vector,
+                top_k
+            )
+        else:
+            knowledge_base = knowledge_base or []
+
+            # Generate embeddings for knowledge base
+            kb_embeddings = self.embedding_service.embed_matrix(knowledge_base)
+
+            # Find most relevant articles
+            similar = self.embedding_service.find_similar(
+                ticket_vector,
+                kb_embeddings,
+                top_k=top_k
+            ) if knowledge_base else []
+
+            relevant_articles = [
+                {
+                    'index': idx,
+                    'similarity': score,
+                    'content': knowledge_base[idx]
+                }
+                for idx, score in similar
+            ]
+
+        return {
+            'relevant_articles': relevant_articles,
+            **self._text_signals(ticket_text, ticket_vector),
+        }
+
+    def support_cost_report(
+        self,
+        tickets: List[str],
+        knowledge_base: Optional[List[str]] = None,
+        knowledge_base_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Benchmark the per-ticket cost of support triage signals
 
-        # Generate embeddings for knowledge base
-        kb_embeddings = self.embedding_service.embed_batch(knowledge_base)
+        'before' is one embedding plus the lexicon text pass; 'after' is one
+        embedding plus the trained embedding heads reading that embedding.
 
-        # Find most relevant articles
-        similar = self.embedding_service.find_similar(
-            ticket_embedding,
-            kb_embeddings,
-            top_k=3
-        )
+        Args:
+            tickets: Sample tickets
+            knowledge_base: Inline articles for the end-to-end measurement
+            knowledge_base_id: Stored collection for the end-to-end measurement
 
-        # Analyze sentiment
-        sentiment = self.classifier.classify_sentiment(ticket_text)
+        Returns:
+            Mean milliseconds per ticket for each stage and for both paths
+        """
+        if not tickets:
+            raise ValueError("At least one ticket is required")
+
+        def per_ticket(fn: Any) -> float:
+            started = time.perf_counter()
+            for ticket in tickets:
+                fn(ticket)
+            return (time.perf_counter() - started) * 1000 / len(tickets)
+
+        def lexicon_signals(ticket: str) -> float:
+            scores = self.classifier.lexicon.score(ticket)
+            return self._calculate_urgency(sentiment_from_scores(scores), scores)
+
+        model = self.embedding_service.model
+        vectors = dict(zip(tickets, self.embedding_service.embed_matrix(tickets)))
+        stages = {
+            'embed_uncached': per_ticket(lambda t: model.encode([t], convert_to_numpy=True)),
+            'embed_cached': per_ticket(lambda t: self.embedding_service.embed_matrix([t])),
+            'lexicon': per_ticket(lexicon_signals),
+        }
+        heads = [name for name in ('sentiment', 'urgency', 'intent') if self.heads.is_trained(name)]
+        if heads:
+            stages['heads'] = per_ticket(lambda t: self._text_signals(t, vectors[t]))
+        if knowledge_base is not None or knowledge_base_id is not None:
+            stages['end_to_end'] = per_ticket(
+                lambda t: self.enhance_customer_support(t, knowledge_base, knowledge_base_id)
+            )
 
         return {
-            'sentiment': sentiment,
-            'relevant_articles': [
+            'tickets': len(tickets),
+            'heads': heads,
+            'stages_ms': stages,
+            'before_ms': stages['embed_uncached'] + stages['lexicon'],
+            'after_ms': stages['embed_uncached'] + stages['heads'] if heads else None,
+        }
+
+    def triage_tickets(
+        self,
+        tickets: List[Dict[str, str]],
+        knowledge_base: Optional[List[str]] = None,
+        knowledge_base_id: Optional[str] = None,
+        top_k: int = 3,
+        batch_size: int = 256
+    ) -> Dict[str, Any]:
+        """
+        Triage a queue of tickets with batched embeddings and article search
+
+        Each ticket gets the same articles, sentiment and urgency as
+        enhance_customer_support, but the queue is embedded in batches, every
+        batch is matched against the knowledge base in one matrix product, and
+        the signals are computed for all tickets together.
+
+        Args:
+            tickets: Tickets as {'id', 'text'} dictionaries
+            knowledge_base: Inline list of knowledge base articles
+            knowledge_base_id: Name of a stored knowledge-base collection
+            top_k: Number of relevant articles per ticket
+            batch_size: Tickets embedded per model call
+
+        Returns:
+            'tickets' ranked by urgency_score (most urgent first, ties in input
+            order), plus 'count', 'tickets_per_second' and per-stage 'timings_ms'
+        """
+        started = time.perf_counter()
+        stage_ms: Dict[str, float] = {}
+        texts = [ticket['text'] for ticket in tickets]
+        count = len(texts)
+        if not count:
+            return {'tickets': [], 'count': 0, 'tickets_per_second': 0.0, 'timings_ms': stage_ms}
+
+        with _timed(stage_ms, 'embed'):
+            vectors = np.concatenate([
+                self.embedding_service.embed_matrix(texts[start:start + batch_size])
+                for start in range(0, count, batch_size)
+            ])
+
+        with _timed(stage_ms, 'search'):
+            if knowledge_base_id is not None:
+                articles = self.knowledge_bases.query_vectors(knowledge_base_id, vectors, top_k)
+            elif knowledge_base:
+                kb_vectors = normalize_rows(self.embedding_service.embed_matrix(knowledge_base))
+                articles = []
+                for start in range(0, count, batch_size):
+                    similarities = normalize_rows(vectors[start:start + batch_size]) @ kb_vectors.T
+                    best = top_k_indices(similarities, top_k)
+                    best_scores = np.take_along_axis(similarities, best, axis=1)
+                    articles.extend(
+                        [
+                            {'index': idx, 'similarity': score, 'content': knowledge_base[idx]}
+                            for idx, score in zip(rows, row_scores)
+                        ]
+                        for rows, row_scores in zip(best.tolist(), best_scores.tolist())
+                    )
+            else:
+                articles = [[] for _ in range(count)]
+
+        with _timed(stage_ms, 'signals'):
+            signals = self._text_signals_batch(texts, vectors)
+
+        with _timed(stage_ms, 'rank'):
+            # Stable sort, so equally urgent tickets keep their queue order
+            order = sorted(range(count), key=lambda row: -signals[row]['urgency_score'])
+            ranked = [
                 {
-                    'index': idx,
-                    'similarity': score,
-                    'content': knowledge_base[idx]
+                    'id': tickets[row]['id'],
+                    'relevant_articles': articles[row],
+                    **signals[row],
                 }
-                for idx, score in similar
-            ],
-            'urgency_score': self._calculate_urgency(sentiment, ticket_text)
+                for row in order
+            ]
+
+        seconds = time.perf_counter() - started
+        return {
+            'tickets': ranked,
+            'count': count,
+            'tickets_per_second': count / seconds if seconds else 0.0,
+            'timings_ms': stage_ms,
         }
 
     def enhance_financial_analysis(
         self,
-        transactions: List[Dict[str, Any]]
+        transactions: Union[List[Dict[str, Any]], Dict[str, Sequence[Any]], pd.DataFrame],
+        timings: bool = False
     ) -> Dict[str, Any]:
         """
         Enhance financial analysis with ML
 
+        Transactions are parsed and sorted by date once; anomaly detection,
+        the time-series analysis, the forecast and the risk score all reuse
+        that series and its cached statistics.
+
         Args:
-            transactions: List of transaction data
+            transactions: Transaction rows, a dictionary of 'date'/'amount'
+                columns, or a DataFrame
+            timings: Include a per-stage 'timings_ms' breakdown
 
         Returns:
             Enhanced financial analysis
         """
-        # Extract values
-        values = [t.get('amount', 0) for t in transactions]
+        stage_ms: Dict[str, float] = {}
 
-        # Detect anomalies
-        anomalies = self.analyzer.detect_anomalies(values, method='iqr')
+        with _timed(stage_ms, 'parse'):
+            frame = transactions
+            if not isinstance(frame, pd.DataFrame):
+                frame = pd.DataFrame(transactions)
+            # Transactions without an amount count as 0
+            if 'amount' in frame:
+                values = frame['amount'].fillna(0).to_numpy(dtype=np.float64)
+            else:
+                values = np.zeros(len(frame))
+            series = PreparedSeries(to_columns(frame, ['date'])['date'], values)
 
-        # Analyze time series
-        analysis = self.analyzer.analyze_time_series(
-            transactions,
-            date_field='date',
-            value_field='amount'
-        )
+        with _timed(stage_ms, 'statistics'):
+            series.stats.compute()
 
-        # Forecast
-        forecast = self.analyzer.forecast(values, periods=30)
+        # Anomaly indices refer to positions in the submitted transactions
+        with _timed(stage_ms, 'anomalies'):
+            anomalies = self.analyzer.detect_anomalies_prepared(series, method='iqr')
 
-        return {
+        with _timed(stage_ms, 'analysis'):
+            analysis = self.analyzer.analyze_prepared(series)
+
+        # Forecast from the chronologically ordered amounts
+        with _timed(stage_ms, 'forecast'):
+            forecast = self.analyzer.forecast(series.values, periods=30)
+
+        with _timed(stage_ms, 'risk'):
+            risk_score = self._calculate_risk_score(anomalies, analysis)
+
+        result = {
             'analysis': analysis,
             'anomalies': anomalies,
             'forecast': forecast,
-            'risk_score': self._calculate_risk_score(anomalies, analysis)
+            'risk_score': risk_score
         }
+        if timings:
+            result['timings_ms'] = stage_ms
+        return result
 
     def enhance_lead_scoring(
         self,
-        lead_data: Dict[str, Any]
+        lead_data: Dict[str, Any],
+        similar_top_k: int = 0
     ) -> Dict[str, Any]:
         """
         Enhance lead scoring with ML
 
+        A lead with an 'id' has its embedding stored for similar-lead lookup
+        and duplicate detection.
+
         Args:
             lead_data: Lead information
+            similar_top_k: Number of most similar stored leads to include
 
         Returns:
             Enhanced lead scoring
@@ -117,29 +355,253 @@ class AgentEnhancements:
         ]
         combined_text = ' '.join(text_fields)
 
-        # Analyze sentiment
-        sentiment = self.classifier.classify_sentiment(combined_text)
+        # One embedding serves similarity matching and the sentiment head
+        vector = self.embedding_service.embed_matrix([combined_text])[0]
+        sentiment = self._sentiment(combined_text, vector)
 
-        # Generate embedding for similarity matching
-        embedding = self.embedding_service.embed(combined_text)
+        lead_id = lead_data.get('id')
+        lead_id = str(lead_id) if lead_id is not None else None
+        similar = None
+        if similar_top_k > 0:
+            similar = self.leads.similar(vector, similar_top_k, exclude=lead_id)
+        if lead_id is not None:
+            self.leads.upsert([lead_id], vector[None, :])
 
-        return {
+        result = {
             'sentiment': sentiment,
-            'embedding': embedding,
+            'embedding': vector.tolist(),
             'ml_score': self._calculate_ml_score(lead_data, sentiment),
             'recommendations': self._generate_recommendations(lead_data, sentiment)
         }
+        if similar is not None:
+            result['similar_leads'] = similar
+        return result
+
+    def score_leads_batch(
+        self,
+        leads: Union[List[Dict[str, Any]], Dict[str, Sequence[Any]], pd.DataFrame],
+        store: bool = True,
+        batch_size: int = 512
+    ) -> Dict[str, Any]:
+        """
+        Score many leads with batched embeddings and column-wise scoring
 
-    def _calculate_urgency(self, sentiment: Dict[str, Any], text: str) -> float:
-        """Calculate urgency score"""
-        urgency_keywords = ['urgent', 'asap', 'immediately', 'critical', 'emergency']
-        text_lower = text.lower()
-        keyword_count = sum(1 for keyword in urgency_keywords if keyword in text_lower)
+        Produces the same sentiment, ml_score and recommendations as
+        enhance_lead_scoring, computed as array operations over all leads.
+
+        Args:
+            leads: Lead rows, a dictionary of columns, or a DataFrame (fields as
+                in enhance_lead_scoring)
+            store: Store the embeddings of leads that have an 'id'
+            batch_size: Leads embedded per model call
+
+        Returns:
+            Parallel 'lead_id', 'sentiment', 'confidence', 'ml_score' and
+            'recommendations' lists, plus 'count', 'leads_per_second' and
+            per-stage 'timings_ms'
+        """
+        started = time.perf_counter()
+        stage_ms: Dict[str, float] = {}
+
+        with _timed(stage_ms, 'parse'):
+            frame = leads if isinstance(leads, pd.DataFrame) else pd.DataFrame(leads)
+            count = len(frame)
+            if count and not any(field in frame for field in LEAD_TEXT_FIELDS):
+                raise ValueError(f"Leads need at least one of: {', '.join(LEAD_TEXT_FIELDS)}")
+
+            def text_column(name: str) -> pd.Series:
+                if name not in frame:
+                    return pd.Series('', index=frame.index, dtype=object)
+                return frame[name].fillna('').astype(str)
+
+            texts = text_column(LEAD_TEXT_FIELDS[0]).str.cat(
+                [text_column(name) for name in LEAD_TEXT_FIELDS[1:]],
+                sep=' '
+            ).tolist()
+            lead_ids = (
+                frame['id'].astype(object).where(frame['id'].notna(), None).tolist()
+                if 'id' in frame else [None] * count
+            )
+            lead_ids = [str(lead_id) if lead_id is not None else None for lead_id in lead_ids]
+
+        if not count:
+            return {
+                'lead_id': [], 'sentiment': [], 'confidence': [], 'ml_score': [],
+                'recommendations': [], 'count': 0, 'leads_per_second': 0.0,
+                'timings_ms': stage_ms,
+            }
+
+        with _timed(stage_ms, 'embed'):
+            vectors = np.concatenate([
+                self.embedding_service.embed_matrix(texts[start:start + batch_size])
+                for start in range(0, count, batch_size)
+            ])
+
+        with _timed(stage_ms, 'sentiment'):
+            if self.heads.is_trained('sentiment'):
+                classes, probabilities = self.heads.predict_matrix('sentiment', vectors)
+                best = probabilities.argmax(axis=1)
+                labels = np.asarray(classes, dtype=object)[best]
+                confidence = probabilities[np.arange(count), best]
+            else:
+                scores = self.classifier.lexicon.score_batch(texts)
+                positive = np.fromiter((s.get('positive', 0.0) for s in scores), float, count)
+                negative = np.fromiter((s.get('negative', 0.0) for s in scores), float, count)
+                difference = positive - negative
+                labels = np.where(
+                    difference > 0,
+                    'positive',
+                    np.where(difference < 0, 'negative', 'neutral')
+                ).astype(object)
+                confidence = np.where(
+                    difference == 0,
+                    0.5,
+                    np.minimum(0.9, 0.5 + np.abs(difference) * 0.1)
+                )
+
+        with _timed(stage_ms, 'score'):
+            company_size = text_column('company_size').str.lower()
+            large = (
+                company_size.str.contains('enterprise', regex=False)
+                | company_size.str.contains('large', regex=False)
+            ).to_numpy()
+            is_positive = labels == 'positive'
+            ml_score = np.clip(
+                0.5 + 0.2 * is_positive - 0.1 * (labels == 'negative') + 0.2 * large,
+                0.0,
+                1.0
+            )
+            recommendations = [
+                list(_RECOMMENDATIONS[flags])
+                for flags in zip(is_positive.tolist(), (confidence > 0.7).tolist())
+            ]
+
+        if store:
+            with _timed(stage_ms, 'store'):
+                keyed = [row for row, lead_id in enumerate(lead_ids) if lead_id is not None]
+                if keyed:
+                    self.leads.upsert([lead_ids[row] for row in keyed], vectors[keyed])
+
+        seconds = time.perf_counter() - started
+        return {
+            'lead_id': lead_ids,
+            'sentiment': labels.tolist(),
+            'confidence': confidence.tolist(),
+            'ml_score': ml_score.tolist(),
+            'recommendations': recommendations,
+            'count': count,
+            'leads_per_second': count / seconds if seconds else 0.0,
+            'timings_ms': stage_ms,
+        }
+
+    def similar_leads(
+        self,
+        lead_id: Optional[str] = None,
+        text: Optional[str] = None,
+        top_k: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the stored leads most similar to a stored lead or to free text
+
+        Args:
+            lead_id: Id of a stored lead (raises KeyError if unknown)
+            text: Text embedded as the query when no lead_id is given
+            top_k: Number of leads to return
+
+        Returns:
+            List of {'lead_id', 'similarity'} dictionaries, best first
+        """
+        if lead_id is not None:
+            return self.leads.similar(self.leads.vector(lead_id), top_k, exclude=str(lead_id))
+        if text is None:
+            raise ValueError("Provide lead_id or text")
+        return self.leads.similar(self.embedding_service.embed_matrix([text])[0], top_k)
+
+    def _sentiment(
+        self,
+        text: str,
+        vector: np.ndarray,
+        scores: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        """Sentiment from the embedding head when trained, else from the lexicons"""
+        if self.heads.is_trained('sentiment'):
+            return self.heads.sentiment(vector)
+        if scores is None:
+            scores = self.classifier.lexicon.score(text)
+        return sentiment_from_scores(scores)
+
+    def _text_signals(self, text: str, vector: np.ndarray) -> Dict[str, Any]:
+        """
+        Sentiment, urgency and (when trained) intent of a ticket
+
+        Trained embedding heads reuse the ticket's embedding; the lexicons are
+        scanned at most once, and only for signals without a head.
+        """
+        heads = self.heads
+        scores = None
+        if not (heads.is_trained('sentiment') and heads.is_trained('urgency')):
+            scores = self.classifier.lexicon.score(text)
+
+        sentiment = self._sentiment(text, vector, scores)
+        if heads.is_trained('urgency'):
+            urgency = heads.urgency(vector)
+        else:
+            urgency = self._calculate_urgency(sentiment, scores)
+
+        signals = {'sentiment': sentiment, 'urgency_score': urgency}
+        if heads.is_trained('intent'):
+            signals['intent'] = heads.classify_vector('intent', vector)
+        return signals
+
+    def _text_signals_batch(self, texts: List[str], vectors: np.ndarray) -> List[Dict[str, Any]]:
+        """Per-ticket _text_signals for many tickets, with one head call per signal"""
+        heads = self.heads
+        count = len(texts)
+        scores = None
+        if not (heads.is_trained('sentiment') and heads.is_trained('urgency')):
+            scores = self.classifier.lexicon.score_batch(texts)
+
+        if heads.is_trained('sentiment'):
+            sentiments = [
+                {
+                    'sentiment': result['label'],
+                    'confidence': result['confidence'],
+                    'probabilities': result['probabilities'],
+                }
+                for result in heads.classify_matrix('sentiment', vectors)
+            ]
+        else:
+            sentiments = [sentiment_from_scores(row) for row in scores]
+
+        if heads.is_trained('urgency'):
+            classes, probabilities = heads.predict_matrix('urgency', vectors)
+            urgency = (
+                probabilities[:, classes.index(URGENT_LABEL)]
+                if URGENT_LABEL in classes else np.zeros(count)
+            )
+        else:
+            negative = np.fromiter(
+                (sentiment['sentiment'] == 'negative' for sentiment in sentiments), bool, count
+            )
+            keywords = np.fromiter((row.get('urgency', 0.0) for row in scores), float, count)
+            # Same arithmetic as _calculate_urgency, one column at a time
+            urgency = np.minimum(1.0, 0.5 + 0.3 * negative + np.minimum(0.2, keywords * 0.1))
+
+        signals = [
+            {'sentiment': sentiment, 'urgency_score': score}
+            for sentiment, score in zip(sentiments, urgency.tolist())
+        ]
+        if heads.is_trained('intent'):
+            for row, intent in zip(signals, heads.classify_matrix('intent', vectors)):
+                row['intent'] = intent
+        return signals
 
+    def _calculate_urgency(self, sentiment: Dict[str, Any], scores: Dict[str, float]) -> float:
+        """Calculate urgency score from the sentiment and the lexicon's urgency weight"""
         base_score = 0.5
         if sentiment['sentiment'] == 'negative':
             base_score += 0.3
-        base_score += min(0.2, keyword_count * 0.1)
+        base_score += min(0.2, scores.get('urgency', 0.0) * 0.1)
 
         return min(1.0, base_score)
 
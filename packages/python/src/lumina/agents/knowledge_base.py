@@ -0,0 +1,600 @@
+"""
+Persistent knowledge-base collections for semantic article search
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+import hashlib
+import json
+import os
+import re
+import threading
+import numpy as np
+
+from ..ai.embeddings import EmbeddingService
+from ..ai.vector_index import VectorIndex, create_index, load_index, quantization_report
+
+_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def content_hash(content: str) -> str:
+    """Hash article content to detect changes between upserts"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class KnowledgeBaseCollection:
+    """
+    A named set of articles backed by a vector index of their embeddings
+
+    Persisted as a snapshot (a versioned index file named by a JSON manifest)
+    plus an append-only log of the upserts and deletes made since.
+    """
+
+    _LOG = '.log.jsonl'
+    _VECTORS = '.log.f32'
+
+    def __init__(
+        self,
+        name: str,
+        dimension: int,
+        index_kind: str = 'exact',
+        index_options: Optional[Dict[str, Any]] = None,
+        directory: Optional[str] = None,
+        compact_after: int = 1000
+    ):
+        """
+        Initialize an empty collection
+
+        Args:
+            name: Collection name
+            dimension: Embedding dimension
+            index_kind: Vector index type used for search
+            index_options: Options for the index, e.g. {'storage': 'int8'}
+            directory: Directory the collection persists to, or None for memory only
+            compact_after: Logged articles (at least) before the log is folded
+                into a new snapshot
+        """
+        self.name = name
+        self.dimension = dimension
+        self.directory = directory
+        self.compact_after = compact_after
+        # Version of the snapshot index file the manifest names (0: none yet)
+        self.snapshot = 0
+        self._logged_rows = 0
+        self.index_kind = index_kind
+        self.index_options = index_options or {}
+        self.index: VectorIndex = create_index(index_kind, dimension, **self.index_options)
+        self.contents: Dict[str, str] = {}
+        self.hashes: Dict[str, str] = {}
+        # Readers and the brief index/contents swaps take `lock`; writers also
+        # hold `write_lock` for the whole update (embedding and saving included)
+        # so they run one at a time without stalling searches
+        self.lock = threading.RLock()
+        self.write_lock = threading.RLock()
+        self.dropped = False
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+    def upsert(
+        self,
+        articles: List[Dict[str, str]],
+        embedding_service: EmbeddingService
+    ) -> Dict[str, int]:
+        """
+        Insert or update articles, embedding only new or changed content
+
+        Args:
+            articles: List of {'id', 'content'} dictionaries
+            embedding_service: Service used to embed changed articles
+
+        Returns:
+            Counts of inserted, updated and unchanged articles
+        """
+        # Last write wins for ids repeated within one request
+        latest = {str(article['id']): article['content'] for article in articles}
+
+        with self.write_lock:
+            # Only writers change hashes, so reading them needs no reader lock
+            changed = {
+                article_id: content
+                for article_id, content in latest.items()
+                if self.hashes.get(article_id) != content_hash(content)
+            }
+            inserted = sum(1 for article_id in changed if article_id not in self.hashes)
+            counts = {
+                'inserted': inserted,
+                'updated': len(changed) - inserted,
+                'unchanged': len(latest) - len(changed),
+            }
+            if not changed:
+                return counts
+
+            # Searches keep running while the model encodes
+            vectors = embedding_service.embed_matrix(list(changed.values()))
+            with self.lock:
+                self.index.add(list(changed.keys()), vectors)
+                for article_id, content in changed.items():
+                    self.contents[article_id] = content
+                    self.hashes[article_id] = content_hash(content)
+            self._append(list(changed), vectors)
+
+            # A quantizer fitted on far fewer articles than the collection now
+            # holds is refitted from re-embedded articles
+            if self.index.needs_refit:
+                self.rebuild(embedding_service)
+
+        return counts
+
+    def rebuild(self, embedding_service: EmbeddingService) -> None:
+        """
+        Re-embed every article into a freshly built index, swap it in and
+        write a new snapshot
+
+        The new index is built while searches keep using the old one.
+
+        Args:
+            embedding_service: Service used to embed the articles
+        """
+        with self.write_lock:
+            article_ids = list(self.contents)
+            index = create_index(self.index_kind, self.dimension, **self.index_options)
+            if article_ids:
+                vectors = embedding_service.embed_matrix(
+                    [self.contents[article_id] for article_id in article_ids]
+                )
+                index.build(article_ids, vectors)
+            with self.lock:
+                self.index = index
+            self.save()
+
+    def delete(self, article_ids: List[str]) -> int:
+        """
+        Remove articles by id
+
+        Args:
+            article_ids: Ids of the articles to remove
+
+        Returns:
+            Number of articles removed
+        """
+        with self.write_lock:
+            with self.lock:
+                article_ids = [a for a in map(str, article_ids) if a in self.contents]
+                self.index.remove(article_ids)
+                for article_id in article_ids:
+                    del self.contents[article_id]
+                    del self.hashes[article_id]
+            if article_ids:
+                self._append(article_ids, None)
+            return len(article_ids)
+
+    def search(self, query_vector: np.ndarray, top_k: int = 3) -> List[Tuple[str, float]]:
+        """
+        Find the articles most similar to a query embedding
+
+        Args:
+            query_vector: Query embedding
+            top_k: Number of results to return
+
+        Returns:
+            List of (article_id, similarity_score) tuples, best first
+        """
+        with self.lock:
+            return self.index.search(query_vector, top_k)
+
+    def search_batch(
+        self,
+        query_vectors: np.ndarray,
+        top_k: int = 3
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Find the most similar articles for many query embeddings at once
+
+        Args:
+            query_vectors: Query embeddings, shape (queries, dimension)
+            top_k: Number of results per query
+
+        Returns:
+            One list of (article_id, similarity_score) tuples per query, best first
+        """
+        with self.lock:
+            return self.index.search_batch(query_vectors, top_k)
+
+    def save(self) -> None:
+        """
+        Write a snapshot of the collection and empty its log
+
+        The index goes to a new versioned file and the manifest naming it
+        replaces the old one in a single os.replace, so a crash leaves either
+        the old or the new snapshot intact. Holds only the writer lock: no
+        update can change the collection meanwhile, and searches are not
+        blocked by the disk write.
+        """
+        if not self.directory or self.dropped:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, self.name)
+
+        with self.write_lock:
+            version = self.snapshot + 1
+            self.index.save(f'{base}.{version}.npz')
+            with open(base + '.json.tmp', 'w', encoding='utf-8') as f:
+                json.dump({
+                    'name': self.name,
+                    'dimension': self.dimension,
+                    'index_kind': self.index_kind,
+                    'index_options': self.index_options,
+                    'snapshot': version,
+                    'contents': self.contents,
+                    'hashes': self.hashes,
+                }, f)
+            os.replace(base + '.json.tmp', base + '.json')
+
+            for path in (self._snapshot_path(self.snapshot), base + '.npz'):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.snapshot = version
+
+            # Replaying a log over the snapshot it was folded into is harmless,
+            # so a crash before these truncations loses nothing
+            for ext in (self._VECTORS, self._LOG):
+                open(base + ext, 'wb').close()
+            self._logged_rows = 0
+
+    def remove_files(self) -> None:
+        """Delete the snapshot, manifest and log of the collection"""
+        base = os.path.join(self.directory, self.name)
+        for path in (
+            base + '.json',
+            self._snapshot_path(self.snapshot),
+            base + '.npz',
+            base + self._LOG,
+            base + self._VECTORS,
+        ):
+            if os.path.exists(path):
+                os.remove(path)
+
+    @classmethod
+    def load(cls, directory: str, name: str) -> 'KnowledgeBaseCollection':
+        """Load a collection's latest snapshot and replay the log written after it"""
+        base = os.path.join(directory, name)
+        with open(base + '.json', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        collection = cls(manifest['name'], manifest['dimension'], directory=directory)
+        collection.contents = manifest['contents']
+        collection.hashes = manifest['hashes']
+        # Manifests written before versioned snapshots name no version
+        collection.snapshot = manifest.get('snapshot', 0)
+        collection.index = load_index(collection._snapshot_path(collection.snapshot))
+        collection.index_kind = manifest.get('index_kind', collection.index.kind)
+        collection.index_options = manifest.get('index_options', {})
+        collection._replay()
+        return collection
+
+    def _snapshot_path(self, version: int) -> str:
+        """Index file of a snapshot version (unversioned for version 0)"""
+        base = os.path.join(self.directory, self.name)
+        return f'{base}.{version}.npz' if version else base + '.npz'
+
+    def _append(self, article_ids: List[str], vectors: Optional[np.ndarray]) -> None:
+        """Log upserted (vectors given) or deleted articles (write lock held)"""
+        if not self.directory or self.dropped:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, self.name)
+
+        if vectors is not None:
+            row_bytes = 4 * self.dimension
+            with open(base + self._VECTORS, 'ab') as f:
+                # Drop a partially written final row left by a crash
+                end = f.seek(0, os.SEEK_END)
+                if end % row_bytes:
+                    f.truncate(end - end % row_bytes)
+                row = (end - end % row_bytes) // row_bytes
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            lines = [
+                {'id': article_id, 'content': self.contents[article_id], 'row': row + offset}
+                for offset, article_id in enumerate(article_ids)
+            ]
+        else:
+            lines = [{'id': article_id, 'deleted': True} for article_id in article_ids]
+
+        with open(base + self._LOG, 'a+b') as f:
+            # Start on a fresh line after a torn final line left by a crash
+            end = f.seek(0, os.SEEK_END)
+            prefix = b''
+            if end:
+                f.seek(end - 1)
+                prefix = b'' if f.read(1) == b'\n' else b'\n'
+            f.write(prefix + ''.join(json.dumps(line) + '\n' for line in lines).encode('utf-8'))
+
+        self._logged_rows += len(lines)
+        if self._logged_rows >= max(self.compact_after, len(self)):
+            self.save()
+
+    def _replay(self) -> None:
+        """Apply the log written after the loaded snapshot"""
+        base = os.path.join(self.directory, self.name)
+        if not os.path.exists(base + self._LOG):
+            return
+
+        # Last entry per article wins; a torn final line from a crash is ignored
+        latest: Dict[str, Optional[Dict[str, Any]]] = {}
+        with open(base + self._LOG, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                latest[entry['id']] = None if entry.get('deleted') else entry
+                self._logged_rows += 1
+
+        deleted = [a for a, entry in latest.items() if entry is None and a in self.contents]
+        self.index.remove(deleted)
+        for article_id in deleted:
+            del self.contents[article_id]
+            del self.hashes[article_id]
+
+        upserted = {a: entry for a, entry in latest.items() if entry is not None}
+        if not upserted:
+            return
+        raw = np.fromfile(base + self._VECTORS, dtype=np.float32)
+        rows = raw[:len(raw) - len(raw) % self.dimension].reshape(-1, self.dimension)
+        valid = {a: entry for a, entry in upserted.items() if entry['row'] < len(rows)}
+        if not valid:
+            return
+        self.index.add(list(valid), rows[[entry['row'] for entry in valid.values()]])
+        for article_id, entry in valid.items():
+            self.contents[article_id] = entry['content']
+            self.hashes[article_id] = content_hash(entry['content'])
+
+
+class KnowledgeBaseStore:
+    """Registry of named knowledge-base collections"""
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        directory: Optional[str] = None,
+        index_kind: str = 'exact',
+        index_options: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Initialize the store, loading any collections saved in directory
+
+        Args:
+            embedding_service: Service used to embed articles and queries
+            directory: Directory for persisted collections, or None for memory only
+            index_kind: Vector index type for new collections ('exact', 'ivf' or
+                'quantized')
+            index_options: Index options for new collections
+        """
+        self.embedding_service = embedding_service
+        self.directory = directory
+        self.index_kind = index_kind
+        self.index_options = index_options or {}
+        self._collections: Dict[str, KnowledgeBaseCollection] = {}
+        # Guards the collection registry only; each collection has its own locks
+        self._lock = threading.RLock()
+
+        if directory and os.path.isdir(directory):
+            for filename in sorted(os.listdir(directory)):
+                name, ext = os.path.splitext(filename)
+                if ext == '.json' and _NAME_PATTERN.match(name):
+                    self._collections[name] = KnowledgeBaseCollection.load(directory, name)
+
+    @classmethod
+    def from_env(
+        cls,
+        embedding_service: EmbeddingService,
+        directory: Optional[str] = None
+    ) -> 'KnowledgeBaseStore':
+        """
+        Create a store whose new collections use the index configured by
+        KNOWLEDGE_BASE_INDEX and, for 'quantized', KNOWLEDGE_BASE_STORAGE and
+        KNOWLEDGE_BASE_RESCORE
+        """
+        index_kind = os.getenv('KNOWLEDGE_BASE_INDEX', 'exact')
+        index_options: Dict[str, Any] = {}
+        if index_kind == 'quantized':
+            index_options = {
+                'storage': os.getenv('KNOWLEDGE_BASE_STORAGE', 'int8'),
+                # Rescoring keeps float32 vectors beside the codes, so it is opt-in
+                'rescore': int(os.getenv('KNOWLEDGE_BASE_RESCORE', '0')),
+            }
+        return cls(embedding_service, directory, index_kind, index_options)
+
+    def list_collections(self) -> List[Dict[str, Any]]:
+        """Summarize every collection"""
+        with self._lock:
+            return [
+                {'name': name, 'articles': len(collection)}
+                for name, collection in sorted(self._collections.items())
+            ]
+
+    def create(self, name: str) -> KnowledgeBaseCollection:
+        """
+        Create an empty collection
+
+        Args:
+            name: Collection name (letters, digits, '_' and '-')
+
+        Returns:
+            The new collection
+        """
+        if not _NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid knowledge base name: {name!r}")
+
+        with self._lock:
+            if name in self._collections:
+                raise ValueError(f"Knowledge base already exists: {name}")
+            collection = KnowledgeBaseCollection(
+                name,
+                self.embedding_service.dimension,
+                self.index_kind,
+                self.index_options,
+                self.directory
+            )
+            self._collections[name] = collection
+            collection.save()
+            return collection
+
+    def get(self, name: str) -> KnowledgeBaseCollection:
+        """Return a collection, raising KeyError if it does not exist"""
+        with self._lock:
+            if name not in self._collections:
+                raise KeyError(f"Knowledge base not found: {name}")
+            return self._collections[name]
+
+    def drop(self, name: str) -> None:
+        """Delete a collection and its persisted files"""
+        with self._lock:
+            collection = self.get(name)
+            del self._collections[name]
+        with collection.write_lock:
+            # An update still in flight must not write the files back
+            collection.dropped = True
+            if self.directory:
+                collection.remove_files()
+
+    def upsert(self, name: str, articles: List[Dict[str, str]]) -> Dict[str, int]:
+        """Insert or update articles in a collection (logged when persistent)"""
+        return self.get(name).upsert(articles, self.embedding_service)
+
+    def delete_articles(self, name: str, article_ids: List[str]) -> int:
+        """Remove articles from a collection (logged when persistent)"""
+        return self.get(name).delete(article_ids)
+
+    def rebuild(self, name: str) -> Dict[str, Any]:
+        """
+        Re-embed a collection's articles into a freshly built index
+
+        Refits a quantized index on the whole collection; searches keep using
+        the old index until the new one is ready.
+
+        Args:
+            name: Collection name
+
+        Returns:
+            Collection name, article count and index type
+        """
+        collection = self.get(name)
+        with collection.write_lock:
+            collection.rebuild(self.embedding_service)
+            return {
+                'name': name,
+                'articles': len(collection),
+                'index': collection.index_kind,
+            }
+
+    def query(self, name: str, text: str, top_k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Find the articles most relevant to a piece of text
+
+        Args:
+            name: Collection name
+            text: Query text, e.g. a support ticket
+            top_k: Number of articles to return
+
+        Returns:
+            List of {'id', 'similarity', 'content'} dictionaries, best first
+        """
+        query_vector = self.embedding_service.embed_matrix([text])[0]
+        return self.query_vector(name, query_vector, top_k)
+
+    def query_vector(
+        self,
+        name: str,
+        query_vector: np.ndarray,
+        top_k: int = 3
+    ) -> List[Dict[str, Any]]:
+        """Find the articles most similar to an already computed embedding"""
+        collection = self.get(name)
+        with collection.lock:
+            return [
+                {
+                    'id': article_id,
+                    'similarity': score,
+                    'content': collection.contents[article_id]
+                }
+                for article_id, score in collection.search(query_vector, top_k)
+            ]
+
+    def query_vectors(
+        self,
+        name: str,
+        query_vectors: np.ndarray,
+        top_k: int = 3
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Find the articles most similar to each of many embeddings
+
+        The queries are scored against the collection in batched matrix
+        products rather than one search per query.
+
+        Args:
+            name: Collection name
+            query_vectors: Query embeddings, shape (queries, dimension)
+            top_k: Number of articles per query
+
+        Returns:
+            One list of {'id', 'similarity', 'content'} dictionaries per query
+        """
+        collection = self.get(name)
+        with collection.lock:
+            return [
+                [
+                    {
+                        'id': article_id,
+                        'similarity': score,
+                        'content': collection.contents[article_id]
+                    }
+                    for article_id, score in results
+                ]
+                for results in collection.search_batch(query_vectors, top_k)
+            ]
+
+    def quantization_report(
+        self,
+        name: str,
+        queries: Optional[List[str]] = None,
+        k: int = 10,
+        sample_size: int = 200
+    ) -> Dict[str, Any]:
+        """
+        Measure memory saved versus recall@k lost per storage mode on a collection
+
+        Uses the full-precision vectors the index stores; the articles are
+        re-embedded only when the collection keeps nothing but codes.
+
+        Args:
+            name: Collection name
+            queries: Query texts, e.g. real tickets; defaults to a sample of the
+                collection's own articles (which slightly flatters recall, since
+                each query finds itself)
+            k: Number of neighbours compared per query
+            sample_size: Articles sampled as queries when none are given
+
+        Returns:
+            Report from vector_index.quantization_report
+        """
+        collection = self.get(name)
+        with collection.lock:
+            if not collection.contents:
+                raise ValueError(f"Knowledge base is empty: {name}")
+            stored = collection.index.stored_vectors()
+            contents = list(collection.contents.values()) if stored is None else []
+
+        # Only an index keeping nothing but codes needs the articles re-embedded
+        if stored is not None:
+            vectors = stored[1]
+        else:
+            vectors = self.embedding_service.embed_matrix(contents)
+        if queries:
+            query_vectors = self.embedding_service.embed_matrix(queries)
+        else:
+            rng = np.random.default_rng(0)
+            sample = rng.choice(len(vectors), min(sample_size, len(vectors)), replace=False)
+            query_vectors = vectors[sample]
+        return quantization_report(vectors, query_vectors, k)
@@ -0,0 +1,396 @@
+"""
+Persistent lead embeddings for similar-lead lookup and near-duplicate detection
+"""
+
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+import json
+import os
+import threading
+import time
+import numpy as np
+
+from ..ai.vector_index import ExactIndex, IVFIndex, load_index, similarity_pairs, top_k
+
+# Lower thresholds match most of the store and no longer describe duplicates
+MIN_DUPLICATE_THRESHOLD = 0.5
+
+
+def connected_components(count: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Component label of every node given an edge list (vectorized union-find)
+
+    Each round hooks both endpoints of every edge to the smaller of their
+    labels and then compresses paths by pointer jumping, so the work per
+    round is a few array operations over the edges.
+
+    Args:
+        count: Number of nodes
+        left: Edge start nodes
+        right: Edge end nodes
+
+    Returns:
+        Array of length count; nodes in one component share the smallest node index
+    """
+    labels = np.arange(count)
+    while True:
+        smaller = np.minimum(labels[left], labels[right])
+        previous = labels.copy()
+        np.minimum.at(labels, labels[left], smaller)
+        np.minimum.at(labels, labels[right], smaller)
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+        if np.array_equal(labels, previous):
+            return labels
+
+
+class LeadVectorStore:
+    """Lead embeddings keyed by lead id, persisted as a snapshot plus an append-only log"""
+
+    _SNAPSHOT = 'snapshot.npz'
+    _META = 'meta.json'
+    _VECTORS = 'log.f32'
+    _LOG = 'log.jsonl'
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_block_bytes: int = 256 * 1024 * 1024,
+        compact_after: int = 10000,
+        max_pairs: int = 10_000_000
+    ):
+        """
+        Initialize the store, replaying any state saved in directory
+
+        Args:
+            directory: Directory for persisted embeddings, or None for memory only
+            max_block_bytes: Upper bound on the score block held at once by
+                duplicate detection
+            compact_after: Logged rows (at least) before the log is folded into
+                the snapshot
+            max_pairs: Most duplicate pairs one de-duplication pass may collect
+        """
+        self.directory = directory
+        self.max_block_bytes = max_block_bytes
+        self.compact_after = compact_after
+        self.max_pairs = max_pairs
+        self.index: Optional[ExactIndex] = None
+        self._logged_rows = 0
+        self._lock = threading.RLock()
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._replay()
+
+    @classmethod
+    def from_env(cls, directory: Optional[str] = None) -> 'LeadVectorStore':
+        """
+        Create a store configured from LEAD_STORE_DIR, LEAD_DEDUPE_BLOCK_BYTES
+        and LEAD_DEDUPE_MAX_PAIRS
+        """
+        return cls(
+            directory=directory or os.getenv('LEAD_STORE_DIR') or None,
+            max_block_bytes=int(os.getenv('LEAD_DEDUPE_BLOCK_BYTES', str(256 * 1024 * 1024))),
+            max_pairs=int(os.getenv('LEAD_DEDUPE_MAX_PAIRS', '10000000'))
+        )
+
+    def __len__(self) -> int:
+        return len(self.index) if self.index is not None else 0
+
+    def __contains__(self, lead_id: str) -> bool:
+        return self.index is not None and str(lead_id) in self.index
+
+    def upsert(self, lead_ids: Sequence[str], vectors: np.ndarray) -> int:
+        """
+        Store or replace lead embeddings
+
+        Args:
+            lead_ids: Lead ids
+            vectors: Embeddings, shape (len(lead_ids), dimension)
+
+        Returns:
+            Number of leads written
+        """
+        lead_ids = [str(lead_id) for lead_id in lead_ids]
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(lead_ids), -1)
+        if not lead_ids:
+            return 0
+
+        with self._lock:
+            if self.index is None:
+                self.index = ExactIndex(vectors.shape[1])
+            self.index.add(lead_ids, vectors)
+            self._append(lead_ids, vectors)
+        return len(lead_ids)
+
+    def delete(self, lead_ids: Sequence[str]) -> int:
+        """
+        Remove leads
+
+        Args:
+            lead_ids: Ids of the leads to remove
+
+        Returns:
+            Number of leads removed
+        """
+        with self._lock:
+            lead_ids = [str(lead_id) for lead_id in lead_ids if lead_id in self]
+            if not lead_ids:
+                return 0
+            removed = self.index.remove(lead_ids)
+            self._append(lead_ids, None)
+        return removed
+
+    def vector(self, lead_id: str) -> np.ndarray:
+        """Stored (normalized) embedding of a lead, raising KeyError if unknown"""
+        if lead_id not in self:
+            raise KeyError(f"Lead not found: {lead_id}")
+        return self.index.get(str(lead_id))
+
+    def similar(
+        self,
+        vector: np.ndarray,
+        top_k: int = 5,
+        exclude: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the stored leads most similar to an embedding
+
+        Args:
+            vector: Query embedding
+            top_k: Number of leads to return
+            exclude: Lead id left out of the results (e.g. the query lead itself)
+
+        Returns:
+            List of {'lead_id', 'similarity'} dictionaries, best first
+        """
+        with self._lock:
+            if self.index is None:
+                return []
+            extra = 1 if exclude is not None and exclude in self else 0
+            found = self.index.search(vector, top_k + extra)
+        return [
+            {'lead_id': lead_id, 'similarity': score}
+            for lead_id, score in found
+            if lead_id != exclude
+        ][:top_k]
+
+    def duplicate_clusters(
+        self,
+        threshold: float = 0.95,
+        min_cluster_size: int = 2,
+        method: str = 'exact',
+        nprobe: int = 2
+    ) -> Dict[str, Any]:
+        """
+        Group every stored lead into clusters of near-duplicates
+
+        Pairs are found with a blocked self-join: each block of rows is
+        multiplied against the rows after it, with the block height chosen so
+        the score block stays within max_block_bytes. With method='ivf' the
+        leads are first bucketed by their nprobe nearest k-means centroids and
+        only leads sharing a bucket are compared, which trades a little recall
+        for roughly sqrt(N) / nprobe^2 times less work. Pairs at or above the
+        threshold are merged into connected components, so A~B and B~C put
+        A, B and C in one cluster. The join runs on a copy of the vectors, so
+        writes only wait while that copy is taken.
+
+        Args:
+            threshold: Minimum cosine similarity for two leads to be duplicates
+                (at least MIN_DUPLICATE_THRESHOLD)
+            min_cluster_size: Smallest cluster reported
+            method: 'exact' (every pair) or 'ivf' (pairs sharing a bucket)
+            nprobe: Buckets each lead joins when method='ivf'
+
+        Returns:
+            Dictionary with 'clusters' (lists of lead ids, largest first),
+            the number of duplicate 'pairs', 'leads' scanned and 'seconds'
+        """
+        if not MIN_DUPLICATE_THRESHOLD <= threshold <= 1.0:
+            raise ValueError(f"threshold must be between {MIN_DUPLICATE_THRESHOLD} and 1")
+        if method not in ('exact', 'ivf'):
+            raise ValueError(f"Unknown duplicate detection method: {method}")
+
+        started = time.perf_counter()
+        with self._lock:
+            if self.index is None or len(self.index) < 2:
+                return {'clusters': [], 'pairs': 0, 'leads': len(self), 'seconds': 0.0}
+            ids = self.index.ids
+            vectors = self.index.vectors.copy()
+        count = len(ids)
+
+        if method == 'exact':
+            buckets = [np.arange(count)]
+        else:
+            buckets = self._buckets(vectors, nprobe)
+
+        left: List[np.ndarray] = []
+        right: List[np.ndarray] = []
+        found = 0
+        for members in buckets:
+            pair_left, pair_right = self._join(vectors, members, threshold, self.max_pairs - found)
+            found += len(pair_left)
+            left.append(pair_left)
+            right.append(pair_right)
+
+        left_nodes = np.concatenate(left) if left else np.zeros(0, dtype=np.int64)
+        right_nodes = np.concatenate(right) if right else np.zeros(0, dtype=np.int64)
+        if method == 'ivf':
+            # A pair sharing several buckets is found once per bucket
+            unique = np.unique(np.stack([left_nodes, right_nodes]), axis=1)
+            left_nodes, right_nodes = unique[0], unique[1]
+        labels = connected_components(count, left_nodes, right_nodes)
+
+        # Group the members of large enough components without touching singletons
+        _, inverse, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+        large = sizes >= max(2, min_cluster_size)
+        members = np.flatnonzero(large[inverse])
+        members = members[np.argsort(inverse[members], kind='stable')]
+        clusters = [
+            [ids[position] for position in group]
+            for group in np.split(members, np.cumsum(sizes[large])[:-1])
+            if len(group)
+        ]
+        clusters.sort(key=len, reverse=True)
+
+        return {
+            'clusters': clusters,
+            'pairs': int(len(left_nodes)),
+            'leads': count,
+            'seconds': time.perf_counter() - started,
+        }
+
+    def _join(
+        self,
+        vectors: np.ndarray,
+        members: np.ndarray,
+        threshold: float,
+        max_pairs: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(left, right) row indices of member pairs scoring at least threshold"""
+        subset = vectors if len(members) == len(vectors) else vectors[members]
+        # Stored rows are already normalized, so dot products are cosines
+        rows, columns, _ = similarity_pairs(
+            subset,
+            metric='dot',
+            threshold=threshold,
+            max_scores_bytes=self.max_block_bytes,
+            max_pairs=max_pairs
+        )
+        return members[rows], members[columns]
+
+    def _buckets(self, vectors: np.ndarray, nprobe: int) -> List[np.ndarray]:
+        """Row indices per k-means bucket, each row placed in its nprobe nearest buckets"""
+        quantizer = IVFIndex(vectors.shape[1], normalize=False)
+        quantizer.train(vectors)
+        centroids = quantizer.centroids
+        nprobe = max(1, min(nprobe, len(centroids)))
+
+        chunk = max(1, self.max_block_bytes // (4 * len(centroids)))
+        nearest = np.concatenate([
+            top_k(vectors[start:start + chunk] @ centroids.T, nprobe)
+            for start in range(0, len(vectors), chunk)
+        ])
+        rows = np.repeat(np.arange(len(vectors)), nprobe)
+        assignment = nearest.ravel()
+        order = np.argsort(assignment, kind='stable')
+        counts = np.bincount(assignment, minlength=len(centroids))
+        return [
+            bucket for bucket in np.split(rows[order], np.cumsum(counts)[:-1])
+            if len(bucket) > 1
+        ]
+
+    def compact(self) -> None:
+        """Fold the log into a fresh snapshot"""
+        if not self.directory:
+            return
+        with self._lock:
+            snapshot = os.path.join(self.directory, self._SNAPSHOT)
+            if self.index is not None:
+                self.index.save(snapshot + '.tmp')
+                os.replace(snapshot + '.tmp', snapshot)
+            elif os.path.exists(snapshot):
+                os.remove(snapshot)
+            # Replaying a log over the snapshot it was folded into is harmless,
+            # so a crash before these truncations loses nothing
+            for name in (self._VECTORS, self._LOG):
+                open(os.path.join(self.directory, name), 'wb').close()
+            self._logged_rows = 0
+
+    def _append(self, lead_ids: List[str], vectors: Optional[np.ndarray]) -> None:
+        """Log upserted (vectors given) or deleted leads (lock held)"""
+        if not self.directory:
+            return
+
+        lines = []
+        if vectors is not None:
+            meta_path = os.path.join(self.directory, self._META)
+            if not os.path.exists(meta_path):
+                with open(meta_path, 'w') as f:
+                    json.dump({'dimension': int(vectors.shape[1])}, f)
+            vectors_path = os.path.join(self.directory, self._VECTORS)
+            row_bytes = 4 * vectors.shape[1]
+            with open(vectors_path, 'ab') as f:
+                # Drop a partially written final row left by a crash
+                end = f.seek(0, os.SEEK_END)
+                if end % row_bytes:
+                    f.truncate(end - end % row_bytes)
+                row = (end - end % row_bytes) // row_bytes
+                f.write(np.ascontiguousarray(vectors).tobytes())
+            for offset, lead_id in enumerate(lead_ids):
+                lines.append({'id': lead_id, 'row': row + offset})
+        else:
+            lines = [{'id': lead_id, 'deleted': True} for lead_id in lead_ids]
+
+        with open(os.path.join(self.directory, self._LOG), 'a+b') as f:
+            # Start on a fresh line after a torn final line left by a crash
+            end = f.seek(0, os.SEEK_END)
+            prefix = b''
+            if end:
+                f.seek(end - 1)
+                prefix = b'' if f.read(1) == b'\n' else b'\n'
+            f.write(prefix + ''.join(json.dumps(line) + '\n' for line in lines).encode('utf-8'))
+
+        self._logged_rows += len(lines)
+        if self._logged_rows >= max(self.compact_after, len(self)):
+            self.compact()
+
+    def _replay(self) -> None:
+        """Load the snapshot and apply the log written after it"""
+        snapshot = os.path.join(self.directory, self._SNAPSHOT)
+        if os.path.exists(snapshot):
+            self.index = load_index(snapshot)
+
+        log_path = os.path.join(self.directory, self._LOG)
+        if not os.path.exists(log_path):
+            return
+
+        # Last entry per lead wins; a torn final line from a crash is ignored
+        latest: Dict[str, Optional[int]] = {}
+        with open(log_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                latest[entry['id']] = None if entry.get('deleted') else entry['row']
+                self._logged_rows += 1
+
+        deleted = [lead_id for lead_id, row in latest.items() if row is None]
+        if deleted and self.index is not None:
+            self.index.remove(deleted)
+
+        upserted = {lead_id: row for lead_id, row in latest.items() if row is not None}
+        if not upserted:
+            return
+        with open(os.path.join(self.directory, self._META)) as f:
+            dimension = json.load(f)['dimension']
+        raw = np.fromfile(os.path.join(self.directory, self._VECTORS), dtype=np.float32)
+        # Drop a partially written final row
+        rows = raw[:len(raw) - len(raw) % dimension].reshape(-1, dimension)
+        valid = {lead_id: row for lead_id, row in upserted.items() if row < len(rows)}
+        if self.index is None:
+            self.index = ExactIndex(dimension)
+        self.index.add(list(valid), rows[list(valid.values())])
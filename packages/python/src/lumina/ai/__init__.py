@@ -2,9 +2,21 @@
 AI/ML operations for Lumina AI
 """
 
-from .embeddings import EmbeddingService
-from .classifier import TextClassifier
-from .analyzer import DataAnalyzer
+from importlib import import_module
+from typing import Any
+
+# Submodules are imported on first attribute access so that importing the
+# package does not pull in sentence-transformers, torch, sklearn or pandas
+_EXPORTS = {
+    "EmbeddingService": ".embeddings",
+    "TextClassifier": ".classifier",
+    "DataAnalyzer": ".analyzer",
+}
 
 __all__ = ["EmbeddingService", "TextClassifier", "DataAnalyzer"]
 
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
@@ -2,18 +2,156 @@
 Data analysis and processing service
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+from . import forecasting
+
+
+def trend_label(slope: float) -> str:
+    """Map a per-point linear trend slope to a direction label"""
+    if slope > 0.1:
+        return 'increasing'
+    elif slope < -0.1:
+        return 'decreasing'
+    else:
+        return 'stable'
+
+
+def seasonality_summary(monthly_avg: np.ndarray, weekly_avg: np.ndarray) -> Dict[str, Any]:
+    """
+    Summarize seasonality from per-month and per-weekday averages
+
+    Args:
+        monthly_avg: Mean value of each month present in the data
+        weekly_avg: Mean value of each day of week present in the data
+
+    Returns:
+        Coefficients of variation and the seasonality flag
+    """
+    def variation(averages: np.ndarray) -> float:
+        mean = averages.mean() if len(averages) else 0.0
+        # A single group has no spread (pandas would report NaN)
+        if mean <= 0 or len(averages) < 2:
+            return 0.0
+        return float(averages.std(ddof=1) / mean)
+
+    monthly_variation = variation(monthly_avg)
+    return {
+        'monthly_variation': monthly_variation,
+        'weekly_variation': variation(weekly_avg),
+        'has_seasonality': monthly_variation > 0.1
+    }
+
+
+def to_columns(
+    data: Union[List[Dict[str, Any]], Dict[str, Sequence[Any]], pd.DataFrame],
+    fields: List[str]
+) -> Dict[str, np.ndarray]:
+    """
+    Pull the named fields out of row-, column- or frame-shaped input as arrays
+
+    Column dictionaries and DataFrames are converted without copying where
+    the underlying data is already a NumPy-compatible array.
+
+    Args:
+        data: List of dictionaries, dictionary of columns, or DataFrame
+        fields: Field names to extract
+
+    Returns:
+        One array per field
+    """
+    if isinstance(data, list):
+        data = pd.DataFrame.from_records(data)
+    missing = [field for field in fields if field not in data]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+    if isinstance(data, pd.DataFrame):
+        return {field: data[field].to_numpy() for field in fields}
+    return {field: np.asarray(data[field]) for field in fields}
+
+
+class SeriesStatistics:
+    """Summary statistics of a value array, each computed once on first use"""
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self._quartiles: Optional[Tuple[float, float, float]] = None
+        self._mean: Optional[float] = None
+        self._std: Optional[float] = None
+
+    @property
+    def quartiles(self) -> Tuple[float, float, float]:
+        """25th, 50th and 75th percentiles from a single partition"""
+        if self._quartiles is None:
+            q1, median, q3 = np.percentile(self.values, [25, 50, 75])
+            self._quartiles = (float(q1), float(median), float(q3))
+        return self._quartiles
+
+    @property
+    def median(self) -> float:
+        return self.quartiles[1]
+
+    @property
+    def mean(self) -> float:
+        if self._mean is None:
+            self._mean = float(np.mean(self.values))
+        return self._mean
+
+    @property
+    def std(self) -> float:
+        if self._std is None:
+            self._std = float(np.sqrt(np.mean((self.values - self.mean) ** 2)))
+        return self._std
+
+    def compute(self) -> None:
+        """Compute every statistic now rather than on first use"""
+        self.quartiles
+        self.std
+
+
+class PreparedSeries:
+    """Time series parsed and sorted by date once, shared by every analysis stage"""
+
+    def __init__(self, dates: Sequence[Any], values: Sequence[float]):
+        """
+        Initialize series
+
+        Args:
+            dates: Dates (datetime64 array or anything pandas.to_datetime parses)
+            values: Numeric values, parallel to dates
+        """
+        dates = pd.DatetimeIndex(pd.to_datetime(dates))
+        values = np.asarray(values, dtype=np.float64)
+        if len(dates) != len(values):
+            raise ValueError(f"Got {len(dates)} dates but {len(values)} values")
+        if len(values) == 0:
+            raise ValueError("Time series has no data points")
+
+        # Position of each sorted point in the input, or None if it was already sorted
+        self.order: Optional[np.ndarray] = None
+        if not dates.is_monotonic_increasing:
+            self.order = np.argsort(dates.asi8, kind='stable')
+            dates = dates[self.order]
+            values = values[self.order]
+
+        self.dates = dates
+        self.values = values
+        self.stats = SeriesStatistics(values)
+
+    def input_positions(self, indices: np.ndarray) -> np.ndarray:
+        """Map indices into the sorted series back to positions in the input"""
+        return indices if self.order is None else self.order[indices]
+
 
 class DataAnalyzer:
     """Data analysis and processing service"""
 
     def analyze_time_series(
         self,
-        data: List[Dict[str, Any]],
+        data: Union[List[Dict[str, Any]], Dict[str, Sequence[Any]], pd.DataFrame],
         date_field: str = 'date',
         value_field: str = 'value'
     ) -> Dict[str, Any]:
@@ -21,165 +159,461 @@ class DataAnalyzer:
         Analyze time series data
 
         Args:
-            data: List of dictionaries with date and value fields
+            data: List of dictionaries, dictionary of columns, or DataFrame
+                with date and value fields
             date_field: Name of date field
             value_field: Name of value field
 
         Returns:
             Dictionary with analysis results
         """
-        df = pd.DataFrame(data)
-        df[date_field] = pd.to_datetime(df[date_field])
-        df = df.sort_values(date_field)
+        columns = to_columns(data, [date_field, value_field])
+        return self.analyze_arrays(columns[date_field], columns[value_field])
 
-        values = df[value_field].values
+    def analyze_arrays(self, dates: Sequence[Any], values: Sequence[float]) -> Dict[str, Any]:
+        """
+        Analyze a time series given as parallel date and value arrays
+
+        Args:
+            dates: Dates (datetime64 array or anything pandas.to_datetime parses)
+            values: Numeric values
 
+        Returns:
+            Dictionary with analysis results (see analyze_time_series)
+        """
+        return self.analyze_prepared(PreparedSeries(dates, values))
+
+    def analyze_prepared(self, series: PreparedSeries) -> Dict[str, Any]:
+        """
+        Analyze a series that has already been parsed and sorted
+
+        Args:
+            series: Prepared series; its cached statistics are reused
+
+        Returns:
+            Dictionary with analysis results (see analyze_time_series)
+        """
+        stats = series.stats
         analysis = {
-            'total_records': len(df),
+            'total_records': len(series.values),
             'date_range': {
-                'start': df[date_field].min().isoformat(),
-                'end': df[date_field].max().isoformat()
+                'start': series.dates[0].isoformat(),
+                'end': series.dates[-1].isoformat()
             },
             'statistics': {
-                'mean': float(np.mean(values)),
-                'median': float(np.median(values)),
-                'std': float(np.std(values)),
-                'min': float(np.min(values)),
-                'max': float(np.max(values)),
+                'mean': stats.mean,
+                'median': stats.median,
+                'std': stats.std,
+                'min': float(np.min(series.values)),
+                'max': float(np.max(series.values)),
             },
-            'trend': self._calculate_trend(values),
-            'seasonality': self._detect_seasonality(df, date_field, value_field)
+            'trend': self._calculate_trend(series.values),
+            'seasonality': self._detect_seasonality(series.dates, series.values)
         }
 
         return analysis
 
+    def analyze_time_series_batch(
+        self,
+        data: Union[List[Dict[str, Any]], Dict[str, Sequence[Any]], pd.DataFrame],
+        series_field: str = 'series_id',
+        date_field: str = 'date',
+        value_field: str = 'value'
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze many time series at once with grouped operations
+
+        Every series gets the same dictionary analyze_time_series would return,
+        but statistics, trend slopes and seasonality are computed for all series
+        together from one sort and a handful of groupby aggregations.
+
+        Args:
+            data: Long-format rows, dictionary of columns, or DataFrame with
+                series, date and value columns
+            series_field: Name of series identifier field
+            date_field: Name of date field
+            value_field: Name of value field
+
+        Returns:
+            Analysis dictionaries keyed by series id (as a string)
+        """
+        df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        missing = [f for f in (series_field, date_field, value_field) if f not in df.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        if df.empty:
+            return {}
+
+        # Group on integer codes; string ids are only touched once, for the output keys
+        codes, labels = pd.factorize(df[series_field])
+        df = pd.DataFrame({
+            'series': codes,
+            'date': pd.to_datetime(df[date_field]).to_numpy(),
+            'value': pd.to_numeric(df[value_field]).to_numpy(np.float64),
+        })
+        # Rows without a series id (code -1) belong to no series
+        df = df[df['series'] >= 0].sort_values(['series', 'date'], kind='stable', ignore_index=True)
+
+        groups = df.groupby('series', sort=False)
+        values = groups['value']
+        stats = values.agg(['count', 'mean', 'median', 'min', 'max'])
+        stats['std'] = values.std(ddof=0)
+        dates = groups['date'].agg(['min', 'max'])
+
+        # Least-squares slope against the position within each series, as polyfit does
+        n = groups['value'].transform('size').to_numpy(np.float64)
+        position = groups.cumcount().to_numpy(np.float64) - (n - 1) / 2
+        centered = df['value'].to_numpy() - values.transform('mean').to_numpy()
+        covariance = pd.Series(position * centered).groupby(df['series'], sort=False).sum()
+        counts = stats['count'].to_numpy(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slopes = covariance.to_numpy() / (counts * (counts ** 2 - 1) / 12)
+
+        monthly = self._grouped_variation(df, df['date'].dt.month)
+        weekly = self._grouped_variation(df, df['date'].dt.dayofweek)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        rows = zip(
+            stats.index, stats['count'].tolist(), stats['mean'].tolist(),
+            stats['median'].tolist(), stats['std'].tolist(), stats['min'].tolist(),
+            stats['max'].tolist(), dates['min'], dates['max'], slopes.tolist()
+        )
+        for code, count, mean, median, std, low, high, start, end, slope in rows:
+            seasonality = None
+            if count >= 30:  # Same minimum as _detect_seasonality
+                monthly_variation = monthly.get(code, 0.0)
+                seasonality = {
+                    'monthly_variation': monthly_variation,
+                    'weekly_variation': weekly.get(code, 0.0),
+                    'has_seasonality': monthly_variation > 0.1
+                }
+            results[str(labels[code])] = {
+                'total_records': count,
+                'date_range': {'start': start.isoformat(), 'end': end.isoformat()},
+                'statistics': {
+                    'mean': mean,
+                    'median': median,
+                    'std': std,
+                    'min': low,
+                    'max': high,
+                },
+                'trend': trend_label(slope) if count >= 2 else 'insufficient_data',
+                'seasonality': seasonality
+            }
+
+        return results
+
+    def _grouped_variation(self, df: pd.DataFrame, period: pd.Series) -> Dict[str, float]:
+        """
+        Coefficient of variation of per-period averages for every series
+
+        Args:
+            df: Frame with integer 'series' codes and 'value' columns
+            period: Period key for each row (month or day of week)
+
+        Returns:
+            Variation keyed by series code (see seasonality_summary)
+        """
+        averages = df['value'].groupby([df['series'], period]).mean()
+        spread = averages.groupby(level=0).agg(['mean', 'std', 'count'])
+        valid = (spread['mean'] > 0) & (spread['count'] >= 2)
+        variation = np.where(valid, spread['std'] / spread['mean'].where(valid, 1.0), 0.0)
+        return dict(zip(spread.index, variation.tolist()))
+
     def _calculate_trend(self, values: np.ndarray) -> str:
         """Calculate trend direction"""
         if len(values) < 2:
             return 'insufficient_data'
 
-        # Simple linear trend
-        x = np.arange(len(values))
-        slope = np.polyfit(x, values, 1)[0]
-
-        if slope > 0.1:
-            return 'increasing'
-        elif slope < -0.1:
-            return 'decreasing'
-        else:
-            return 'stable'
+        # Least-squares slope against the point index (same as polyfit degree 1)
+        x = np.arange(len(values), dtype=np.float64)
+        x -= x.mean()
+        slope = np.dot(x, values - values.mean()) / np.dot(x, x)
+        return trend_label(slope)
 
     def _detect_seasonality(
         self,
-        df: pd.DataFrame,
-        date_field: str,
-        value_field: str
+        dates: pd.DatetimeIndex,
+        values: np.ndarray
     ) -> Optional[Dict[str, Any]]:
         """Detect seasonality patterns"""
-        if len(df) < 30:  # Need at least 30 data points
+        if len(values) < 30:  # Need at least 30 data points
             return None
 
-        df['month'] = df[date_field].dt.month
-        df['day_of_week'] = df[date_field].dt.dayofweek
+        def period_means(keys: np.ndarray, size: int) -> np.ndarray:
+            counts = np.bincount(keys, minlength=size)
+            sums = np.bincount(keys, weights=values, minlength=size)
+            present = counts > 0
+            return sums[present] / counts[present]
 
-        monthly_avg = df.groupby('month')[value_field].mean()
-        weekly_avg = df.groupby('day_of_week')[value_field].mean()
+        monthly_avg = period_means(dates.month.to_numpy() - 1, 12)
+        weekly_avg = period_means(dates.dayofweek.to_numpy(), 7)
 
-        return {
-            'monthly_variation': float(monthly_avg.std() / monthly_avg.mean()) if monthly_avg.mean() > 0 else 0,
-            'weekly_variation': float(weekly_avg.std() / weekly_avg.mean()) if weekly_avg.mean() > 0 else 0,
-            'has_seasonality': monthly_avg.std() / monthly_avg.mean() > 0.1 if monthly_avg.mean() > 0 else False
-        }
+        return seasonality_summary(monthly_avg, weekly_avg)
+
+    # Default (flag, high severity) score thresholds per detection method
+    ANOMALY_THRESHOLDS = {
+        'zscore': (3.0, 4.0),
+        'mad': (3.5, 5.0),
+        'rolling': (3.0, 4.0),
+    }
+
+    # Key under which each method's score appears in the record format
+    _SCORE_FIELDS = {
+        'zscore': 'z_score',
+        'mad': 'modified_z_score',
+        'rolling': 'z_score',
+    }
 
     def detect_anomalies(
         self,
         values: List[float],
-        method: str = 'iqr'
-    ) -> List[Dict[str, Any]]:
+        method: str = 'iqr',
+        output: str = 'records',
+        window: int = 30,
+        threshold: Optional[float] = None
+    ) -> Union[List[Dict[str, Any]], Dict[str, List[Any]]]:
         """
         Detect anomalies in data
 
         Args:
-            values: List of numeric values
-            method: Detection method ('iqr' or 'zscore')
+            values: List (or array) of numeric values
+            method: Detection method ('iqr', 'zscore', 'mad' or 'rolling')
+            output: 'records' for one dictionary per anomaly, 'columnar' for
+                parallel indices/values/scores/severity lists
+            window: Trailing window size for the 'rolling' method
+            threshold: Score above which a value is flagged (method default if None)
 
         Returns:
-            List of detected anomalies
+            Detected anomalies in the requested format
+        """
+        if output not in ('records', 'columnar'):
+            raise ValueError(f"Unknown output format: {output}")
+
+        values_array = np.asarray(values, dtype=np.float64)
+        indices, scores, high = self._anomaly_scores(values_array, method, window, threshold)
+        return self._format_anomalies(indices, values_array[indices], scores, high, method, output)
+
+    def detect_anomalies_prepared(
+        self,
+        series: PreparedSeries,
+        method: str = 'iqr',
+        output: str = 'records',
+        window: int = 30,
+        threshold: Optional[float] = None
+    ) -> Union[List[Dict[str, Any]], Dict[str, List[Any]]]:
         """
-        values_array = np.array(values)
-        anomalies = []
+        Detect anomalies in a prepared series, reusing its cached statistics
+
+        Scoring runs in date order (which matters for 'rolling'); reported
+        indices are positions in the original, unsorted input.
+
+        Args:
+            series: Prepared series
+            method: Detection method ('iqr', 'zscore', 'mad' or 'rolling')
+            output: 'records' or 'columnar' (see detect_anomalies)
+            window: Trailing window size for the 'rolling' method
+            threshold: Score above which a value is flagged (method default if None)
+
+        Returns:
+            Detected anomalies in the requested format, ordered by input position
+        """
+        if output not in ('records', 'columnar'):
+            raise ValueError(f"Unknown output format: {output}")
+
+        indices, scores, high = self._anomaly_scores(
+            series.values, method, window, threshold, series.stats
+        )
+        flagged_values = series.values[indices]
+        positions = series.input_positions(indices)
+        if series.order is not None:
+            by_position = np.argsort(positions, kind='stable')
+            positions = positions[by_position]
+            flagged_values = flagged_values[by_position]
+            scores = scores[by_position]
+            high = high[by_position]
+        return self._format_anomalies(positions, flagged_values, scores, high, method, output)
+
+    def _format_anomalies(
+        self,
+        indices: np.ndarray,
+        flagged_values: np.ndarray,
+        scores: np.ndarray,
+        high: np.ndarray,
+        method: str,
+        output: str
+    ) -> Union[List[Dict[str, Any]], Dict[str, List[Any]]]:
+        """Build the records or columnar anomaly output"""
+        severity = np.where(high, 'high', 'medium')
+
+        if output == 'columnar':
+            return {
+                'indices': indices.tolist(),
+                'values': flagged_values.tolist(),
+                'scores': scores.tolist(),
+                'severity': severity.tolist(),
+            }
+
+        rows = zip(indices.tolist(), flagged_values.tolist(), scores.tolist(), severity.tolist())
+        score_field = self._SCORE_FIELDS.get(method)
+        if score_field is None:
+            return [
+                {'index': idx, 'value': value, 'type': 'outlier', 'severity': level}
+                for idx, value, _, level in rows
+            ]
+        return [
+            {'index': idx, 'value': value, score_field: score, 'type': 'outlier', 'severity': level}
+            for idx, value, score, level in rows
+        ]
+
+    def _anomaly_scores(
+        self,
+        values: np.ndarray,
+        method: str,
+        window: int,
+        threshold: Optional[float],
+        stats: Optional[SeriesStatistics] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score every value at once with boolean masks
+
+        Args:
+            stats: Precomputed statistics of values, if the caller already has them
+
+        Returns:
+            Indices of flagged values, their absolute scores and a high-severity mask
+        """
+        empty = (np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=bool))
+        if len(values) == 0:
+            if method not in self.ANOMALY_THRESHOLDS and method != 'iqr':
+                raise ValueError(f"Unknown anomaly detection method: {method}")
+            return empty
+
+        stats = stats or SeriesStatistics(values)
 
         if method == 'iqr':
-            Q1 = np.percentile(values_array, 25)
-            Q3 = np.percentile(values_array, 75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-
-            for idx, value in enumerate(values):
-                if value < lower_bound or value > upper_bound:
-                    anomalies.append({
-                        'index': idx,
-                        'value': float(value),
-                        'type': 'outlier',
-                        'severity': 'high' if abs(value - np.median(values_array)) > 2 * IQR else 'medium'
-                    })
-
-        elif method == 'zscore':
-            mean = np.mean(values_array)
-            std = np.std(values_array)
-
-            if std > 0:
-                z_scores = np.abs((values_array - mean) / std)
-
-                for idx, z_score in enumerate(z_scores):
-                    if z_score > 3:
-                        anomalies.append({
-                            'index': idx,
-                            'value': float(values[idx]),
-                            'z_score': float(z_score),
-                            'type': 'outlier',
-                            'severity': 'high' if z_score > 4 else 'medium'
-                        })
-
-        return anomalies
+            q1, median, q3 = stats.quartiles
+            iqr = q3 - q1
+            mask = (values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)
+            indices = np.flatnonzero(mask)
+            deviation = np.abs(values[indices] - median)
+            # Distance from the median in IQRs
+            scores = deviation / iqr if iqr > 0 else np.zeros(len(indices))
+            return indices, scores, deviation > 2 * iqr
+
+        if method not in self.ANOMALY_THRESHOLDS:
+            raise ValueError(f"Unknown anomaly detection method: {method}")
+
+        flag_at, high_at = self.ANOMALY_THRESHOLDS[method]
+        if threshold is not None:
+            high_at = threshold * high_at / flag_at
+            flag_at = threshold
+
+        if method == 'zscore':
+            if stats.std == 0:
+                return empty
+            scores = np.abs(values - stats.mean) / stats.std
+
+        elif method == 'mad':
+            deviation = np.abs(values - stats.median)
+            mad = np.median(deviation)
+            if mad > 0:
+                # Modified z-score (Iglewicz and Hoaglin)
+                scores = 0.6745 * deviation / mad
+            else:
+                # More than half the values are identical; fall back to the mean absolute deviation
+                mean_ad = deviation.mean()
+                if mean_ad == 0:
+                    return empty
+                scores = deviation / (1.253314 * mean_ad)
+
+        else:
+            if window < 2:
+                raise ValueError("window must be at least 2")
+            # Compare each value with the window before it, so a spike does not
+            # inflate the statistics it is judged against
+            history = pd.Series(values).rolling(window, min_periods=window)
+            mean = history.mean().shift(1).to_numpy()
+            std = history.std(ddof=0).shift(1).to_numpy()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores = np.abs(values - mean) / std
+            # Warm-up rows (NaN) and flat windows (inf from a zero std) are not scored
+            scores[~np.isfinite(scores)] = 0.0
+
+        indices = np.flatnonzero(scores > flag_at)
+        flagged = scores[indices]
+        return indices, flagged, flagged > high_at
 
     def forecast(
         self,
         values: List[float],
         periods: int = 7,
-        method: str = 'moving_average'
+        method: str = 'moving_average',
+        season_length: Optional[int] = None
     ) -> List[float]:
         """
-        Simple forecasting
+        Forecast a single series
+
+        Fitted models are cached per process, so repeated calls on an unchanged
+        series skip the fit.
 
         Args:
             values: Historical values
             periods: Number of periods to forecast
-            method: Forecasting method
+            method: Forecasting method (see forecasting.METHODS)
+            season_length: Season period for seasonal methods
 
         Returns:
             List of forecasted values
         """
-        if method == 'moving_average':
-            window = min(7, len(values))
-            if window == 0:
-                return [0.0] * periods
+        model = forecasting.fit_series(values, method, season_length)
+        return model.predict(periods)[0].tolist()
 
-            last_values = values[-window:]
-            avg = np.mean(last_values)
+    def forecast_batch(
+        self,
+        series: Dict[str, List[float]],
+        periods: int = 7,
+        method: str = 'moving_average',
+        season_length: Optional[int] = None
+    ) -> Dict[str, List[float]]:
+        """
+        Forecast many series in one vectorized pass
 
-            # Simple trend
-            if len(values) >= 2:
-                trend = (values[-1] - values[-window]) / window
-            else:
-                trend = 0
+        Args:
+            series: Historical values keyed by series id
+            periods: Number of periods to forecast
+            method: Forecasting method (see forecasting.METHODS)
+            season_length: Season period for seasonal methods
 
-            forecast = []
-            for i in range(periods):
-                forecast.append(float(avg + trend * (i + 1)))
+        Returns:
+            Forecasts keyed by series id
+        """
+        return forecasting.forecast_many(series, periods, method, season_length)
 
-            return forecast
+    def backtest_forecast(
+        self,
+        values: List[float],
+        methods: List[str],
+        horizon: int = 7,
+        folds: int = 3,
+        season_length: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Compare forecasting methods with rolling-origin backtests
 
-        return [float(np.mean(values))] * periods if values else [0.0] * periods
+        Args:
+            values: Historical values
+            methods: Methods to evaluate
+            horizon: Periods forecast from each origin
+            folds: Number of rolling origins
+            season_length: Season period for seasonal methods
 
+        Returns:
+            Per-method MAE/MAPE and the method with the lowest MAE
+        """
+        results = {
+            method: forecasting.backtest(values, method, horizon, folds, season_length)
+            for method in methods
+        }
+        best = min(results, key=lambda method: results[method]['mae']) if results else None
+        return {'results': results, 'best_method': best}
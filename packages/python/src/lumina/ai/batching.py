@@ -0,0 +1,200 @@
+"""
+Dynamic micro-batching for single-text embedding requests
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from collections import deque
+from concurrent.futures import Executor
+import asyncio
+import os
+import time
+import numpy as np
+
+from .embeddings import EmbeddingService
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embed requests into batched model calls"""
+
+    # Number of recent batches kept for latency percentiles
+    _WINDOW = 1024
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        executor: Optional[Executor] = None,
+        max_queue: int = 1024
+    ):
+        """
+        Initialize batcher
+
+        Args:
+            embedding_service: Service whose embed_matrix runs each batch
+            max_batch_size: Flush as soon as this many requests are queued
+            max_wait_ms: Flush at most this long after the oldest queued request
+            executor: Pool that runs the model (defaults to the loop's executor)
+            max_queue: Most requests waiting for a batch; embed() raises
+                asyncio.QueueFull beyond it
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_queue < 1:
+            raise ValueError("max_queue must be at least 1")
+
+        self.embedding_service = embedding_service
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.executor = executor
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self.requests = 0
+        self.batches = 0
+        self.rejected = 0
+        self._batch_sizes: deque = deque(maxlen=self._WINDOW)
+        self._queue_delays_ms: deque = deque(maxlen=self._WINDOW)
+        self._encode_ms: deque = deque(maxlen=self._WINDOW)
+
+    @classmethod
+    def from_env(
+        cls,
+        embedding_service: EmbeddingService,
+        executor: Optional[Executor] = None
+    ) -> 'EmbeddingBatcher':
+        """Create a batcher configured from EMBED_BATCH_* environment variables"""
+        return cls(
+            embedding_service,
+            max_batch_size=int(os.getenv('EMBED_BATCH_MAX_SIZE', '32')),
+            max_wait_ms=float(os.getenv('EMBED_BATCH_MAX_WAIT_MS', '5')),
+            executor=executor,
+            max_queue=int(os.getenv('EMBED_BATCH_MAX_QUEUE', '1024'))
+        )
+
+    async def start(self) -> None:
+        """Start the background flush loop on the running event loop"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop, failing any requests still queued"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Embedding batcher stopped"))
+
+    async def embed(self, text: str) -> np.ndarray:
+        """
+        Queue one text and wait for its embedding
+
+        Args:
+            text: Input text to embed
+
+        Returns:
+            Float32 embedding vector
+
+        Raises:
+            asyncio.QueueFull: max_queue requests are already waiting
+        """
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((text, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        """Return achieved batch sizes and queueing delay percentiles"""
+        sizes = np.array(self._batch_sizes, dtype=np.float64)
+        delays = np.array(self._queue_delays_ms, dtype=np.float64)
+        encode = np.array(self._encode_ms, dtype=np.float64)
+
+        def percentiles(values: np.ndarray) -> Dict[str, float]:
+            if len(values) == 0:
+                return {'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+            return {
+                'p50': float(np.percentile(values, 50)),
+                'p99': float(np.percentile(values, 99)),
+                'max': float(values.max()),
+            }
+
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+            'max_queue': self.max_queue,
+            'requests': self.requests,
+            'batches': self.batches,
+            'rejected': self.rejected,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'mean_batch_size': float(sizes.mean()) if len(sizes) else 0.0,
+            'queue_delay_ms': percentiles(delays),
+            'encode_ms': percentiles(encode),
+        }
+
+    async def _run(self) -> None:
+        """Collect requests into batches and flush them one at a time"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = batch[0][2] + self.max_wait_ms / 1000
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._flush(loop, batch)
+
+    async def _flush(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        batch: List[Tuple[str, asyncio.Future, float]]
+    ) -> None:
+        """Encode a batch off the event loop and resolve each caller's future"""
+        # Callers that gave up while queued do not need encoding
+        batch = [item for item in batch if not item[1].done()]
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            self._queue_delays_ms.append((started - enqueued) * 1000)
+
+        try:
+            embeddings = await loop.run_in_executor(
+                self.executor,
+                self.embedding_service.embed_matrix,
+                [text for text, _, _ in batch]
+            )
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._encode_ms.append((time.perf_counter() - started) * 1000)
+            self._batch_sizes.append(len(batch))
+            self.batches += 1
+            self.requests += len(batch)
+
+        for (_, future, _), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
@@ -0,0 +1,187 @@
+"""
+Content-addressed embedding cache
+"""
+
+from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different inputs share a cache entry"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def cache_key(model_name: str, text: str) -> str:
+    """Build the cache key for a (model, text) pair"""
+    payload = f'{model_name}\0{normalize_text(text)}'.encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: byte-bounded in-memory LRU plus optional SQLite store"""
+
+    # Rows fetched per SQLite query when looking up many keys at once
+    _SQL_CHUNK = 500
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, path: Optional[str] = None):
+        """
+        Initialize embedding cache
+
+        Args:
+            max_bytes: Upper bound on the memory used by cached vectors (0 disables the tier)
+            path: SQLite file for the persistent tier, or None for memory only
+        """
+        self.max_bytes = max_bytes
+        self.path = path
+        self._entries: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_pid = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._connection()
+
+    @classmethod
+    def from_env(cls) -> 'EmbeddingCache':
+        """Create a cache configured from EMBEDDING_CACHE_* environment variables"""
+        max_bytes = int(os.getenv('EMBEDDING_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+        path = os.getenv('EMBEDDING_CACHE_PATH') or None
+        return cls(max_bytes=max_bytes, path=path)
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up cached vectors
+
+        Args:
+            keys: Cache keys to look up
+
+        Returns:
+            Dictionary of the keys that were found, mapped to float32 vectors
+        """
+        found: Dict[str, np.ndarray] = {}
+        pending: List[str] = []
+
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+                    self.hits += 1
+                else:
+                    pending.append(key)
+
+            if pending and self.path:
+                db = self._connection()
+                for start in range(0, len(pending), self._SQL_CHUNK):
+                    chunk = pending[start:start + self._SQL_CHUNK]
+                    placeholders = ','.join('?' * len(chunk))
+                    rows = db.execute(
+                        f'SELECT key, vector FROM embeddings WHERE key IN ({placeholders})',
+                        chunk
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                        found[key] = vector
+                        self._remember(key, vector)
+                        self.disk_hits += 1
+
+            self.misses += sum(1 for key in pending if key not in found)
+
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        """
+        Store vectors in the cache
+
+        Args:
+            items: Dictionary mapping cache keys to vectors
+        """
+        if not items:
+            return
+
+        # Own each row: a view would keep the caller's whole batch matrix
+        # alive while the byte bound counted only the row
+        vectors = {
+            key: np.array(vector, dtype=np.float32, copy=True)
+            for key, vector in items.items()
+        }
+        for vector in vectors.values():
+            vector.setflags(write=False)
+
+        with self._lock:
+            for key, vector in vectors.items():
+                self._remember(key, vector)
+
+            if self.path:
+                db = self._connection()
+                db.executemany(
+                    'INSERT OR REPLACE INTO embeddings (key, dim, vector) VALUES (?, ?, ?)',
+                    [(key, int(v.shape[0]), v.tobytes()) for key, v in vectors.items()]
+                )
+                db.commit()
+
+    def clear(self) -> None:
+        """Drop every in-memory entry (the persistent tier is left untouched)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'persistent': bool(self.path),
+            }
+
+    def _connection(self) -> sqlite3.Connection:
+        """SQLite connection for this process (reopened after a fork)"""
+        if self._db is None or self._db_pid != os.getpid():
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS embeddings '
+                '(key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL)'
+            )
+            self._db.commit()
+            self._db_pid = os.getpid()
+        return self._db
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        """Insert into the LRU tier and evict down to the byte budget (lock held)"""
+        if self.max_bytes <= 0 or vector.nbytes > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.nbytes
+
+        self._entries[key] = vector
+        self._bytes += vector.nbytes
+
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
@@ -2,36 +2,274 @@
 Text classification service
 """
 
-from typing import List, Dict, Any
-from sklearn.feature_extraction.text import TfidfVectorizer
+from typing import List, Dict, Any, Optional
+from collections import deque
+import copy
+import threading
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.pipeline import Pipeline
 import numpy as np
 
+from .lexicon import LexiconEngine, sentiment_from_scores
+from .model_store import ClassifierModelStore
+
+# Hashed feature space of incremental models; the vectorizer is stateless, so
+# mini-batches never require refitting a vocabulary
+HASHING_FEATURES = 2 ** 18
+HISTORY_SIZE = 500
+
+
+def build_pipeline() -> Pipeline:
+    """Create an untrained TF-IDF + naive Bayes pipeline"""
+    return Pipeline([
+        ('tfidf', TfidfVectorizer(max_features=1000, stop_words='english')),
+        ('classifier', MultinomialNB())
+    ])
+
+
+def build_incremental_pipeline() -> Pipeline:
+    """Create an untrained hashing + naive Bayes pipeline that supports partial_fit"""
+    return Pipeline([
+        ('hashing', HashingVectorizer(
+            n_features=HASHING_FEATURES,
+            stop_words='english',
+            alternate_sign=False
+        )),
+        ('classifier', MultinomialNB())
+    ])
+
+
+def is_incremental(pipeline: Pipeline) -> bool:
+    """Whether a pipeline can be updated with partial_fit"""
+    return 'hashing' in pipeline.named_steps
+
 
 class TextClassifier:
     """Text classification service using ML"""
 
-    def __init__(self):
-        """Initialize classifier"""
-        self.pipeline = Pipeline([
-            ('tfidf', TfidfVectorizer(max_features=1000, stop_words='english')),
-            ('classifier', MultinomialNB())
-        ])
-        self.is_trained = False
-        self.classes_ = None
+    def __init__(
+        self,
+        store: Optional[ClassifierModelStore] = None,
+        lexicon: Optional[LexiconEngine] = None
+    ):
+        """
+        Initialize classifier
 
-    def train(self, texts: List[str], labels: List[str]) -> None:
+        Args:
+            store: Model store to persist trained versions to; the active
+                stored version is loaded immediately
+            lexicon: Keyword lexicons for rule-based sentiment (defaults if omitted)
         """
-        Train the classifier
+        self.store = store
+        self.lexicon = lexicon or LexiconEngine()
+        # Readers take one reference to the pipeline per call, so replacing
+        # this attribute swaps models atomically for in-flight requests
+        self.pipeline = build_pipeline()
+        self.version: Optional[str] = None
+        # Progressive-validation record of incremental batches for the live model
+        self.history: deque = deque(maxlen=HISTORY_SIZE)
+        # Serializes writers; predictions never take it
+        self._train_lock = threading.Lock()
+
+        if store is not None:
+            loaded = store.load()
+            if loaded is not None:
+                pipeline, metadata = loaded
+                self.swap(pipeline, metadata['version'], metadata.get('history'))
+
+    @property
+    def is_trained(self) -> bool:
+        return hasattr(self.pipeline, 'classes_')
+
+    @property
+    def classes_(self) -> Optional[List[str]]:
+        pipeline = self.pipeline
+        return pipeline.classes_.tolist() if hasattr(pipeline, 'classes_') else None
+
+    def train(self, texts: List[str], labels: List[str]) -> Dict[str, Any]:
+        """
+        Train a new model, persist it if a store is configured, and swap it in
+
+        Predictions keep using the previous model until the new one is fitted.
 
         Args:
             texts: List of training texts
             labels: List of corresponding labels
+
+        Returns:
+            Metadata of the new model version
+        """
+        pipeline = build_pipeline()
+        pipeline.fit(texts, labels)
+        metadata = {
+            'mode': 'batch',
+            'classes': pipeline.classes_.tolist(),
+            'training_samples': len(texts),
+        }
+
+        with self._train_lock:
+            if self.store is not None:
+                metadata = self.store.save(pipeline, metadata)
+            else:
+                metadata['version'] = None
+
+            self.swap(pipeline, metadata['version'])
+        return metadata
+
+    def partial_train(
+        self,
+        texts: List[str],
+        labels: List[str],
+        classes: Optional[List[str]] = None,
+        save: bool = False,
+        reset: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Update the live model with one mini-batch of labelled texts
+
+        Each batch is scored by the current model before it is learned from
+        (progressive validation), so the returned accuracy is measured on
+        unseen data. partial_fit runs on a copy of the naive Bayes estimator
+        that is swapped in once updated, so predictions running meanwhile
+        see either the previous or the updated model, never a mix. A live
+        model from a full `train` cannot be updated, since its TF-IDF
+        vocabulary cannot grow; replacing it needs reset=True.
+
+        Args:
+            texts: Mini-batch of texts
+            labels: Corresponding labels
+            classes: Full label set; required on the first batch when it does
+                not contain every label that later batches will use
+            save: Persist the updated model as a new store version
+            reset: Start a new incremental model from this batch, discarding
+                the live model and its history
+
+        Returns:
+            Metadata of the updated model, including this batch's 'batch' record
+        """
+        if len(texts) != len(labels):
+            raise ValueError("texts and labels must have the same length")
+        if not texts:
+            raise ValueError("At least one labelled text is required")
+        if save and self.store is None:
+            raise ValueError("No model store configured (set CLASSIFIER_MODEL_DIR)")
+
+        with self._train_lock:
+            current = self.pipeline
+            trained = hasattr(current, 'classes_')
+            if trained and not reset and not is_incremental(current):
+                raise ValueError(
+                    "The live model was trained on a full corpus and cannot be updated "
+                    "incrementally; pass reset=True to replace it with an incremental model"
+                )
+            if trained and not reset:
+                # partial_fit mutates its counts in place, so update a copy
+                pipeline = Pipeline([
+                    ('hashing', current.named_steps['hashing']),
+                    ('classifier', copy.deepcopy(current.named_steps['classifier'])),
+                ])
+                known = set(pipeline.classes_.tolist())
+                unknown = sorted(set(labels) - known)
+                if unknown:
+                    raise ValueError(
+                        f"Unknown labels {unknown}; retrain to add classes to the model"
+                    )
+                history = list(self.history)
+                classes = None
+            else:
+                pipeline = build_incremental_pipeline()
+                classes = sorted(set(classes or []) | set(labels))
+                history = []
+
+            features = pipeline.named_steps['hashing'].transform(texts)
+            model = pipeline.named_steps['classifier']
+            accuracy = None
+            if hasattr(model, 'classes_'):
+                accuracy = float(np.mean(model.predict(features) == np.asarray(labels)))
+            model.partial_fit(features, labels, classes=classes)
+
+            samples = (history[-1]['total_samples'] if history else 0) + len(texts)
+            scored = [entry for entry in history if entry['accuracy'] is not None]
+            if accuracy is not None:
+                scored.append({'accuracy': accuracy, 'samples': len(texts)})
+            cumulative = None
+            if scored:
+                cumulative = (
+                    sum(entry['accuracy'] * entry['samples'] for entry in scored)
+                    / sum(entry['samples'] for entry in scored)
+                )
+            batch = {
+                'batch': (history[-1]['batch'] if history else 0) + 1,
+                'samples': len(texts),
+                'total_samples': samples,
+                'accuracy': accuracy,
+                'cumulative_accuracy': cumulative,
+            }
+            history.append(batch)
+
+            metadata = {
+                'mode': 'incremental',
+                'classes': [str(name) for name in model.classes_],
+                'training_samples': samples,
+                'history': history[-HISTORY_SIZE:],
+            }
+            if save:
+                metadata = self.store.save(pipeline, metadata)
+            else:
+                metadata['version'] = None
+            self.swap(pipeline, metadata['version'], history)
+
+        return {**metadata, 'batch': batch}
+
+    def swap(
+        self,
+        pipeline: Pipeline,
+        version: Optional[str] = None,
+        history: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Make a fitted pipeline the active model
+
+        Args:
+            pipeline: Fitted pipeline
+            version: Store version it came from, if any
+            history: Incremental training record of the pipeline, if any
+        """
+        self.pipeline = pipeline
+        self.version = version
+        self.history = deque(history or [], maxlen=HISTORY_SIZE)
+
+    def rollback(self, version: Optional[str] = None) -> Dict[str, Any]:
         """
-        self.pipeline.fit(texts, labels)
-        self.classes_ = self.pipeline.classes_.tolist()
-        self.is_trained = True
+        Reactivate a stored version
+
+        Args:
+            version: Version to restore, or None for the one before the active version
+
+        Returns:
+            Metadata of the restored version
+        """
+        if self.store is None:
+            raise ValueError("No model store configured (set CLASSIFIER_MODEL_DIR)")
+        if version is None:
+            version = self.store.previous_version()
+            if version is None:
+                raise ValueError("No earlier model version to roll back to")
+
+        with self._train_lock:
+            pipeline, metadata = self.store.load(version)
+            self.store.activate(version)
+            self.swap(pipeline, version, metadata.get('history'))
+        return metadata
+
+    def list_versions(self) -> List[Dict[str, Any]]:
+        """Stored model versions, oldest first (empty without a store)"""
+        return self.store.list_versions() if self.store is not None else []
+
+    def training_history(self) -> List[Dict[str, Any]]:
+        """Progressive-validation accuracy per incremental batch of the live model"""
+        return list(self.history)
 
     def predict(self, text: str) -> str:
         """
@@ -43,10 +281,11 @@ class TextClassifier:
         Returns:
             Predicted label
         """
-        if not self.is_trained:
+        pipeline = self.pipeline
+        if not hasattr(pipeline, 'classes_'):
             raise ValueError("Classifier must be trained before prediction")
 
-        prediction = self.pipeline.predict([text])[0]
+        prediction = pipeline.predict([text])[0]
         return str(prediction)
 
     def predict_proba(self, text: str) -> Dict[str, float]:
@@ -59,15 +298,87 @@ class TextClassifier:
         Returns:
             Dictionary mapping class names to probabilities
         """
-        if not self.is_trained:
+        pipeline = self.pipeline
+        if not hasattr(pipeline, 'classes_'):
+            raise ValueError("Classifier must be trained before prediction")
+
+        probabilities = pipeline.predict_proba([text])[0]
+        return {
+            str(class_name): float(prob)
+            for class_name, prob in zip(pipeline.classes_, probabilities)
+        }
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        """
+        Predict the label and class probabilities of one text in a single pass
+
+        Args:
+            text: Input text
+
+        Returns:
+            Dictionary with 'label' and 'probabilities' (class name to probability)
+        """
+        pipeline = self.pipeline
+        if not hasattr(pipeline, 'classes_'):
             raise ValueError("Classifier must be trained before prediction")
 
-        probabilities = self.pipeline.predict_proba([text])[0]
+        probabilities = pipeline.predict_proba([text])[0]
+        classes = pipeline.classes_
         return {
-            class_name: float(prob)
-            for class_name, prob in zip(self.classes_, probabilities)
+            'label': str(classes[int(np.argmax(probabilities))]),
+            'probabilities': {
+                str(class_name): float(prob)
+                for class_name, prob in zip(classes, probabilities)
+            },
         }
 
+    def predict_batch(self, texts: List[str], top_k: int = 1) -> Dict[str, Any]:
+        """
+        Classify many texts with one vectorizer pass
+
+        Labels are the argmax of the probability matrix, so the model runs once.
+
+        Args:
+            texts: Input texts
+            top_k: Number of most probable labels returned per text
+
+        Returns:
+            Dictionary with 'predictions' (label, probability and the top_k
+            labels per text) and the model 'version' that produced them
+        """
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+
+        pipeline = self.pipeline
+        version = self.version
+        if not hasattr(pipeline, 'classes_'):
+            raise ValueError("Classifier must be trained before prediction")
+        if not texts:
+            return {'predictions': [], 'version': version}
+
+        probabilities = pipeline.predict_proba(texts)
+        classes = np.asarray([str(name) for name in pipeline.classes_], dtype=object)
+        k = min(top_k, len(classes))
+
+        # Column indices of the k largest probabilities per row, best first; the
+        # stable sort breaks ties like argmax does, so top_k[0] is the label
+        top = np.argsort(-probabilities, axis=1, kind='stable')[:, :k]
+        top_labels = classes[top].tolist()
+        top_probabilities = np.take_along_axis(probabilities, top, axis=1).tolist()
+
+        predictions = [
+            {
+                'label': labels[0],
+                'probability': probs[0],
+                'top_k': [
+                    {'label': label, 'probability': prob}
+                    for label, prob in zip(labels, probs)
+                ],
+            }
+            for labels, probs in zip(top_labels, top_probabilities)
+        ]
+        return {'predictions': predictions, 'version': version}
+
     def classify_sentiment(self, text: str) -> Dict[str, Any]:
         """
         Classify text sentiment (positive, neutral, negative)
@@ -78,28 +389,17 @@ class TextClassifier:
         Returns:
             Dictionary with sentiment classification
         """
-        # Simple rule-based sentiment (can be enhanced with ML model)
-        positive_words = ['good', 'great', 'excellent', 'amazing', 'love', 'happy', 'satisfied']
-        negative_words = ['bad', 'terrible', 'awful', 'hate', 'angry', 'disappointed', 'poor']
+        # Rule-based sentiment from the weighted lexicons (can be enhanced with ML model)
+        return sentiment_from_scores(self.lexicon.score(text))
 
-        text_lower = text.lower()
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
-
-        if positive_count > negative_count:
-            sentiment = 'positive'
-            confidence = min(0.9, 0.5 + (positive_count - negative_count) * 0.1)
-        elif negative_count > positive_count:
-            sentiment = 'negative'
-            confidence = min(0.9, 0.5 + (negative_count - positive_count) * 0.1)
-        else:
-            sentiment = 'neutral'
-            confidence = 0.5
+    def classify_sentiment_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Classify the sentiment of many texts with one compiled matcher
 
-        return {
-            'sentiment': sentiment,
-            'confidence': confidence,
-            'positive_score': positive_count,
-            'negative_score': negative_count
-        }
+        Args:
+            texts: Input texts
 
+        Returns:
+            One sentiment classification per text
+        """
+        return [sentiment_from_scores(scores) for scores in self.lexicon.score_batch(texts)]
@@ -0,0 +1,278 @@
+"""
+Linear classification heads over sentence embeddings (sentiment, urgency, intent)
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+import os
+import re
+import threading
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from .embeddings import EmbeddingService
+from .model_store import ClassifierModelStore
+
+# Label an 'urgency' head scores as urgent
+URGENT_LABEL = 'urgent'
+
+_HEAD_NAME = re.compile(r'^[a-z0-9_-]{1,64}$')
+
+
+def head_probabilities(model: LogisticRegression, matrix: np.ndarray) -> np.ndarray:
+    """
+    Class probabilities of a fitted logistic regression
+
+    Computed directly from the coefficients (sigmoid or softmax), which avoids
+    scikit-learn's per-call validation overhead for single-row requests.
+
+    Args:
+        model: Fitted LogisticRegression
+        matrix: Embeddings, shape (rows, dimension)
+
+    Returns:
+        Probabilities, shape (rows, classes), columns in model.classes_ order
+    """
+    scores = matrix @ model.coef_.T.astype(matrix.dtype, copy=False) + model.intercept_
+    if scores.shape[1] == 1:
+        positive = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+        return np.column_stack([1.0 - positive, positive])
+    scores -= scores.max(axis=1, keepdims=True)
+    np.exp(scores, out=scores)
+    scores /= scores.sum(axis=1, keepdims=True)
+    return scores
+
+
+class EmbeddingHeads:
+    """Named logistic-regression heads trained on cached sentence embeddings"""
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        model_dir: Optional[str] = None,
+        keep: int = 5
+    ):
+        """
+        Initialize embedding heads
+
+        Args:
+            embedding_service: Service producing (and caching) the embeddings
+            model_dir: Directory for persisted heads ('head-<name>' version
+                stores); stored heads are loaded immediately
+            keep: Versions retained per head
+        """
+        self.embedding_service = embedding_service
+        self.model_dir = model_dir
+        self.keep = keep
+        # name -> (model, metadata); replaced wholesale so readers need no lock
+        self._heads: Dict[str, Tuple[LogisticRegression, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+        if model_dir and os.path.isdir(model_dir):
+            for entry in sorted(os.listdir(model_dir)):
+                if entry.startswith('head-'):
+                    self._load(entry[len('head-'):])
+
+    @classmethod
+    def from_env(cls, embedding_service: EmbeddingService) -> 'EmbeddingHeads':
+        """Create heads persisted under CLASSIFIER_MODEL_DIR (memory only when unset)"""
+        return cls(
+            embedding_service,
+            model_dir=os.getenv('CLASSIFIER_MODEL_DIR') or None,
+            keep=int(os.getenv('CLASSIFIER_MODEL_KEEP', '5'))
+        )
+
+    def names(self) -> List[str]:
+        """Names of the trained heads"""
+        return sorted(self._heads)
+
+    def is_trained(self, name: str) -> bool:
+        return name in self._heads
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Metadata of every trained head"""
+        return [
+            {'name': name, **metadata}
+            for name, (_, metadata) in sorted(self._heads.items())
+        ]
+
+    def train(self, name: str, texts: List[str], labels: List[str]) -> Dict[str, Any]:
+        """
+        Fit a head on the embeddings of labelled texts and swap it in
+
+        Args:
+            name: Head name, e.g. 'sentiment', 'urgency' or 'intent'
+            texts: Training texts (embeddings are served from the cache when present)
+            labels: Corresponding labels
+
+        Returns:
+            Metadata of the new head version
+        """
+        if not _HEAD_NAME.match(name):
+            raise ValueError("Head names may only contain a-z, 0-9, '_' and '-'")
+        if len(texts) != len(labels):
+            raise ValueError("texts and labels must have the same length")
+        if len(set(labels)) < 2:
+            raise ValueError("At least two distinct labels are required")
+        if name == 'urgency' and URGENT_LABEL not in labels:
+            raise ValueError(f"The urgency head needs examples labelled '{URGENT_LABEL}'")
+
+        matrix = self.embedding_service.embed_matrix(texts)
+        model = LogisticRegression(max_iter=1000)
+        model.fit(matrix, labels)
+        metadata = {
+            'mode': 'embedding',
+            'classes': [str(label) for label in model.classes_],
+            'training_samples': len(texts),
+            'embedding_model': self.embedding_service.model_name,
+            'dimension': int(matrix.shape[1]),
+        }
+
+        with self._lock:
+            store = self._store(name)
+            if store is not None:
+                metadata = store.save(model, metadata)
+            else:
+                metadata['version'] = None
+            self._heads = {**self._heads, name: (model, metadata)}
+        return metadata
+
+    def predict_matrix(self, name: str, matrix: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        """
+        Class probabilities of a head for precomputed embeddings
+
+        Args:
+            name: Head name
+            matrix: Embeddings, shape (rows, dimension)
+
+        Returns:
+            (class labels, probabilities of shape (rows, classes))
+        """
+        model, metadata = self._get(name)
+        if matrix.shape[1] != metadata['dimension']:
+            raise ValueError(
+                f"Head '{name}' expects {metadata['dimension']}-dimensional embeddings"
+            )
+        return metadata['classes'], head_probabilities(model, matrix)
+
+    def classify_matrix(self, name: str, matrix: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Label and class probabilities of each row of an embedding matrix
+
+        Args:
+            name: Head name
+            matrix: Embeddings, shape (rows, dimension)
+
+        Returns:
+            One {'label', 'confidence', 'probabilities'} dictionary per row
+        """
+        classes, probabilities = self.predict_matrix(name, matrix)
+        best = probabilities.argmax(axis=1).tolist()
+        return [
+            {
+                'label': classes[column],
+                'confidence': row[column],
+                'probabilities': dict(zip(classes, row)),
+            }
+            for column, row in zip(best, probabilities.tolist())
+        ]
+
+    def classify_vector(self, name: str, vector: np.ndarray) -> Dict[str, Any]:
+        """
+        Label and class probabilities of one embedding
+
+        Args:
+            name: Head name
+            vector: Embedding of the text
+
+        Returns:
+            Dictionary with 'label', 'confidence' and 'probabilities'
+        """
+        return self.classify_matrix(name, np.asarray(vector)[None, :])[0]
+
+    def classify_text(self, name: str, text: str) -> Dict[str, Any]:
+        """Label and class probabilities of one text (see classify_vector)"""
+        self._get(name)
+        return self.classify_vector(name, self.embedding_service.embed_matrix([text])[0])
+
+    def predict_batch(self, name: str, texts: List[str], top_k: int = 1) -> Dict[str, Any]:
+        """
+        Classify many texts with one embedding pass
+
+        Args:
+            name: Head name
+            texts: Input texts
+            top_k: Number of most probable labels returned per text
+
+        Returns:
+            Dictionary with 'predictions' and the head 'version' (same shape
+            as TextClassifier.predict_batch)
+        """
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        _, metadata = self._get(name)
+        if not texts:
+            return {'predictions': [], 'version': metadata['version']}
+
+        classes, probabilities = self.predict_matrix(
+            name, self.embedding_service.embed_matrix(texts)
+        )
+        labels = np.asarray(classes, dtype=object)
+        top = np.argsort(-probabilities, axis=1, kind='stable')[:, :min(top_k, len(classes))]
+        top_labels = labels[top].tolist()
+        top_probabilities = np.take_along_axis(probabilities, top, axis=1).tolist()
+
+        predictions = [
+            {
+                'label': row_labels[0],
+                'probability': row_probs[0],
+                'top_k': [
+                    {'label': label, 'probability': prob}
+                    for label, prob in zip(row_labels, row_probs)
+                ],
+            }
+            for row_labels, row_probs in zip(top_labels, top_probabilities)
+        ]
+        return {'predictions': predictions, 'version': metadata['version']}
+
+    def sentiment(self, vector: np.ndarray) -> Dict[str, Any]:
+        """
+        Sentiment from the 'sentiment' head, shaped like the rule-based result
+
+        Args:
+            vector: Embedding of the text
+
+        Returns:
+            Dictionary with 'sentiment', 'confidence' and 'probabilities'
+        """
+        result = self.classify_vector('sentiment', vector)
+        return {
+            'sentiment': result['label'],
+            'confidence': result['confidence'],
+            'probabilities': result['probabilities'],
+        }
+
+    def urgency(self, vector: np.ndarray) -> float:
+        """Probability of the 'urgent' label under the 'urgency' head"""
+        return self.classify_vector('urgency', vector)['probabilities'].get(URGENT_LABEL, 0.0)
+
+    def _get(self, name: str) -> Tuple[LogisticRegression, Dict[str, Any]]:
+        head = self._heads.get(name)
+        if head is None:
+            raise KeyError(f"Embedding head '{name}' is not trained")
+        return head
+
+    def _store(self, name: str) -> Optional[ClassifierModelStore]:
+        if not self.model_dir:
+            return None
+        return ClassifierModelStore(os.path.join(self.model_dir, f'head-{name}'), self.keep)
+
+    def _load(self, name: str) -> None:
+        """Load the active stored version of a head if it matches the embedding model"""
+        store = self._store(name)
+        loaded = store.load() if store is not None else None
+        if loaded is None:
+            return
+        model, metadata = loaded
+        if metadata.get('embedding_model') != self.embedding_service.model_name:
+            return
+        self._heads[name] = (model, metadata)
@@ -2,23 +2,54 @@
 Embedding service for text vectorization
 """
 
-from typing import List, Optional
-from sentence_transformers import SentenceTransformer
+from typing import List, Optional, TYPE_CHECKING
+import threading
 import numpy as np
 
+from .cache import EmbeddingCache, cache_key
+from .vector_index import normalize_rows, top_k as top_k_indices
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
 
 class EmbeddingService:
     """Service for generating text embeddings"""
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        cache: Optional[EmbeddingCache] = None
+    ):
         """
         Initialize embedding service
 
         Args:
             model_name: HuggingFace model name for embeddings
+            cache: Embedding cache (defaults to one configured from the environment)
         """
-        self.model = SentenceTransformer(model_name)
         self.model_name = model_name
+        self.cache = cache if cache is not None else EmbeddingCache.from_env()
+        self._model: Optional['SentenceTransformer'] = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def model(self) -> 'SentenceTransformer':
+        """The SentenceTransformer, imported and loaded on first use"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def warm_up(self) -> None:
+        """Load the model and run one forward pass (bypassing the cache)"""
+        self.model.encode(["warm up"], convert_to_numpy=True)
 
     def embed(self, text: str) -> List[float]:
         """
@@ -30,8 +61,7 @@ class EmbeddingService:
         Returns:
             List of float values representing the embedding
         """
-        embedding = self.model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
+        return self.embed_matrix([text])[0].tolist()
 
     def embed_batch(self, texts: List[str]) -> List[List[float]]:
         """
@@ -43,8 +73,43 @@ class EmbeddingService:
         Returns:
             List of embeddings
         """
-        embeddings = self.model.encode(texts, convert_to_numpy=True)
-        return embeddings.tolist()
+        return self.embed_matrix(texts).tolist()
+
+    def embed_matrix(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embeddings as a float32 matrix, encoding only cache misses
+
+        Args:
+            texts: List of texts to embed
+
+        Returns:
+            Array of shape (len(texts), dimension), rows in input order
+        """
+        keys = [cache_key(self.model_name, text) for text in texts]
+        cached = self.cache.get_many(keys)
+
+        # Encode each distinct missing key once, even if repeated in the batch
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        if missing:
+            encoded = self.model.encode(list(missing.values()), convert_to_numpy=True)
+            encoded = np.asarray(encoded, dtype=np.float32)
+            fresh = dict(zip(missing.keys(), encoded))
+            self.cache.put_many(fresh)
+            cached.update(fresh)
+
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        return np.stack([cached[key] for key in keys])
+
+    @property
+    def dimension(self) -> int:
+        """Embedding dimension of the loaded model"""
+        return int(self.model.get_sentence_embedding_dimension())
 
     def similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """
@@ -57,8 +122,8 @@ class EmbeddingService:
         Returns:
             Similarity score between 0 and 1
         """
-        vec1 = np.array(embedding1)
-        vec2 = np.array(embedding2)
+        vec1 = np.asarray(embedding1, dtype=np.float32)
+        vec2 = np.asarray(embedding2, dtype=np.float32)
 
         dot_product = np.dot(vec1, vec2)
         norm1 = np.linalg.norm(vec1)
@@ -86,16 +151,13 @@ class EmbeddingService:
         Returns:
             List of (index, similarity_score) tuples
         """
-        query_vec = np.array(query_embedding)
-        candidates = np.array(candidate_embeddings)
-
-        # Calculate cosine similarities
-        similarities = np.dot(candidates, query_vec) / (
-            np.linalg.norm(candidates, axis=1) * np.linalg.norm(query_vec)
-        )
+        candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+        if candidates.size == 0:
+            return []
 
-        # Get top k indices
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+        # Cosine similarities as one matrix-vector product on normalized rows
+        query_vec = normalize_rows(query_embedding)[0]
+        similarities = normalize_rows(candidates) @ query_vec
 
-        return [(int(idx), float(similarities[idx])) for idx in top_indices]
+        return [(int(idx), float(similarities[idx])) for idx in top_k_indices(similarities, top_k)]
 
@@ -0,0 +1,423 @@
+"""
+Forecasting models vectorized across series, with backtesting and fitted-model caching
+"""
+
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from collections import OrderedDict
+import hashlib
+import itertools
+import os
+import threading
+import numpy as np
+
+METHODS = (
+    'mean',
+    'moving_average',
+    'seasonal_naive',
+    'linear_trend',
+    'ses',
+    'holt',
+    'holt_winters',
+)
+
+# Smoothing parameter grids searched per series (by one-step-ahead squared error)
+ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+BETAS = (0.01, 0.05, 0.1, 0.2, 0.3)
+GAMMAS = (0.05, 0.1, 0.2, 0.3, 0.5)
+
+DEFAULT_SEASON_LENGTH = 7
+# Longest accepted season (a yearly cycle of daily data)
+MAX_SEASON_LENGTH = 366
+# Longest forecast (about three years of daily data) and most backtest folds
+MAX_PERIODS = 1096
+MAX_FOLDS = 100
+
+# Series fitted together per call in forecast_many; bounds the grid-search state
+_FIT_CHUNK = 512
+# Budget for holt_winters' per-candidate season state in one forecast_many fit
+_FIT_STATE_BYTES = 64 * 1024 * 1024
+
+
+class FittedModel:
+    """Final state of one method fitted to a stack of equal-length series"""
+
+    def __init__(
+        self,
+        method: str,
+        length: int,
+        state: Dict[str, np.ndarray],
+        params: Optional[Dict[str, np.ndarray]] = None
+    ):
+        """
+        Initialize fitted model
+
+        Args:
+            method: Forecasting method name
+            length: Number of observations each series was fitted on
+            state: Per-series arrays the forecast is computed from
+            params: Per-series smoothing parameters chosen by the grid search
+        """
+        self.method = method
+        self.length = length
+        self.state = state
+        self.params = params or {}
+
+    def predict(self, periods: int) -> np.ndarray:
+        """
+        Forecast every series
+
+        Args:
+            periods: Number of periods to forecast
+
+        Returns:
+            Array of shape (series, periods)
+        """
+        if not 1 <= periods <= MAX_PERIODS:
+            raise ValueError(f"periods must be between 1 and {MAX_PERIODS}")
+        steps = np.arange(1, periods + 1, dtype=np.float64)
+        state = self.state
+
+        if self.method in ('mean', 'ses'):
+            return np.repeat(state['level'][:, None], periods, axis=1)
+
+        if self.method in ('moving_average', 'holt', 'linear_trend'):
+            return state['level'][:, None] + state['trend'][:, None] * steps
+
+        season = state['season']
+        m = season.shape[1]
+        # Season slot of each future time step T - 1 + h
+        slots = (self.length - 1 + steps.astype(np.int64)) % m
+        if self.method == 'seasonal_naive':
+            return season[:, slots]
+        return state['level'][:, None] + state['trend'][:, None] * steps + season[:, slots]
+
+
+def _grid(*axes: Sequence[float]) -> Tuple[np.ndarray, ...]:
+    """Cartesian product of parameter axes as one flat array per axis"""
+    combos = np.array(list(itertools.product(*axes)), dtype=np.float64)
+    return tuple(combos[:, i] for i in range(combos.shape[1]))
+
+
+def _best(sse: np.ndarray, *arrays: np.ndarray) -> List[np.ndarray]:
+    """Pick, per series, the grid entry with the lowest error"""
+    choice = np.argmin(sse, axis=1)
+    rows = np.arange(sse.shape[0])
+    return [array[rows, choice] if array.ndim == 2 else array[choice] for array in arrays]
+
+
+def fit(
+    matrix: np.ndarray,
+    method: str = 'moving_average',
+    season_length: Optional[int] = None
+) -> FittedModel:
+    """
+    Fit one method to a stack of equal-length series
+
+    Exponential smoothing models run a single pass over time, updating every
+    series and every grid candidate together, then keep the candidate with the
+    lowest one-step-ahead squared error for each series.
+
+    Args:
+        matrix: Array of shape (series, observations)
+        method: One of METHODS
+        season_length: Season period for seasonal methods (default 7)
+
+    Returns:
+        Fitted model
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown forecasting method: {method}. Use one of {', '.join(METHODS)}")
+
+    y = np.asarray(matrix, dtype=np.float64)
+    if y.ndim != 2:
+        raise ValueError("Expected a 2-D array of shape (series, observations)")
+    count, length = y.shape
+    m = season_length or DEFAULT_SEASON_LENGTH
+    if not 2 <= m <= MAX_SEASON_LENGTH:
+        raise ValueError(f"season_length must be between 2 and {MAX_SEASON_LENGTH}")
+    zeros = np.zeros(count)
+
+    if length == 0:
+        if method not in ('mean', 'moving_average'):
+            raise ValueError(f"{method} needs at least one observation")
+        return FittedModel(method, 0, {'level': zeros, 'trend': zeros})
+
+    if method == 'mean':
+        return FittedModel(method, length, {'level': y.mean(axis=1)})
+
+    if method == 'moving_average':
+        window = min(7, length)
+        tail = y[:, -window:]
+        trend = (y[:, -1] - y[:, -window]) / window
+        return FittedModel(method, length, {'level': tail.mean(axis=1), 'trend': trend})
+
+    if method == 'linear_trend':
+        x = np.arange(length, dtype=np.float64)
+        x_centered = x - x.mean()
+        slope = zeros
+        if length > 1:
+            slope = (y - y.mean(axis=1, keepdims=True)) @ x_centered / (x_centered ** 2).sum()
+        # Anchor the level at the last observed time step
+        level = y.mean(axis=1) + slope * (length - 1 - x.mean())
+        return FittedModel(method, length, {'level': level, 'trend': slope})
+
+    if method == 'seasonal_naive':
+        if length < m:
+            raise ValueError(f"seasonal_naive needs at least {m} observations")
+        # season[:, k] holds the latest value observed in slot k (time % m == k)
+        last = y[:, -m:]
+        slots = np.arange(length - m, length) % m
+        season = np.empty_like(last)
+        season[:, slots] = last
+        return FittedModel(method, length, {'season': season})
+
+    if method == 'ses':
+        (alpha,) = _grid(ALPHAS)
+        level = np.repeat(y[:, :1], len(alpha), axis=1)
+        sse = np.zeros_like(level)
+        for t in range(1, length):
+            error = y[:, t:t + 1] - level
+            sse += error ** 2
+            level += alpha * error
+        level, alpha = _best(sse, level, alpha)
+        return FittedModel(method, length, {'level': level}, {'alpha': alpha})
+
+    if method == 'holt':
+        if length < 2:
+            raise ValueError("holt needs at least 2 observations")
+        alpha, beta = _grid(ALPHAS, BETAS)
+        level = np.repeat(y[:, :1], len(alpha), axis=1)
+        trend = np.repeat(y[:, 1:2] - y[:, :1], len(alpha), axis=1)
+        sse = np.zeros_like(level)
+        for t in range(1, length):
+            error = y[:, t:t + 1] - (level + trend)
+            sse += error ** 2
+            level += trend + alpha * error
+            trend += alpha * beta * error
+        level, trend, alpha, beta = _best(sse, level, trend, alpha, beta)
+        return FittedModel(
+            method, length, {'level': level, 'trend': trend}, {'alpha': alpha, 'beta': beta}
+        )
+
+    # Additive Holt-Winters in error-correction form
+    if m > length // 2:
+        raise ValueError(f"holt_winters needs at least {2 * m} observations (two seasons)")
+    alpha, beta, gamma = _grid(ALPHAS, BETAS, GAMMAS)
+    candidates = len(alpha)
+    first, second = y[:, :m].mean(axis=1), y[:, m:2 * m].mean(axis=1)
+    level = np.repeat(first[:, None], candidates, axis=1)
+    trend = np.repeat(((second - first) / m)[:, None], candidates, axis=1)
+    season = np.repeat((y[:, :m] - first[:, None])[:, None, :], candidates, axis=1)
+    sse = np.zeros_like(level)
+    for t in range(m, length):
+        slot = t % m
+        error = y[:, t:t + 1] - (level + trend + season[:, :, slot])
+        sse += error ** 2
+        level += trend + alpha * error
+        trend += alpha * beta * error
+        season[:, :, slot] += gamma * error
+
+    choice = np.argmin(sse, axis=1)
+    rows = np.arange(count)
+    return FittedModel(
+        method,
+        length,
+        {
+            'level': level[rows, choice],
+            'trend': trend[rows, choice],
+            'season': season[rows, choice],
+        },
+        {'alpha': alpha[choice], 'beta': beta[choice], 'gamma': gamma[choice]}
+    )
+
+
+class FitCache:
+    """LRU cache of single-series fitted models keyed by method and series content"""
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Number of fitted models kept (0 disables caching)
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, FittedModel]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> 'FitCache':
+        """Create a cache sized from FORECAST_CACHE_SIZE"""
+        return cls(max_entries=int(os.getenv('FORECAST_CACHE_SIZE', '1024')))
+
+    @staticmethod
+    def key(values: np.ndarray, method: str, season_length: Optional[int]) -> str:
+        digest = hashlib.sha1(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+        return f'{method}:{season_length or DEFAULT_SEASON_LENGTH}:{digest.hexdigest()}'
+
+    def get(self, key: str) -> Optional[FittedModel]:
+        with self._lock:
+            model = self._entries.get(key)
+            if model is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return model
+
+    def put(self, key: str, model: FittedModel) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = model
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+            }
+
+
+# Per-process cache; worker processes each keep their own
+fit_cache = FitCache.from_env()
+
+
+def fit_series(
+    values: Sequence[float],
+    method: str = 'moving_average',
+    season_length: Optional[int] = None,
+    use_cache: bool = True
+) -> FittedModel:
+    """
+    Fit one series, reusing a cached model when the series is unchanged
+
+    Args:
+        values: Historical values
+        method: One of METHODS
+        season_length: Season period for seasonal methods
+        use_cache: Look up and store the fitted model in fit_cache
+
+    Returns:
+        Single-series fitted model
+    """
+    y = np.asarray(values, dtype=np.float64)
+    if not use_cache:
+        return fit(y[None, :], method, season_length)
+
+    key = FitCache.key(y, method, season_length)
+    model = fit_cache.get(key)
+    if model is None:
+        model = fit(y[None, :], method, season_length)
+        fit_cache.put(key, model)
+    return model
+
+
+def forecast_many(
+    series: Dict[str, Sequence[float]],
+    periods: int = 7,
+    method: str = 'moving_average',
+    season_length: Optional[int] = None
+) -> Dict[str, List[float]]:
+    """
+    Forecast many series with one vectorized fit per distinct history length
+
+    Args:
+        series: Historical values keyed by series id
+        periods: Number of periods to forecast
+        method: One of METHODS
+        season_length: Season period for seasonal methods
+
+    Returns:
+        Forecasts keyed by series id
+    """
+    by_length: Dict[int, List[str]] = {}
+    for name, values in series.items():
+        by_length.setdefault(len(values), []).append(name)
+
+    chunk_size = _FIT_CHUNK
+    if method == 'holt_winters':
+        # Each series carries a season of m values per grid candidate
+        candidates = len(ALPHAS) * len(BETAS) * len(GAMMAS)
+        m = season_length or DEFAULT_SEASON_LENGTH
+        chunk_size = max(1, min(_FIT_CHUNK, _FIT_STATE_BYTES // (candidates * m * 8)))
+
+    forecasts: Dict[str, List[float]] = {}
+    for names in by_length.values():
+        for start in range(0, len(names), chunk_size):
+            chunk = names[start:start + chunk_size]
+            matrix = np.array([series[name] for name in chunk], dtype=np.float64)
+            predictions = fit(matrix, method, season_length).predict(periods)
+            forecasts.update(zip(chunk, predictions.tolist()))
+    return {name: forecasts[name] for name in series}
+
+
+def backtest(
+    values: Sequence[float],
+    method: str = 'moving_average',
+    horizon: int = 7,
+    folds: int = 3,
+    season_length: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Rolling-origin evaluation: refit on each expanding prefix and score the
+    next horizon values
+
+    Args:
+        values: Historical values
+        method: One of METHODS
+        horizon: Periods forecast from each origin
+        folds: Number of origins, spaced horizon apart and ending at the last value
+        season_length: Season period for seasonal methods
+
+    Returns:
+        MAE and MAPE over all folds plus per-fold errors
+    """
+    y = np.asarray(values, dtype=np.float64)
+    if not 1 <= horizon <= MAX_PERIODS:
+        raise ValueError(f"horizon must be between 1 and {MAX_PERIODS}")
+    if not 1 <= folds <= MAX_FOLDS:
+        raise ValueError(f"folds must be between 1 and {MAX_FOLDS}")
+    first_origin = len(y) - horizon * folds
+    if first_origin < 1:
+        raise ValueError(f"Need more than {horizon * folds} observations for {folds} folds")
+
+    errors = []
+    actuals = []
+    fold_metrics = []
+    for origin in range(first_origin, len(y), horizon):
+        actual = y[origin:origin + horizon]
+        predicted = fit(y[None, :origin], method, season_length).predict(len(actual))[0]
+        error = actual - predicted
+        errors.append(error)
+        actuals.append(actual)
+        fold_metrics.append({
+            'origin': origin,
+            'mae': float(np.abs(error).mean()),
+            'mape': _mape(actual, error),
+        })
+
+    error = np.concatenate(errors)
+    actual = np.concatenate(actuals)
+    return {
+        'method': method,
+        'horizon': horizon,
+        'mae': float(np.abs(error).mean()),
+        'mape': _mape(actual, error),
+        'folds': fold_metrics,
+    }
+
+
+def _mape(actual: np.ndarray, error: np.ndarray) -> Optional[float]:
+    """Mean absolute percentage error over non-zero actuals (None if all are zero)"""
+    nonzero = actual != 0
+    if not nonzero.any():
+        return None
+    return float(np.mean(np.abs(error[nonzero] / actual[nonzero])) * 100)
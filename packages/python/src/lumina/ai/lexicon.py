@@ -0,0 +1,335 @@
+"""
+Weighted keyword lexicons compiled into a single-pass word-boundary matcher
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timezone
+import json
+import os
+import re
+import threading
+import time
+
+DEFAULT_CATEGORIES: Dict[str, Dict[str, float]] = {
+    'positive': {
+        'good': 1.0, 'great': 1.0, 'excellent': 1.0, 'amazing': 1.0, 'love': 1.0,
+        'loved': 1.0, 'happy': 1.0, 'satisfied': 1.0, 'awesome': 1.0, 'thank you': 1.0,
+    },
+    'negative': {
+        'bad': 1.0, 'terrible': 1.0, 'awful': 1.0, 'hate': 1.0, 'hated': 1.0,
+        'angry': 1.0, 'disappointed': 1.0, 'disappointing': 1.0, 'poor': 1.0,
+        'broken': 1.0, 'unacceptable': 1.0,
+    },
+    'urgency': {
+        'urgent': 1.0, 'urgently': 1.0, 'asap': 1.0, 'immediately': 1.0, 'critical': 1.0,
+        'emergency': 1.0, 'right away': 1.0,
+    },
+}
+DEFAULT_NEGATIONS = ('not', 'no', 'never', 'without', 'hardly', 'nothing', 'neither', 'nor')
+DEFAULT_NEGATION_WINDOW = 2
+# Category a negated match counts towards (None drops it); others are unaffected
+DEFAULT_NEGATED: Dict[str, Optional[str]] = {'positive': 'negative', 'negative': 'positive'}
+
+# Any other word, and the punctuation that ends a negation's scope
+_TOKEN = r"[\w']+|[.!?;]"
+_SCOPE_END = frozenset('.!?;')
+
+
+class Lexicon:
+    """Compiled weighted lexicons with negation handling"""
+
+    def __init__(
+        self,
+        categories: Dict[str, Dict[str, float]],
+        negations: Tuple[str, ...] = DEFAULT_NEGATIONS,
+        negation_window: int = DEFAULT_NEGATION_WINDOW,
+        negated: Optional[Dict[str, Optional[str]]] = None
+    ):
+        """
+        Compile lexicons
+
+        Args:
+            categories: Category name to {term: weight}; terms may be phrases
+            negations: Words that negate the following terms ("n't" words always do)
+            negation_window: Number of following words a negation applies to
+            negated: Category a negated match counts towards instead (None drops it)
+        """
+        if negation_window < 0:
+            raise ValueError("negation_window must not be negative")
+        negated = DEFAULT_NEGATED if negated is None else negated
+        unknown = [
+            name for name in list(negated) + [v for v in negated.values() if v is not None]
+            if name not in categories
+        ]
+        if unknown:
+            raise ValueError(f"Unknown categories in negated: {', '.join(sorted(set(unknown)))}")
+
+        self.categories = {
+            category: {
+                ' '.join(term.lower().split()): float(weight)
+                for term, weight in terms.items()
+            }
+            for category, terms in categories.items()
+        }
+        self.negations = frozenset(word.lower() for word in negations)
+        self.negation_window = negation_window
+        self.negated = dict(negated)
+
+        # Normalized term -> [(category, weight)] for every category using it
+        self._terms: Dict[str, List[Tuple[str, float]]] = {}
+        for category, terms in self.categories.items():
+            for term, weight in terms.items():
+                if term:
+                    self._terms.setdefault(term, []).append((category, weight))
+
+        # One alternation, longest terms first so phrases win over their words;
+        # the trailing lookahead keeps "bad" from matching inside "badge"
+        alternatives = '|'.join(
+            re.escape(term).replace(r'\ ', r'\s+')
+            for term in sorted(self._terms, key=len, reverse=True)
+        )
+        pattern = rf"\b(?:{alternatives})(?![\w'])|{_TOKEN}" if alternatives else _TOKEN
+        self._pattern = re.compile(pattern)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'Lexicon':
+        """
+        Build a lexicon from a configuration dictionary
+
+        Args:
+            config: Optional 'categories', 'negations', 'negation_window' and
+                'negated' keys; missing keys take the defaults
+
+        Returns:
+            Compiled lexicon
+        """
+        try:
+            return cls(
+                categories=config.get('categories') or DEFAULT_CATEGORIES,
+                negations=tuple(config.get('negations', DEFAULT_NEGATIONS)),
+                negation_window=int(config.get('negation_window', DEFAULT_NEGATION_WINDOW)),
+                negated=config.get('negated')
+            )
+        except (AttributeError, TypeError) as e:
+            raise ValueError(f"Invalid lexicon configuration: {e}")
+
+    def config(self) -> Dict[str, Any]:
+        """Configuration this lexicon was compiled from"""
+        return {
+            'categories': self.categories,
+            'negations': sorted(self.negations),
+            'negation_window': self.negation_window,
+            'negated': self.negated,
+        }
+
+    def score(self, text: str) -> Dict[str, float]:
+        """
+        Weighted score per category, from one scan of the text
+
+        Args:
+            text: Input text
+
+        Returns:
+            Dictionary mapping each category to the sum of its matched weights
+        """
+        terms = self._terms
+        negated = self.negated
+        scores = dict.fromkeys(self.categories, 0.0)
+        negate_until = -1
+
+        for position, match in enumerate(self._pattern.finditer(text.lower())):
+            token = match.group()
+            entries = terms.get(token)
+            if entries is None:
+                if token in _SCOPE_END:
+                    negate_until = -1
+                elif token in self.negations or token.endswith("n't"):
+                    negate_until = position + self.negation_window
+                elif not token.isalnum() and "'" not in token:
+                    # A phrase matched across irregular whitespace
+                    entries = terms.get(' '.join(token.split()))
+                if entries is None:
+                    continue
+
+            for category, weight in entries:
+                if position <= negate_until and category in negated:
+                    category = negated[category]
+                    if category is None:
+                        continue
+                scores[category] += weight
+
+        return scores
+
+    def score_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+        """
+        Score many texts with the same compiled matcher
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            One score dictionary per text
+        """
+        score = self.score
+        return [score(text) for text in texts]
+
+
+def sentiment_from_scores(scores: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Classify sentiment (positive, neutral, negative) from lexicon scores
+
+    Args:
+        scores: Lexicon scores with 'positive' and 'negative' categories
+
+    Returns:
+        Dictionary with sentiment classification
+    """
+    positive = scores.get('positive', 0.0)
+    negative = scores.get('negative', 0.0)
+
+    if positive > negative:
+        sentiment = 'positive'
+        confidence = min(0.9, 0.5 + (positive - negative) * 0.1)
+    elif negative > positive:
+        sentiment = 'negative'
+        confidence = min(0.9, 0.5 + (negative - positive) * 0.1)
+    else:
+        sentiment = 'neutral'
+        confidence = 0.5
+
+    return {
+        'sentiment': sentiment,
+        'confidence': confidence,
+        'positive_score': positive,
+        'negative_score': negative
+    }
+
+
+class LexiconEngine:
+    """Serves the current compiled lexicon and reloads it when its file changes"""
+
+    def __init__(self, path: Optional[str] = None, check_interval: float = 1.0):
+        """
+        Initialize lexicon engine
+
+        Args:
+            path: JSON lexicon file (defaults are used when None or missing)
+            check_interval: Minimum seconds between file modification checks
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self.loaded_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self._lexicon = Lexicon.from_config({})
+        self._mtime: Optional[int] = None
+        self._checked = time.monotonic()
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            self.reload()
+
+    @classmethod
+    def from_env(cls) -> 'LexiconEngine':
+        """Create an engine from LEXICON_PATH and LEXICON_RELOAD_INTERVAL_S"""
+        return cls(
+            path=os.getenv('LEXICON_PATH') or None,
+            check_interval=float(os.getenv('LEXICON_RELOAD_INTERVAL_S', '1.0'))
+        )
+
+    @property
+    def lexicon(self) -> Lexicon:
+        """Current compiled lexicon (picks up file changes)"""
+        self._check_file()
+        return self._lexicon
+
+    def score(self, text: str) -> Dict[str, float]:
+        """Weighted score per category for one text"""
+        return self.lexicon.score(text)
+
+    def score_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+        """Weighted scores per category for many texts"""
+        return self.lexicon.score_batch(texts)
+
+    def reload(self) -> Dict[str, Any]:
+        """
+        Recompile the lexicon from its file
+
+        Returns:
+            Description of the loaded lexicon
+        """
+        if not self.path:
+            raise ValueError("No lexicon file configured (set LEXICON_PATH)")
+
+        with self._lock:
+            mtime = os.stat(self.path).st_mtime_ns
+            with open(self.path) as f:
+                config = json.load(f)
+            if not isinstance(config, dict):
+                raise ValueError("Lexicon file must contain a JSON object")
+            self._swap(Lexicon.from_config(config), mtime)
+        return self.describe()
+
+    def update(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Replace the lexicon, writing it to the lexicon file when one is configured
+
+        Other worker processes watching the same file pick the change up on
+        their next modification check.
+
+        Args:
+            config: Lexicon configuration (see Lexicon.from_config)
+
+        Returns:
+            Description of the new lexicon
+        """
+        lexicon = Lexicon.from_config(config)
+
+        with self._lock:
+            mtime = None
+            if self.path:
+                tmp = self.path + '.tmp'
+                with open(tmp, 'w') as f:
+                    json.dump(lexicon.config(), f, indent=2)
+                os.replace(tmp, self.path)
+                mtime = os.stat(self.path).st_mtime_ns
+            self._swap(lexicon, mtime)
+        return self.describe()
+
+    def describe(self) -> Dict[str, Any]:
+        """Source, load time and configuration of the current lexicon"""
+        return {
+            'path': self.path,
+            'loaded_at': self.loaded_at,
+            'last_error': self.last_error,
+            **self._lexicon.config(),
+        }
+
+    def _swap(self, lexicon: Lexicon, mtime: Optional[int]) -> None:
+        """Make a compiled lexicon current (lock held)"""
+        self._lexicon = lexicon
+        self._mtime = mtime
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+        self.last_error = None
+
+    def _check_file(self) -> None:
+        """Reload when the lexicon file changed; a bad file keeps the previous lexicon"""
+        if not self.path:
+            return
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return
+        self._checked = now
+
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+
+        try:
+            self.reload()
+        except (OSError, ValueError) as e:
+            # Remember the failed file so it is not re-read on every call
+            self._mtime = mtime
+            self.last_error = str(e)
@@ -0,0 +1,176 @@
+"""
+Versioned on-disk store for trained classifier pipelines
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import shutil
+import threading
+import joblib
+import sklearn
+
+
+class ClassifierModelStore:
+    """Keeps the last N trained pipelines on disk with a pointer to the active one"""
+
+    _CURRENT = 'CURRENT'
+
+    def __init__(self, directory: str, keep: int = 5):
+        """
+        Initialize model store
+
+        Args:
+            directory: Root directory; each version lives in its own subdirectory
+            keep: Number of versions retained for rollback (including the active one)
+        """
+        if keep < 1:
+            raise ValueError("keep must be at least 1")
+        self.directory = directory
+        self.keep = keep
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> Optional['ClassifierModelStore']:
+        """Create a store from CLASSIFIER_MODEL_DIR (None when unset)"""
+        directory = os.getenv('CLASSIFIER_MODEL_DIR')
+        if not directory:
+            return None
+        return cls(directory, keep=int(os.getenv('CLASSIFIER_MODEL_KEEP', '5')))
+
+    def save(self, pipeline: Any, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Persist a fitted pipeline as a new version and make it the active one
+
+        The version directory is written under a temporary name and renamed
+        into place, so readers never see a partially written model.
+
+        Args:
+            pipeline: Fitted scikit-learn pipeline
+            metadata: Extra fields stored alongside the model (e.g. classes)
+
+        Returns:
+            The stored metadata, including the new 'version'
+        """
+        created = datetime.now(timezone.utc)
+        version = created.strftime('%Y%m%dT%H%M%S%fZ')
+        record = {
+            **(metadata or {}),
+            'version': version,
+            'created_at': created.isoformat(),
+            'sklearn_version': sklearn.__version__,
+            'python_version': platform.python_version(),
+        }
+
+        with self._lock:
+            staging = os.path.join(self.directory, f'.{version}.tmp')
+            os.makedirs(staging)
+            try:
+                joblib.dump(pipeline, os.path.join(staging, 'model.joblib'))
+                with open(os.path.join(staging, 'metadata.json'), 'w') as f:
+                    json.dump(record, f, indent=2)
+                os.replace(staging, os.path.join(self.directory, version))
+            except Exception:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+
+            self._set_current(version)
+            self._prune(version)
+
+        return record
+
+    def load(self, version: Optional[str] = None) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        """
+        Load a stored pipeline
+
+        Args:
+            version: Version to load, or None for the active version
+
+        Returns:
+            (pipeline, metadata), or None if nothing has been stored yet
+        """
+        if version is None:
+            version = self.current_version()
+            if version is None:
+                return None
+
+        path = self._version_dir(version)
+        with open(os.path.join(path, 'metadata.json')) as f:
+            metadata = json.load(f)
+        return joblib.load(os.path.join(path, 'model.joblib')), metadata
+
+    def activate(self, version: str) -> Dict[str, Any]:
+        """
+        Make a stored version the active one (used for rollback)
+
+        Args:
+            version: Version to activate
+
+        Returns:
+            Metadata of the activated version
+        """
+        with self._lock:
+            path = self._version_dir(version)
+            with open(os.path.join(path, 'metadata.json')) as f:
+                metadata = json.load(f)
+            self._set_current(version)
+        return metadata
+
+    def previous_version(self) -> Optional[str]:
+        """Version stored just before the active one, if any"""
+        versions = self._versions()
+        current = self.current_version()
+        if current not in versions:
+            return None
+        position = versions.index(current)
+        return versions[position - 1] if position > 0 else None
+
+    def current_version(self) -> Optional[str]:
+        """Version the store points at, or None"""
+        try:
+            with open(os.path.join(self.directory, self._CURRENT)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def list_versions(self) -> List[Dict[str, Any]]:
+        """Metadata of every stored version, oldest first"""
+        current = self.current_version()
+        records = []
+        for version in self._versions():
+            with open(os.path.join(self.directory, version, 'metadata.json')) as f:
+                record = json.load(f)
+            record['active'] = version == current
+            records.append(record)
+        return records
+
+    def _versions(self) -> List[str]:
+        """Stored version names; their timestamp format sorts chronologically"""
+        return sorted(
+            name for name in os.listdir(self.directory)
+            if not name.startswith('.')
+            and os.path.isfile(os.path.join(self.directory, name, 'metadata.json'))
+        )
+
+    def _version_dir(self, version: str) -> str:
+        if version not in self._versions():
+            raise KeyError(f"Model version '{version}' not found")
+        return os.path.join(self.directory, version)
+
+    def _set_current(self, version: str) -> None:
+        """Point CURRENT at a version with an atomic rename"""
+        pointer = os.path.join(self.directory, self._CURRENT)
+        tmp = pointer + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(version)
+        os.replace(tmp, pointer)
+
+    def _prune(self, current: str) -> None:
+        """Delete the oldest versions beyond the retention limit (lock held)"""
+        versions = self._versions()
+        for version in versions[:max(0, len(versions) - self.keep)]:
+            if version != current:
+                shutil.rmtree(os.path.join(self.directory, version), ignore_errors=True)
@@ -0,0 +1,381 @@
+"""
+Incremental time-series analytics with constant-time updates per point
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+import bisect
+import math
+import threading
+import pandas as pd
+import numpy as np
+
+from .analyzer import seasonality_summary, trend_label
+
+
+class P2Quantile:
+    """Streaming quantile estimate in constant memory (Jain & Chlamtac P-square)"""
+
+    def __init__(self, p: float = 0.5):
+        """
+        Initialize estimator
+
+        Args:
+            p: Quantile to track, between 0 and 1
+        """
+        self.p = p
+        self.heights: List[float] = []
+        self.positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self.desired = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]
+        self.increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x: float) -> None:
+        """Add one observation"""
+        q = self.heights
+        if len(q) < 5:
+            bisect.insort(q, x)
+            return
+
+        n = self.positions
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = bisect.bisect_right(q, x) - 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Nudge the three middle markers towards their desired positions
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = self._parabolic(i, step)
+                if not q[i - 1] < candidate < q[i + 1]:
+                    candidate = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                q[i] = candidate
+                n[i] += step
+
+    def value(self) -> float:
+        """Current estimate (exact while fewer than five points have been seen)"""
+        if not self.heights:
+            return float('nan')
+        if len(self.heights) < 5:
+            return float(np.quantile(self.heights, self.p))
+        return self.heights[2]
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self.heights, self.positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'p': self.p,
+            'heights': list(self.heights),
+            'positions': list(self.positions),
+            'desired': list(self.desired),
+        }
+
+    @classmethod
+    def restore(cls, state: Dict[str, Any]) -> 'P2Quantile':
+        estimator = cls(state['p'])
+        estimator.heights = list(state['heights'])
+        estimator.positions = list(state['positions'])
+        estimator.desired = list(state['desired'])
+        return estimator
+
+
+def _point(timestamp: Any, value: Any) -> Tuple[pd.Timestamp, float]:
+    """
+    Validate one point, normalizing its date to naive UTC
+
+    Timezone-aware dates are converted to UTC and naive dates are taken to be
+    UTC already, so the two can be mixed within a series.
+
+    Raises:
+        ValueError: If the date is missing or the value is not a finite number
+    """
+    when = pd.Timestamp(timestamp)
+    if when is pd.NaT:
+        raise ValueError(f"Invalid point date: {timestamp!r}")
+    if when.tzinfo is not None:
+        when = when.tz_convert('UTC').tz_localize(None)
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"Point values must be finite, got {value!r}")
+    return when, number
+
+
+class TimeSeriesAccumulator:
+    """Running state of one series, producing the DataAnalyzer.analyze_time_series dict"""
+
+    def __init__(self):
+        """Initialize an empty series"""
+        self.count = 0
+        # Welford running mean and sum of squared deviations of the values
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        # Same for the point index, plus the index/value co-moment for the slope
+        self.index_mean = 0.0
+        self.index_m2 = 0.0
+        self.co_moment = 0.0
+        self.median = P2Quantile(0.5)
+        self.first: Optional[pd.Timestamp] = None
+        self.last: Optional[pd.Timestamp] = None
+        # Running sums and counts per month (0-11) and day of week (0-6)
+        self.month_sums = np.zeros(12)
+        self.month_counts = np.zeros(12, dtype=np.int64)
+        self.weekday_sums = np.zeros(7)
+        self.weekday_counts = np.zeros(7, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def add(self, timestamp: Any, value: float) -> None:
+        """
+        Append one point
+
+        Args:
+            timestamp: Point date (anything pandas.Timestamp accepts), stored as UTC
+            value: Point value
+
+        Raises:
+            ValueError: If the value is not finite or the point is older than
+                the latest point seen
+        """
+        point = _point(timestamp, value)
+        with self._lock:
+            self._add(*point)
+
+    def extend(
+        self,
+        data: List[Dict[str, Any]],
+        date_field: str = 'date',
+        value_field: str = 'value'
+    ) -> int:
+        """
+        Append a batch of points; the batch may be in any order but must not
+        reach back before the latest point already ingested
+
+        Args:
+            data: List of dictionaries with date and value fields
+            date_field: Name of date field
+            value_field: Name of value field
+
+        Returns:
+            Number of points added
+        """
+        try:
+            points = sorted(_point(row[date_field], row[value_field]) for row in data)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Each point needs '{date_field}' and a numeric '{value_field}': {e}")
+        with self._lock:
+            # Validate before mutating so a rejected batch leaves the state untouched
+            if points and self.last is not None and points[0][0] < self.last:
+                raise ValueError(
+                    f"Point dated {points[0][0].isoformat()} is older than the "
+                    f"latest ingested point ({self.last.isoformat()})"
+                )
+            for timestamp, value in points:
+                self._add(timestamp, value)
+        return len(points)
+
+    def _add(self, timestamp: pd.Timestamp, value: float) -> None:
+        if self.last is not None and timestamp < self.last:
+            raise ValueError(
+                f"Point dated {timestamp.isoformat()} is older than the "
+                f"latest ingested point ({self.last.isoformat()})"
+            )
+
+        index = self.count
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        index_delta = index - self.index_mean
+        self.index_mean += index_delta / self.count
+        self.index_m2 += index_delta * (index - self.index_mean)
+        self.co_moment += index_delta * (value - self.mean)
+
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.median.add(value)
+
+        if self.first is None:
+            self.first = timestamp
+        self.last = timestamp
+
+        self.month_sums[timestamp.month - 1] += value
+        self.month_counts[timestamp.month - 1] += 1
+        self.weekday_sums[timestamp.dayofweek] += value
+        self.weekday_counts[timestamp.dayofweek] += 1
+
+    def analysis(self) -> Dict[str, Any]:
+        """
+        Current analysis in the shape returned by DataAnalyzer.analyze_time_series
+
+        The median is a P-square estimate once more than five points are seen;
+        every other figure is exact.
+        """
+        with self._lock:
+            if self.count == 0:
+                raise ValueError("Series has no points")
+
+            if self.count < 2:
+                trend = 'insufficient_data'
+            else:
+                trend = trend_label(self.co_moment / self.index_m2)
+
+            seasonality = None
+            if self.count >= 30:  # Same minimum as DataAnalyzer
+                months = self.month_counts > 0
+                weekdays = self.weekday_counts > 0
+                seasonality = seasonality_summary(
+                    self.month_sums[months] / self.month_counts[months],
+                    self.weekday_sums[weekdays] / self.weekday_counts[weekdays]
+                )
+
+            return {
+                'total_records': self.count,
+                'date_range': {
+                    'start': self.first.isoformat(),
+                    'end': self.last.isoformat()
+                },
+                'statistics': {
+                    'mean': self.mean,
+                    'median': float(self.median.value()),
+                    'std': math.sqrt(self.m2 / self.count),
+                    'min': self.min,
+                    'max': self.max,
+                },
+                'trend': trend,
+                'seasonality': seasonality
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable copy of the state"""
+        with self._lock:
+            return {
+                'count': self.count,
+                'mean': self.mean,
+                'm2': self.m2,
+                'min': self.min if self.count else None,
+                'max': self.max if self.count else None,
+                'index_mean': self.index_mean,
+                'index_m2': self.index_m2,
+                'co_moment': self.co_moment,
+                'median': self.median.snapshot(),
+                'first': self.first.isoformat() if self.first is not None else None,
+                'last': self.last.isoformat() if self.last is not None else None,
+                'month_sums': self.month_sums.tolist(),
+                'month_counts': self.month_counts.tolist(),
+                'weekday_sums': self.weekday_sums.tolist(),
+                'weekday_counts': self.weekday_counts.tolist(),
+            }
+
+    @classmethod
+    def restore(cls, state: Dict[str, Any]) -> 'TimeSeriesAccumulator':
+        """
+        Rebuild an accumulator from snapshot()
+
+        Args:
+            state: Dictionary produced by snapshot()
+
+        Returns:
+            Accumulator that continues where the snapshot left off
+        """
+        accumulator = cls()
+        accumulator.count = int(state['count'])
+        accumulator.mean = float(state['mean'])
+        accumulator.m2 = float(state['m2'])
+        if accumulator.count:
+            accumulator.min = float(state['min'])
+            accumulator.max = float(state['max'])
+        accumulator.index_mean = float(state['index_mean'])
+        accumulator.index_m2 = float(state['index_m2'])
+        accumulator.co_moment = float(state['co_moment'])
+        accumulator.median = P2Quantile.restore(state['median'])
+        if state['first']:
+            accumulator.first = _point(state['first'], 0.0)[0]
+        if state['last']:
+            accumulator.last = _point(state['last'], 0.0)[0]
+        accumulator.month_sums = np.asarray(state['month_sums'], dtype=np.float64)
+        accumulator.month_counts = np.asarray(state['month_counts'], dtype=np.int64)
+        accumulator.weekday_sums = np.asarray(state['weekday_sums'], dtype=np.float64)
+        accumulator.weekday_counts = np.asarray(state['weekday_counts'], dtype=np.int64)
+        return accumulator
+
+
+class TimeSeriesStore:
+    """In-process registry of named series accumulators"""
+
+    def __init__(self):
+        self._series: Dict[str, TimeSeriesAccumulator] = {}
+        self._lock = threading.Lock()
+
+    def list_series(self) -> List[Dict[str, Any]]:
+        """Name and point count of every series"""
+        with self._lock:
+            series = list(self._series.items())
+        return [{'series_id': name, 'count': acc.count} for name, acc in series]
+
+    def ingest(
+        self,
+        series_id: str,
+        data: List[Dict[str, Any]],
+        date_field: str = 'date',
+        value_field: str = 'value'
+    ) -> Dict[str, Any]:
+        """
+        Append points to a series (created on first use) and return its analysis
+
+        Args:
+            series_id: Series name
+            data: List of dictionaries with date and value fields
+            date_field: Name of date field
+            value_field: Name of value field
+
+        Returns:
+            Updated analysis dictionary
+        """
+        with self._lock:
+            accumulator = self._series.setdefault(series_id, TimeSeriesAccumulator())
+        accumulator.extend(data, date_field, value_field)
+        return accumulator.analysis()
+
+    def analysis(self, series_id: str) -> Dict[str, Any]:
+        """Current analysis of a series (KeyError if unknown)"""
+        return self._get(series_id).analysis()
+
+    def snapshot(self, series_id: str) -> Dict[str, Any]:
+        """Serializable state of a series (KeyError if unknown)"""
+        return self._get(series_id).snapshot()
+
+    def restore(self, series_id: str, state: Dict[str, Any]) -> None:
+        """Replace a series with a previously taken snapshot"""
+        accumulator = TimeSeriesAccumulator.restore(state)
+        with self._lock:
+            self._series[series_id] = accumulator
+
+    def drop(self, series_id: str) -> None:
+        """Forget a series (KeyError if unknown)"""
+        with self._lock:
+            if series_id not in self._series:
+                raise KeyError(f"Series '{series_id}' not found")
+            del self._series[series_id]
+
+    def _get(self, series_id: str) -> TimeSeriesAccumulator:
+        with self._lock:
+            accumulator = self._series.get(series_id)
+        if accumulator is None:
+            raise KeyError(f"Series '{series_id}' not found")
+        return accumulator
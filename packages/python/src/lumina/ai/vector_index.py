@@ -0,0 +1,1300 @@
+"""
+Vector indexes for top-k similarity search over embeddings
+"""
+
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Sequence
+from abc import ABC, abstractmethod
+import json
+import time
+import numpy as np
+
+
+SearchResult = List[Tuple[str, float]]
+
+# Pairwise metrics; euclidean is a distance (lower is closer), the others are scores
+METRICS = ('cosine', 'dot', 'euclidean')
+# Default budget for one block of a score matrix
+MAX_SCORES_BYTES = 64 * 1024 * 1024
+# Storage modes of QuantizedIndex
+STORAGES = ('float16', 'int8', 'binary', 'pca')
+
+if hasattr(np, 'bitwise_count'):
+    _popcount = np.bitwise_count
+else:
+    _POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+    def _popcount(codes: np.ndarray) -> np.ndarray:
+        return _POPCOUNT[codes]
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows as float32, leaving zero rows untouched"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k largest scores, best first
+
+    Uses argpartition so the cost is O(N + k log k) rather than a full sort.
+    """
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        return np.zeros(scores.shape[:-1] + (0,), dtype=np.int64)
+
+    if k < scores.shape[-1]:
+        part = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        part = np.broadcast_to(np.arange(k), scores.shape[:-1] + (k,))
+    order = np.argsort(-np.take_along_axis(scores, part, axis=-1), axis=-1, kind='stable')
+    return np.take_along_axis(part, order, axis=-1)
+
+
+def _score_blocks(
+    queries: np.ndarray,
+    candidates: Optional[np.ndarray],
+    metric: str,
+    max_scores_bytes: int,
+    upper: bool = False
+) -> Iterator[Tuple[int, int, np.ndarray]]:
+    """
+    Yield (row_start, column_start, block) slices of a query x candidate score matrix
+
+    Rows are prepared once (normalized for cosine, squared norms for euclidean)
+    and each block is a single matrix product. With upper=True (self-similarity
+    only) a block starting at row r covers columns r onwards.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric} (expected one of {', '.join(METRICS)})")
+    queries = np.asarray(queries, dtype=np.float32)
+    same = candidates is None
+    candidates = queries if same else np.asarray(candidates, dtype=np.float32)
+    if queries.ndim != 2 or candidates.ndim != 2:
+        raise ValueError("Queries and candidates must be 2-D matrices")
+    if queries.shape[1] != candidates.shape[1]:
+        raise ValueError(
+            f"Dimension mismatch: queries have {queries.shape[1]}, "
+            f"candidates {candidates.shape[1]}"
+        )
+
+    if metric == 'cosine':
+        queries = normalize_rows(queries)
+        candidates = queries if same else normalize_rows(candidates)
+    elif metric == 'euclidean':
+        query_norms = np.einsum('ij,ij->i', queries, queries)
+        candidate_norms = (
+            query_norms if same else np.einsum('ij,ij->i', candidates, candidates)
+        )
+
+    block = max(1, max_scores_bytes // (4 * max(1, len(candidates))))
+    for start in range(0, len(queries), block):
+        stop = min(len(queries), start + block)
+        column = start if upper else 0
+        scores = queries[start:stop] @ candidates[column:].T
+        if metric == 'euclidean':
+            # |q - c|^2 = |q|^2 + |c|^2 - 2 q.c, clamped against rounding below zero
+            scores *= -2.0
+            scores += query_norms[start:stop, None]
+            scores += candidate_norms[None, column:]
+            np.maximum(scores, 0.0, out=scores)
+            np.sqrt(scores, out=scores)
+        yield start, column, scores
+
+
+def similarity_matrix(
+    queries: np.ndarray,
+    candidates: Optional[np.ndarray] = None,
+    metric: str = 'cosine',
+    max_scores_bytes: int = MAX_SCORES_BYTES
+) -> np.ndarray:
+    """
+    Dense query x candidate similarity matrix
+
+    Args:
+        queries: Array of shape (n_queries, dimension)
+        candidates: Array of shape (n_candidates, dimension); None compares
+            the queries with each other
+        metric: 'cosine', 'dot' or 'euclidean' (distance)
+        max_scores_bytes: Budget for the intermediate block of one product
+
+    Returns:
+        Float32 array of shape (n_queries, n_candidates)
+    """
+    rows = len(queries)
+    columns = rows if candidates is None else len(candidates)
+    matrix = np.empty((rows, columns), dtype=np.float32)
+    for start, _, scores in _score_blocks(queries, candidates, metric, max_scores_bytes):
+        matrix[start:start + len(scores)] = scores
+    return matrix
+
+
+def similarity_pairs(
+    queries: np.ndarray,
+    candidates: Optional[np.ndarray] = None,
+    metric: str = 'cosine',
+    threshold: float = 0.0,
+    max_scores_bytes: int = MAX_SCORES_BYTES,
+    max_pairs: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sparse (row, column, score) triples of the pairs passing a threshold
+
+    Only one block of the score matrix exists at a time, so memory is bounded
+    by max_scores_bytes plus the matching pairs, and by max_pairs when given.
+
+    Args:
+        queries: Array of shape (n_queries, dimension)
+        candidates: Array of shape (n_candidates, dimension); None compares
+            the queries with each other and returns each pair once (row < column)
+        metric: 'cosine', 'dot' or 'euclidean'
+        threshold: Minimum score, or maximum distance for euclidean
+        max_scores_bytes: Budget for one block of the score matrix
+        max_pairs: Raise ValueError once more pairs than this pass the threshold
+
+    Returns:
+        Row indices, column indices and scores, in row-major order
+    """
+    upper = candidates is None
+    found = 0
+    rows: List[np.ndarray] = []
+    columns: List[np.ndarray] = []
+    values: List[np.ndarray] = []
+    for start, column, scores in _score_blocks(
+        queries, candidates, metric, max_scores_bytes, upper
+    ):
+        mask = scores <= threshold if metric == 'euclidean' else scores >= threshold
+        block_rows, block_columns = np.nonzero(mask)
+        if upper:
+            keep = block_columns + column > block_rows + start
+            block_rows, block_columns = block_rows[keep], block_columns[keep]
+        found += len(block_rows)
+        if max_pairs is not None and found > max_pairs:
+            raise ValueError(
+                f"More than {max_pairs} pairs pass the threshold; raise the threshold"
+            )
+        rows.append(block_rows + start)
+        columns.append(block_columns + column)
+        values.append(scores[block_rows, block_columns])
+
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=np.float32)
+    return np.concatenate(rows), np.concatenate(columns), np.concatenate(values)
+
+
+class _Block:
+    """Growable matrix (float32 unless given a dtype) with string ids and O(1) swap-delete"""
+
+    def __init__(self, dimension: int, dtype: Any = np.float32):
+        self.dimension = dimension
+        self.vectors = np.zeros((0, dimension), dtype=dtype)
+        self.ids: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def active(self) -> np.ndarray:
+        return self.vectors[:len(self.ids)]
+
+    def append(self, ids: List[str], vectors: np.ndarray) -> int:
+        """Append rows and return the position of the first one"""
+        start = len(self.ids)
+        needed = start + len(ids)
+        if needed > self.vectors.shape[0]:
+            capacity = max(needed, 2 * self.vectors.shape[0], 16)
+            grown = np.zeros((capacity, self.dimension), dtype=self.vectors.dtype)
+            grown[:start] = self.vectors[:start]
+            self.vectors = grown
+        self.vectors[start:needed] = vectors
+        self.ids.extend(ids)
+        return start
+
+    def swap_delete(self, position: int) -> Optional[str]:
+        """Remove a row by moving the last row into its place; return the moved id"""
+        last = len(self.ids) - 1
+        moved = None
+        if position != last:
+            self.vectors[position] = self.vectors[last]
+            self.ids[position] = self.ids[last]
+            moved = self.ids[position]
+        self.ids.pop()
+        return moved
+
+
+class VectorIndex(ABC):
+    """Base class for similarity indexes keyed by string id"""
+
+    kind = 'base'
+
+    def __init__(self, dimension: int, normalize: bool = True):
+        """
+        Initialize index
+
+        Args:
+            dimension: Vector dimension
+            normalize: L2-normalize vectors and queries so scores are cosine similarities
+        """
+        self.dimension = dimension
+        self.normalize = normalize
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored vectors"""
+
+    @abstractmethod
+    def __contains__(self, item_id: str) -> bool:
+        """Whether an id is stored"""
+
+    @abstractmethod
+    def build(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Replace the index contents with the given vectors"""
+
+    @abstractmethod
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Insert vectors, replacing any existing entries with the same ids"""
+
+    @abstractmethod
+    def remove(self, ids: Sequence[str]) -> int:
+        """Remove vectors by id and return how many were present"""
+
+    @abstractmethod
+    def get(self, item_id: str) -> np.ndarray:
+        """Return the stored vector for an id"""
+
+    @property
+    def needs_refit(self) -> bool:
+        """Whether the index should be rebuilt from vectors it does not keep"""
+        return False
+
+    @abstractmethod
+    def stored_vectors(self) -> Optional[Tuple[List[str], np.ndarray]]:
+        """Copy of the ids and full-precision vectors, or None if only codes are kept"""
+
+    @abstractmethod
+    def search_batch(self, queries: np.ndarray, k: int = 10) -> List[SearchResult]:
+        """
+        Find the k nearest stored vectors for each query
+
+        Args:
+            queries: Array of shape (n_queries, dimension)
+            k: Number of results per query
+
+        Returns:
+            One list of (id, score) tuples per query, best first
+        """
+
+    def search(self, query: np.ndarray, k: int = 10) -> SearchResult:
+        """Find the k nearest stored vectors for one query"""
+        return self.search_batch(np.asarray(query).reshape(1, -1), k)[0]
+
+    def save(self, path: str) -> None:
+        """Write the index to a .npz file"""
+        arrays = self._arrays()
+        meta = {'kind': self.kind, 'dimension': self.dimension, 'normalize': self.normalize}
+        meta.update(self._options())
+        with open(path, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+
+    @classmethod
+    @abstractmethod
+    def _from_arrays(cls, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> 'VectorIndex':
+        """Rebuild an index from the meta and arrays written by save()"""
+
+    @abstractmethod
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        """Arrays that save() writes alongside the meta"""
+
+    def _options(self) -> Dict[str, Any]:
+        return {}
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        """Cast (and optionally normalize) input vectors"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Expected vectors of dimension {self.dimension}, got {vectors.shape[1]}"
+            )
+        return normalize_rows(vectors) if self.normalize else vectors
+
+
+class ExactIndex(VectorIndex):
+    """Brute-force index: one matrix product per query batch, exact results"""
+
+    kind = 'exact'
+
+    # Upper bound on the query x vector score matrix held at once
+    max_scores_bytes = 64 * 1024 * 1024
+
+    def __init__(self, dimension: int, normalize: bool = True):
+        super().__init__(dimension, normalize)
+        self._block = _Block(dimension)
+        self._rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._block)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self._block.ids)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._block.active
+
+    def build(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        self._block = _Block(self.dimension)
+        self._rows = {}
+        self.add(ids, vectors)
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = self._prepare(vectors)
+        ids = [str(item_id) for item_id in ids]
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+
+        # Overwrite in place where the id exists, append the rest
+        fresh: Dict[str, int] = {}
+        for position, item_id in enumerate(ids):
+            row = self._rows.get(item_id)
+            if row is not None:
+                self._block.vectors[row] = vectors[position]
+            else:
+                fresh[item_id] = position
+
+        if fresh:
+            positions = np.fromiter(fresh.values(), dtype=np.int64, count=len(fresh))
+            start = self._block.append(list(fresh), vectors[positions])
+            for offset, item_id in enumerate(fresh):
+                self._rows[item_id] = start + offset
+
+    def remove(self, ids: Sequence[str]) -> int:
+        removed = 0
+        for item_id in map(str, ids):
+            row = self._rows.pop(item_id, None)
+            if row is None:
+                continue
+            moved = self._block.swap_delete(row)
+            if moved is not None:
+                self._rows[moved] = row
+            removed += 1
+        return removed
+
+    def get(self, item_id: str) -> np.ndarray:
+        return self._block.vectors[self._rows[str(item_id)]]
+
+    def stored_vectors(self) -> Optional[Tuple[List[str], np.ndarray]]:
+        return self.ids, self._block.active.copy()
+
+    def search_batch(self, queries: np.ndarray, k: int = 10) -> List[SearchResult]:
+        queries = self._prepare(queries)
+        vectors = self._block.active
+        ids = self._block.ids
+        if len(ids) == 0 or k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        # Chunk the queries so the score matrix stays within max_scores_bytes
+        chunk = max(1, self.max_scores_bytes // (4 * len(ids)))
+        results: List[SearchResult] = []
+        for start in range(0, len(queries), chunk):
+            scores = queries[start:start + chunk] @ vectors.T
+            best = top_k(scores, k)
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            for rows, row_scores in zip(best, best_scores):
+                results.append([(ids[r], float(s)) for r, s in zip(rows, row_scores)])
+        return results
+
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        return {'vectors': self._block.active, 'ids': np.array(self._block.ids, dtype=str)}
+
+    @classmethod
+    def _from_arrays(cls, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> 'ExactIndex':
+        index = cls(meta['dimension'], meta['normalize'])
+        ids = arrays['ids'].tolist()
+        index._block.append(ids, arrays['vectors'])
+        index._rows = {item_id: row for row, item_id in enumerate(ids)}
+        return index
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted-file index: vectors are clustered with spherical k-means and a query
+    only scans the nprobe clusters whose centroids are closest to it
+
+    Vectors added before min_train_size rows exist are scanned exactly; the
+    quantizer is then trained on all of them and retrained whenever the index
+    grows retrain_growth times past the size it was trained on.
+    """
+
+    kind = 'ivf'
+
+    def __init__(
+        self,
+        dimension: int,
+        normalize: bool = True,
+        nlist: Optional[int] = None,
+        nprobe: int = 16,
+        train_iterations: int = 10,
+        seed: int = 0,
+        min_train_size: int = 1024,
+        retrain_growth: float = 4.0
+    ):
+        """
+        Initialize IVF index
+
+        Args:
+            dimension: Vector dimension
+            normalize: L2-normalize vectors and queries
+            nlist: Number of clusters (defaults to sqrt(N) at training time)
+            nprobe: Number of clusters scanned per query
+            train_iterations: k-means iterations
+            seed: Random seed for centroid initialization
+            min_train_size: Rows added before the quantizer is trained automatically
+            retrain_growth: Retrain once the index holds this many times the
+                rows it was trained on (nlist is recomputed unless given)
+        """
+        super().__init__(dimension, normalize)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_iterations = train_iterations
+        self.seed = seed
+        self.min_train_size = min_train_size
+        self.retrain_growth = retrain_growth
+        self.auto_nlist = nlist is None
+        self.trained_size = 0
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[_Block] = []
+        # Rows held until the quantizer is trained; list number -1 in _where
+        self._pending = _Block(dimension)
+        self._where: Dict[str, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._where
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors: np.ndarray, sample_size: int = 64) -> None:
+        """
+        Fit the coarse quantizer with spherical k-means
+
+        Args:
+            vectors: Training vectors
+            sample_size: Training points used per cluster (caps k-means cost)
+        """
+        vectors = self._prepare(vectors)
+        if len(vectors) == 0:
+            raise ValueError("Cannot train an IVF index without vectors")
+
+        nlist = int(np.sqrt(len(vectors))) if self.auto_nlist else self.nlist
+        nlist = max(1, min(nlist, len(vectors)))
+        rng = np.random.default_rng(self.seed)
+        self.trained_size = len(vectors)
+
+        if len(vectors) > nlist * sample_size:
+            vectors = vectors[rng.choice(len(vectors), nlist * sample_size, replace=False)]
+
+        centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+        for _ in range(self.train_iterations):
+            assignment = self._assign(vectors, centroids)
+            counts = np.bincount(assignment, minlength=nlist)
+
+            # Per-cluster sums via one sort + reduceat instead of np.add.at
+            order = np.argsort(assignment, kind='stable')
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            sums = np.zeros_like(centroids)
+            sums[counts > 0] = np.add.reduceat(vectors[order], starts[counts > 0])
+
+            # Reseed empty clusters from random training points
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+            centroids = normalize_rows(sums)
+
+        self.centroids = centroids
+        self.nlist = nlist
+        self._lists = [_Block(self.dimension) for _ in range(nlist)]
+        self._pending = _Block(self.dimension)
+        self._where = {}
+
+    def build(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        self.centroids = None
+        self.train(vectors)
+        self.add(ids, vectors)
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = self._prepare(vectors)
+        ids = [str(item_id) for item_id in ids]
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+
+        # Re-adding an id moves it, since its nearest cluster may change
+        self.remove(ids)
+        latest = {item_id: row for row, item_id in enumerate(ids)}
+        rows = np.fromiter(latest.values(), dtype=np.int64, count=len(latest))
+        ids = list(latest.keys())
+        vectors = vectors[rows]
+
+        if not self.is_trained:
+            start = self._pending.append(ids, vectors)
+            for offset, item_id in enumerate(ids):
+                self._where[item_id] = (-1, start + offset)
+            if len(self._pending) >= self.min_train_size:
+                self._retrain()
+            return
+
+        self._insert(ids, vectors)
+        if len(self) >= self.retrain_growth * self.trained_size:
+            self._retrain()
+
+    def _retrain(self) -> None:
+        """Retrain the quantizer on every stored vector and reassign them"""
+        blocks = [self._pending] + self._lists
+        ids = [item_id for block in blocks for item_id in block.ids]
+        vectors = np.concatenate([block.active for block in blocks])
+        self.train(vectors)
+        self._insert(ids, vectors)
+
+    def _insert(self, ids: List[str], vectors: np.ndarray) -> None:
+        """Append prepared vectors of ids not in the index to their nearest lists"""
+        assignment = self._assign(vectors, self.centroids)
+        for list_no in np.unique(assignment):
+            members = np.flatnonzero(assignment == list_no)
+            block = self._lists[list_no]
+            member_ids = [ids[m] for m in members]
+            start = block.append(member_ids, vectors[members])
+            for offset, item_id in enumerate(member_ids):
+                self._where[item_id] = (int(list_no), start + offset)
+
+    def remove(self, ids: Sequence[str]) -> int:
+        removed = 0
+        for item_id in map(str, ids):
+            location = self._where.pop(item_id, None)
+            if location is None:
+                continue
+            list_no, position = location
+            moved = self._block(list_no).swap_delete(position)
+            if moved is not None:
+                self._where[moved] = (list_no, position)
+            removed += 1
+        return removed
+
+    def get(self, item_id: str) -> np.ndarray:
+        list_no, position = self._where[str(item_id)]
+        return self._block(list_no).vectors[position]
+
+    def _block(self, list_no: int) -> _Block:
+        return self._pending if list_no < 0 else self._lists[list_no]
+
+    def stored_vectors(self) -> Optional[Tuple[List[str], np.ndarray]]:
+        blocks = [self._pending] + self._lists
+        ids = [item_id for block in blocks for item_id in block.ids]
+        return ids, np.concatenate([block.active for block in blocks])
+
+    def search_batch(self, queries: np.ndarray, k: int = 10) -> List[SearchResult]:
+        queries = self._prepare(queries)
+        if len(self) == 0 or k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        if not self.is_trained:
+            # Too few rows to train on yet, so scan them all
+            scores = queries @ self._pending.active.T
+            best = top_k(scores, k)
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            ids = self._pending.ids
+            return [
+                [(ids[r], float(score)) for r, score in zip(rows, row_scores)]
+                for rows, row_scores in zip(best, best_scores)
+            ]
+
+        nprobe = min(self.nprobe, self.nlist)
+        probes = top_k(queries @ self.centroids.T, nprobe)
+
+        # Scan each probed list once for all the queries that selected it
+        candidates: List[List[Tuple[np.ndarray, List[str]]]] = [[] for _ in range(len(queries))]
+        for list_no in np.unique(probes):
+            block = self._lists[list_no]
+            if len(block) == 0:
+                continue
+            query_rows = np.flatnonzero((probes == list_no).any(axis=1))
+            scores = queries[query_rows] @ block.active.T
+            best = top_k(scores, k)
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            for q, rows, row_scores in zip(query_rows, best, best_scores):
+                candidates[q].append((row_scores, [block.ids[r] for r in rows]))
+
+        results: List[SearchResult] = []
+        for parts in candidates:
+            if not parts:
+                results.append([])
+                continue
+            scores = np.concatenate([p[0] for p in parts])
+            ids = [item_id for p in parts for item_id in p[1]]
+            best = top_k(scores, k)
+            results.append([(ids[r], float(scores[r])) for r in best])
+        return results
+
+    def _assign(self, vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """Nearest centroid per vector, chunked to bound the score matrix"""
+        chunk = max(1, (32 * 1024 * 1024) // (4 * len(centroids)))
+        return np.concatenate([
+            np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+            for start in range(0, len(vectors), chunk)
+        ]) if len(vectors) else np.zeros(0, dtype=np.int64)
+
+    def _options(self) -> Dict[str, Any]:
+        return {
+            'nlist': self.nlist,
+            'nprobe': self.nprobe,
+            'train_iterations': self.train_iterations,
+            'seed': self.seed,
+            'min_train_size': self.min_train_size,
+            'retrain_growth': self.retrain_growth,
+            'auto_nlist': self.auto_nlist,
+            'trained_size': self.trained_size,
+        }
+
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        if not self.is_trained:
+            return {
+                'vectors': self._pending.active,
+                'ids': np.array(self._pending.ids, dtype=str),
+            }
+        return {
+            'centroids': self.centroids,
+            'list_sizes': np.array([len(block) for block in self._lists], dtype=np.int64),
+            'vectors': np.concatenate([block.active for block in self._lists]),
+            'ids': np.array([i for block in self._lists for i in block.ids], dtype=str),
+        }
+
+    @classmethod
+    def _from_arrays(cls, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> 'IVFIndex':
+        index = cls(
+            meta['dimension'],
+            meta['normalize'],
+            nlist=meta['nlist'],
+            nprobe=meta['nprobe'],
+            train_iterations=meta['train_iterations'],
+            seed=meta['seed'],
+            min_train_size=meta.get('min_train_size', 1024),
+            retrain_growth=meta.get('retrain_growth', 4.0)
+        )
+        index.auto_nlist = meta.get('auto_nlist', False)
+        index.trained_size = meta.get('trained_size', 0)
+        if 'centroids' not in arrays:
+            if 'ids' in arrays:
+                ids = arrays['ids'].tolist()
+                index._pending.append(ids, arrays['vectors'])
+                index._where = {item_id: (-1, row) for row, item_id in enumerate(ids)}
+            return index
+
+        index.centroids = arrays['centroids']
+        index._lists = [_Block(index.dimension) for _ in range(len(index.centroids))]
+        ids = arrays['ids'].tolist()
+        offset = 0
+        for list_no, size in enumerate(arrays['list_sizes'].tolist()):
+            block = index._lists[list_no]
+            block.append(ids[offset:offset + size], arrays['vectors'][offset:offset + size])
+            for position, item_id in enumerate(block.ids):
+                index._where[item_id] = (list_no, position)
+            offset += size
+        return index
+
+
+class QuantizedIndex(VectorIndex):
+    """
+    Brute-force index over compressed vectors, optionally rescoring the best
+    candidates against the full-precision vectors
+
+    Storage modes: 'float16' (half precision), 'int8' (scalar quantization with
+    one scale per dimension), 'binary' (sign bits compared by Hamming distance,
+    a coarse filter) and 'pca' (projection onto the leading principal components).
+
+    'int8' and 'pca' are fitted to the data: vectors added before
+    min_train_size rows exist are kept in float32 and scanned exactly, and the
+    quantizer is refitted whenever the index grows refit_growth times past the
+    rows it was fitted on (until it was fitted on sample_size rows). Refitting
+    happens automatically when the full-precision vectors are kept for
+    rescoring; otherwise needs_refit asks the owner to refit() with them.
+    """
+
+    kind = 'quantized'
+
+    # Upper bound on the query x vector score matrix held at once
+    max_scores_bytes = 64 * 1024 * 1024
+    # Upper bound on the codes decoded (or XORed) at once during a scan
+    max_decode_bytes = 16 * 1024 * 1024
+
+    def __init__(
+        self,
+        dimension: int,
+        normalize: bool = True,
+        storage: str = 'int8',
+        rescore: int = 0,
+        pca_dimension: Optional[int] = None,
+        sample_size: int = 10000,
+        seed: int = 0,
+        min_train_size: int = 1024,
+        refit_growth: float = 4.0
+    ):
+        """
+        Initialize quantized index
+
+        Args:
+            dimension: Vector dimension
+            normalize: L2-normalize vectors and queries
+            storage: 'float16', 'int8', 'binary' or 'pca'
+            rescore: Rescore the top k * rescore candidates against full-precision
+                vectors; 0 keeps only the codes. The float32 vectors stay in
+                memory next to the codes, so rescoring buys recall at the cost
+                of using more memory than an ExactIndex, not less
+            pca_dimension: Components kept by 'pca' (defaults to dimension // 4)
+            sample_size: Vectors used to fit the int8 scales or the PCA
+            seed: Random seed for the training sample
+            min_train_size: Rows added before the quantizer is fitted automatically
+            refit_growth: Refit once the index holds this many times the rows
+                the quantizer was fitted on
+        """
+        super().__init__(dimension, normalize)
+        if storage not in STORAGES:
+            raise ValueError(
+                f"Unknown storage mode: {storage} (expected one of {', '.join(STORAGES)})"
+            )
+        if rescore < 0:
+            raise ValueError("rescore must not be negative")
+        pca_dimension = pca_dimension or max(1, dimension // 4)
+        if not 1 <= pca_dimension <= dimension:
+            raise ValueError(f"pca_dimension must be between 1 and {dimension}")
+
+        self.storage = storage
+        self.rescore = rescore
+        self.pca_dimension = pca_dimension
+        self.sample_size = sample_size
+        self.seed = seed
+        self.min_train_size = min_train_size
+        self.refit_growth = refit_growth
+        self.trained_size = 0
+        # Quantizer parameters: per-dimension int8 scales, or the PCA mean and basis
+        self.scales: Optional[np.ndarray] = None
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        """Drop every stored vector"""
+        if self.storage == 'binary':
+            width, dtype = (self.dimension + 7) // 8, np.uint8
+        elif self.storage == 'pca':
+            width, dtype = self.pca_dimension, np.float32
+        else:
+            width, dtype = self.dimension, np.dtype(self.storage)
+        self._codes = _Block(width, dtype)
+        self._originals = _Block(self.dimension) if self.rescore else None
+        # Float32 rows held until the quantizer is fitted; _rows then points here
+        self._pending = _Block(self.dimension)
+        self._rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self._stored.ids)
+
+    @property
+    def is_trained(self) -> bool:
+        if self.storage == 'int8':
+            return self.scales is not None
+        if self.storage == 'pca':
+            return self.components is not None
+        return True
+
+    @property
+    def needs_refit(self) -> bool:
+        return (
+            self.storage in ('int8', 'pca')
+            and self.is_trained
+            and self.trained_size < self.sample_size
+            and len(self) >= self.refit_growth * max(1, self.trained_size)
+        )
+
+    @property
+    def _stored(self) -> _Block:
+        """Block the rows in _rows point into"""
+        return self._codes if self.is_trained else self._pending
+
+    def train(self, vectors: np.ndarray) -> None:
+        """
+        Fit the int8 scales or the PCA basis on a sample (clears the index)
+
+        Args:
+            vectors: Training vectors
+        """
+        vectors = self._prepare(vectors)
+        if len(vectors) == 0:
+            raise ValueError("Cannot train a quantized index without vectors")
+        self.trained_size = len(vectors)
+        if len(vectors) > self.sample_size:
+            rng = np.random.default_rng(self.seed)
+            vectors = vectors[rng.choice(len(vectors), self.sample_size, replace=False)]
+
+        if self.storage == 'int8':
+            scales = np.abs(vectors).max(axis=0) / 127.0
+            scales[scales == 0] = 1.0
+            self.scales = scales.astype(np.float32)
+        elif self.storage == 'pca':
+            mean = vectors.mean(axis=0)
+            _, _, basis = np.linalg.svd(vectors - mean, full_matrices=False)
+            # Fewer samples than components leave the remaining rows zero
+            components = np.zeros((self.pca_dimension, self.dimension), dtype=np.float32)
+            kept = min(self.pca_dimension, len(basis))
+            components[:kept] = basis[:kept]
+            self.mean = mean.astype(np.float32)
+            self.components = components
+        self._reset()
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Compress prepared vectors into this index's storage format"""
+        if self.storage == 'float16':
+            return vectors.astype(np.float16)
+        if self.storage == 'int8':
+            return np.clip(np.rint(vectors / self.scales), -127, 127).astype(np.int8)
+        if self.storage == 'binary':
+            return np.packbits(vectors > 0, axis=1)
+        return (vectors - self.mean) @ self.components.T
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Approximate float32 vectors from codes (binary codes decode to unit sign vectors)"""
+        if self.storage == 'float16':
+            return codes.astype(np.float32)
+        if self.storage == 'int8':
+            return codes.astype(np.float32) * self.scales
+        if self.storage == 'binary':
+            signs = np.unpackbits(codes, axis=1, count=self.dimension).astype(np.float32)
+            return (2.0 * signs - 1.0) / np.sqrt(self.dimension)
+        return codes @ self.components + self.mean
+
+    def build(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        self.train(vectors)
+        self.add(ids, vectors)
+
+    def refit(
+        self,
+        ids: Optional[Sequence[str]] = None,
+        vectors: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Refit the quantizer on every stored vector and re-encode them
+
+        Args:
+            ids: Ids of vectors (defaults to the stored ids)
+            vectors: Full-precision vectors for ids; required once the
+                quantizer is fitted unless they are kept for rescoring
+        """
+        if vectors is None:
+            source = self._originals if self.is_trained else self._pending
+            if source is None:
+                raise ValueError("Pass the vectors to refit an index without rescoring")
+            ids, vectors = source.ids, source.active
+        ids = list(ids if ids is not None else self.ids)
+        # train() drops the current blocks, so keep what it is rebuilt from
+        self.build(ids, np.array(vectors, dtype=np.float32))
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = self._prepare(vectors)
+        ids = [str(item_id) for item_id in ids]
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+
+        if not self.is_trained:
+            self._write(self._pending, None, ids, vectors)
+            if len(self._pending) >= self.min_train_size:
+                self.refit()
+            return
+
+        self._write(self._codes, self._originals, ids, self.encode(vectors), vectors)
+        if self.needs_refit and self._originals is not None:
+            self.refit()
+
+    def _write(
+        self,
+        block: _Block,
+        originals: Optional[_Block],
+        ids: List[str],
+        rows: np.ndarray,
+        vectors: Optional[np.ndarray] = None
+    ) -> None:
+        """Overwrite the rows of known ids and append the rest"""
+
+        fresh: Dict[str, int] = {}
+        for position, item_id in enumerate(ids):
+            row = self._rows.get(item_id)
+            if row is not None:
+                block.vectors[row] = rows[position]
+                if originals is not None:
+                    originals.vectors[row] = vectors[position]
+            else:
+                fresh[item_id] = position
+
+        if fresh:
+            positions = np.fromiter(fresh.values(), dtype=np.int64, count=len(fresh))
+            start = block.append(list(fresh), rows[positions])
+            if originals is not None:
+                originals.append(list(fresh), vectors[positions])
+            for offset, item_id in enumerate(fresh):
+                self._rows[item_id] = start + offset
+
+    def remove(self, ids: Sequence[str]) -> int:
+        block = self._stored
+        originals = self._originals if self.is_trained else None
+        removed = 0
+        for item_id in map(str, ids):
+            row = self._rows.pop(item_id, None)
+            if row is None:
+                continue
+            moved = block.swap_delete(row)
+            if originals is not None:
+                originals.swap_delete(row)
+            if moved is not None:
+                self._rows[moved] = row
+            removed += 1
+        return removed
+
+    def get(self, item_id: str) -> np.ndarray:
+        """Stored full-precision vector, or its decoded approximation without rescoring"""
+        row = self._rows[str(item_id)]
+        if not self.is_trained:
+            return self._pending.vectors[row]
+        if self._originals is not None:
+            return self._originals.vectors[row]
+        return self.decode(self._codes.vectors[row:row + 1])[0]
+
+    def stored_vectors(self) -> Optional[Tuple[List[str], np.ndarray]]:
+        source = self._originals if self.is_trained else self._pending
+        if source is None:
+            return None
+        return list(source.ids), source.active.copy()
+
+    def memory_bytes(self) -> Dict[str, int]:
+        """Bytes held by the codes, the float32 vectors and the quantizer"""
+        quantizer = sum(
+            array.nbytes for array in (self.scales, self.mean, self.components)
+            if array is not None
+        )
+        codes = self._codes.active.nbytes
+        originals = self._pending.active.nbytes
+        if self._originals is not None:
+            originals += self._originals.active.nbytes
+        return {
+            'codes': codes,
+            'originals': originals,
+            'quantizer': quantizer,
+            'total': codes + originals + quantizer,
+            'float32': len(self) * self.dimension * 4,
+        }
+
+    def search_batch(self, queries: np.ndarray, k: int = 10) -> List[SearchResult]:
+        queries = self._prepare(queries)
+        if len(self) == 0 or k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        if not self.is_trained:
+            # Too few rows to fit the quantizer on yet, so scan them exactly
+            scores = queries @ self._pending.active.T
+            best = top_k(scores, k)
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            ids = self._pending.ids
+            return [
+                [(ids[r], float(score)) for r, score in zip(rows, row_scores)]
+                for rows, row_scores in zip(best, best_scores)
+            ]
+
+        ids = self._codes.ids
+        depth = min(len(ids), k * self.rescore) if self.rescore else k
+        # Bound both the approximate score matrix and the gathered rescoring rows
+        chunk = max(1, min(
+            self.max_scores_bytes // (4 * len(ids)),
+            self.max_scores_bytes // (4 * depth * self.dimension)
+        ))
+        results: List[SearchResult] = []
+        for start in range(0, len(queries), chunk):
+            batch = queries[start:start + chunk]
+            scores = self._scan(batch)
+            best = top_k(scores, depth)
+            if self._originals is not None:
+                exact = np.einsum('qd,qcd->qc', batch, self._originals.active[best])
+                order = top_k(exact, k)
+                best = np.take_along_axis(best, order, axis=1)
+                best_scores = np.take_along_axis(exact, order, axis=1)
+            else:
+                best_scores = np.take_along_axis(scores, best, axis=1)
+            for rows, row_scores in zip(best, best_scores):
+                results.append([(ids[r], float(s)) for r, s in zip(rows, row_scores)])
+        return results
+
+    def _scan(self, queries: np.ndarray) -> np.ndarray:
+        """Approximate query x stored-vector scores, decoding the codes block by block"""
+        codes = self._codes.active
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+
+        if self.storage == 'binary':
+            # Agreeing sign bits map to the cosine between the two sign vectors
+            query_codes = self.encode(queries)
+            block = max(1, self.max_decode_bytes // (len(queries) * codes.shape[1]))
+            for start in range(0, len(codes), block):
+                differing = _popcount(
+                    query_codes[:, None, :] ^ codes[None, start:start + block, :]
+                ).sum(axis=2, dtype=np.int32)
+                scores[:, start:start + block] = 1.0 - 2.0 * differing / self.dimension
+            return scores
+
+        offset = None
+        if self.storage == 'int8':
+            projected = queries * self.scales
+        elif self.storage == 'pca':
+            # q . x ~ q . mean + (P q) . (P (x - mean))
+            projected = queries @ self.components.T
+            offset = queries @ self.mean
+        else:
+            projected = queries
+        block = max(1, self.max_decode_bytes // (4 * codes.shape[1]))
+        for start in range(0, len(codes), block):
+            decoded = codes[start:start + block].astype(np.float32, copy=False)
+            scores[:, start:start + block] = projected @ decoded.T
+        if offset is not None:
+            scores += offset[:, None]
+        return scores
+
+    def _options(self) -> Dict[str, Any]:
+        return {
+            'storage': self.storage,
+            'rescore': self.rescore,
+            'pca_dimension': self.pca_dimension,
+            'sample_size': self.sample_size,
+            'seed': self.seed,
+            'min_train_size': self.min_train_size,
+            'refit_growth': self.refit_growth,
+            'trained_size': self.trained_size,
+        }
+
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        if not self.is_trained:
+            return {
+                'pending': self._pending.active,
+                'ids': np.array(self._pending.ids, dtype=str),
+            }
+        arrays = {'codes': self._codes.active, 'ids': np.array(self._codes.ids, dtype=str)}
+        if self._originals is not None:
+            arrays['vectors'] = self._originals.active
+        for name in ('scales', 'mean', 'components'):
+            if getattr(self, name) is not None:
+                arrays[name] = getattr(self, name)
+        return arrays
+
+    @classmethod
+    def _from_arrays(cls, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> 'QuantizedIndex':
+        index = cls(
+            meta['dimension'],
+            meta['normalize'],
+            storage=meta['storage'],
+            rescore=meta['rescore'],
+            pca_dimension=meta['pca_dimension'],
+            sample_size=meta['sample_size'],
+            seed=meta['seed'],
+            min_train_size=meta.get('min_train_size', 1024),
+            refit_growth=meta.get('refit_growth', 4.0)
+        )
+        ids = arrays['ids'].tolist()
+        index._rows = {item_id: row for row, item_id in enumerate(ids)}
+        # Indexes saved before refitting existed count as fitted on what they hold
+        index.trained_size = meta.get('trained_size', len(ids))
+        if 'pending' in arrays:
+            index._pending.append(ids, arrays['pending'])
+            return index
+
+        for name in ('scales', 'mean', 'components'):
+            if name in arrays:
+                setattr(index, name, arrays[name])
+        index._codes.append(ids, arrays['codes'])
+        if index._originals is not None:
+            index._originals.append(ids, arrays['vectors'])
+        return index
+
+
+INDEX_TYPES = {cls.kind: cls for cls in (ExactIndex, IVFIndex, QuantizedIndex)}
+
+
+def create_index(kind: str, dimension: int, **options: Any) -> VectorIndex:
+    """
+    Create an empty index
+
+    Args:
+        kind: Index type ('exact', 'ivf' or 'quantized')
+        dimension: Vector dimension
+        **options: Index-specific options, e.g. nlist/nprobe for 'ivf' or
+            storage/rescore for 'quantized'
+
+    Returns:
+        New index instance
+    """
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type: {kind}")
+    return INDEX_TYPES[kind](dimension, **options)
+
+
+def load_index(path: str) -> VectorIndex:
+    """Load an index written by VectorIndex.save()"""
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files}
+    meta = json.loads(str(arrays.pop('meta')))
+    return INDEX_TYPES[meta['kind']]._from_arrays(meta, arrays)
+
+
+def recall_report(
+    index: VectorIndex,
+    reference: VectorIndex,
+    queries: np.ndarray,
+    k: int = 10
+) -> Dict[str, Any]:
+    """
+    Compare an approximate index against an exact reference
+
+    Args:
+        index: Index under test (e.g. IVFIndex)
+        reference: Exact index holding the same vectors
+        queries: Query vectors
+        k: Number of neighbours compared per query
+
+    Returns:
+        Recall@k plus per-query latency percentiles and batch throughput for both
+    """
+    def timed(target: VectorIndex) -> Tuple[List[SearchResult], Dict[str, float]]:
+        latencies = []
+        results = []
+        for query in queries:
+            started = time.perf_counter()
+            results.append(target.search(query, k))
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        target.search_batch(queries, k)
+        batch_seconds = time.perf_counter() - started
+
+        latencies_ms = np.array(latencies)
+        return results, {
+            'mean_ms': float(latencies_ms.mean()),
+            'p50_ms': float(np.percentile(latencies_ms, 50)),
+            'p99_ms': float(np.percentile(latencies_ms, 99)),
+            'batch_queries_per_second': len(queries) / batch_seconds if batch_seconds else 0.0,
+        }
+
+    approximate, index_latency = timed(index)
+    exact, reference_latency = timed(reference)
+
+    return {
+        'index': index.kind,
+        'vectors': len(reference),
+        'queries': len(queries),
+        'k': k,
+        'recall': _recall(approximate, exact),
+        'latency': {'index': index_latency, 'reference': reference_latency},
+    }
+
+
+def quantization_report(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    storages: Sequence[str] = STORAGES,
+    rescore: int = 4,
+    pca_dimension: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Memory saved versus recall@k lost by each QuantizedIndex storage mode
+
+    Every mode is measured on its own and, when rescore is set, again with
+    rescoring against the full-precision vectors.
+
+    Args:
+        vectors: Corpus vectors
+        queries: Query vectors
+        k: Number of neighbours compared per query
+        storages: Storage modes to measure
+        rescore: Candidate multiplier of the rescoring runs (0 skips them)
+        pca_dimension: Components kept by 'pca'
+
+    Returns:
+        Corpus size plus, per mode, recall@k, the bytes per vector, the share
+        of float32 memory saved, build time and batch throughput
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    ids = [str(row) for row in range(len(vectors))]
+    reference = ExactIndex(vectors.shape[1])
+    reference.build(ids, vectors)
+    exact = reference.search_batch(queries, k)
+    float32_bytes = reference.vectors.nbytes
+
+    modes = []
+    for storage in storages:
+        for depth in ((0, rescore) if rescore else (0,)):
+            index = QuantizedIndex(
+                vectors.shape[1],
+                storage=storage,
+                rescore=depth,
+                pca_dimension=pca_dimension
+            )
+            started = time.perf_counter()
+            index.build(ids, vectors)
+            build_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            found = index.search_batch(queries, k)
+            search_seconds = time.perf_counter() - started
+
+            memory = index.memory_bytes()
+            modes.append({
+                'storage': storage,
+                'rescore': depth,
+                'recall': _recall(found, exact),
+                'bytes_per_vector': memory['total'] / len(vectors) if len(vectors) else 0.0,
+                'memory_saved': 1.0 - memory['total'] / float32_bytes if float32_bytes else 0.0,
+                'build_seconds': build_seconds,
+                'queries_per_second': len(queries) / search_seconds if search_seconds else 0.0,
+            })
+
+    return {
+        'vectors': len(vectors),
+        'dimension': int(vectors.shape[1]),
+        'queries': len(queries),
+        'k': k,
+        'float32_bytes': int(float32_bytes),
+        'modes': modes,
+    }
+
+
+def _recall(found: List[SearchResult], truth: List[SearchResult]) -> float:
+    """Share of the true neighbours that were found, over all queries"""
+    hits = sum(
+        len({i for i, _ in approximate} & {i for i, _ in exact})
+        for approximate, exact in zip(found, truth)
+    )
+    expected = sum(len(exact) for exact in truth)
+    return hits / expected if expected else 1.0
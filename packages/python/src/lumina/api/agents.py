@@ -2,38 +2,246 @@
 Agent enhancement endpoints
 """
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from typing import List, Dict, Any, Optional, Union
+import os
 
-from ..agents.enhancements import AgentEnhancements
+from ..services import registry
+from .execution import executor
+from . import columnar
+from . import streaming
 
 router = APIRouter(prefix="/agents", tags=["agents"])
-enhancements = AgentEnhancements()
 
 
 class CustomerSupportRequest(BaseModel):
     ticket_text: str
-    knowledge_base: List[str]
+    knowledge_base: Optional[List[str]] = None
+    knowledge_base_id: Optional[str] = None
+    top_k: int = 3
+
+
+class Ticket(BaseModel):
+    id: str
+    text: str
+
+
+class TicketTriageRequest(BaseModel):
+    tickets: List[Ticket]
+    knowledge_base: Optional[List[str]] = None
+    knowledge_base_id: Optional[str] = None
+    top_k: int = 3
+
+
+class SupportCostReportRequest(BaseModel):
+    tickets: List[str]
+    knowledge_base: Optional[List[str]] = None
+    knowledge_base_id: Optional[str] = None
+
+
+class KnowledgeBaseCreateRequest(BaseModel):
+    name: str
+
+
+class Article(BaseModel):
+    id: str
+    content: str
+
+
+class ArticleUpsertRequest(BaseModel):
+    articles: List[Article]
+
+
+class ArticleDeleteRequest(BaseModel):
+    ids: List[str]
+
+
+class KnowledgeBaseQueryRequest(BaseModel):
+    text: str
+    top_k: int = 3
+
+
+class QuantizationReportRequest(BaseModel):
+    # Query texts such as real tickets; a sample of the articles when omitted
+    queries: Optional[List[str]] = None
+    k: int = 10
+    sample_size: int = 200
 
 
 class FinancialAnalysisRequest(BaseModel):
-    transactions: List[Dict[str, Any]]
+    # Rows, or columns such as {"date": [...], "amount": [...]}
+    transactions: Union[List[Dict[str, Any]], Dict[str, List[Any]]]
+    timings: bool = False
 
 
 class LeadScoringRequest(BaseModel):
     lead_data: Dict[str, Any]
+    similar_top_k: int = 0
+
+
+class LeadBatchRequest(BaseModel):
+    # Rows, or columns such as {"id": [...], "description": [...]}
+    leads: Union[List[Dict[str, Any]], Dict[str, List[Any]]]
+    store: bool = True
+
+
+class SimilarLeadsRequest(BaseModel):
+    # A stored lead id, or free text to embed
+    lead_id: Optional[str] = None
+    text: Optional[str] = None
+    top_k: int = 5
+
+
+class LeadDeleteRequest(BaseModel):
+    ids: List[str]
+
+
+class LeadDuplicatesRequest(BaseModel):
+    # Cosine similarity between 0.5 and 1
+    threshold: float = 0.95
+    min_cluster_size: int = 2
+    # "exact" compares every pair; "ivf" only leads sharing a k-means bucket
+    method: str = "exact"
+    nprobe: int = 2
 
 
 @router.post("/enhance/customer-support")
 async def enhance_customer_support(request: CustomerSupportRequest):
     """Enhance customer support with ML"""
     try:
-        result = enhancements.enhance_customer_support(
+        if request.knowledge_base is None and request.knowledge_base_id is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Provide knowledge_base or knowledge_base_id"
+            )
+        result = await executor.run(
+            "enhance_customer_support",
+            registry.enhancements.enhance_customer_support,
             request.ticket_text,
-            request.knowledge_base
+            request.knowledge_base,
+            request.knowledge_base_id,
+            request.top_k
         )
         return result
+    except HTTPException:
+        raise
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/enhance/customer-support/batch")
+async def triage_tickets(request: TicketTriageRequest):
+    """
+    Triage a queue of tickets in one call
+
+    Tickets are embedded in batches and matched against the knowledge base
+    together; the response lists them most urgent first.
+    """
+    try:
+        if request.knowledge_base is None and request.knowledge_base_id is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Provide knowledge_base or knowledge_base_id"
+            )
+        return await executor.run(
+            "triage_tickets",
+            registry.enhancements.triage_tickets,
+            [ticket.model_dump() for ticket in request.tickets],
+            request.knowledge_base,
+            request.knowledge_base_id,
+            request.top_k,
+            timeout_s=float(os.getenv("TRIAGE_BATCH_TIMEOUT_S", "600"))
+        )
+    except HTTPException:
+        raise
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post(
+    "/enhance/customer-support/stream",
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                streaming.NDJSON_MEDIA_TYPE: {
+                    "schema": {"type": "string"},
+                    "description": 'One {"id": ..., "text": ...} ticket per line',
+                },
+            },
+            "required": True,
+        }
+    },
+)
+async def triage_ticket_stream(
+    http_request: Request,
+    knowledge_base_id: str,
+    top_k: int = 3,
+    chunk_size: int = 256,
+    resume_after: Optional[str] = None
+):
+    """
+    Triage an NDJSON stream of {id, text} tickets against a stored knowledge base
+
+    Tickets are processed chunk_size at a time and each chunk's results are
+    streamed back most urgent first as soon as it completes. The stream ends
+    with a {"done": true, "last_id": ...} summary; pass resume_after=<id> to
+    skip everything up to and including that ticket.
+    """
+    if not 1 <= chunk_size <= 4096:
+        raise HTTPException(status_code=400, detail="chunk_size must be between 1 and 4096")
+    try:
+        registry.enhancements.knowledge_bases.get(knowledge_base_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+    async def triage_chunk(tickets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        result = await executor.run(
+            "triage_stream",
+            registry.enhancements.triage_tickets,
+            tickets,
+            None,
+            knowledge_base_id,
+            top_k
+        )
+        return result["tickets"]
+
+    records = streaming.iter_ndjson(http_request.stream())
+    return streaming.DuplexStreamingResponse(
+        streaming.process_ndjson(records, triage_chunk, chunk_size, resume_after, "triaged"),
+        media_type=streaming.NDJSON_MEDIA_TYPE
+    )
+
+
+@router.post("/enhance/customer-support/cost-report")
+async def support_cost_report(request: SupportCostReportRequest):
+    """
+    Benchmark the per-ticket cost of triage signals on sample tickets
+
+    Compares the lexicon path with the trained embedding heads; pass a
+    knowledge base to also time the full customer-support call.
+    """
+    try:
+        return await executor.run(
+            "support_cost_report",
+            registry.enhancements.support_cost_report,
+            request.tickets,
+            request.knowledge_base,
+            request.knowledge_base_id,
+            timeout_s=float(os.getenv("SUPPORT_COST_REPORT_TIMEOUT_S", "600"))
+        )
+    except HTTPException:
+        raise
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -42,8 +250,17 @@ async def enhance_customer_support(request: CustomerSupportRequest):
 async def enhance_financial(request: FinancialAnalysisRequest):
     """Enhance financial analysis with ML"""
     try:
-        result = enhancements.enhance_financial_analysis(request.transactions)
+        result = await executor.run(
+            "enhance_financial",
+            registry.enhancements.enhance_financial_analysis,
+            request.transactions,
+            request.timings
+        )
         return result
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -52,8 +269,238 @@ async def enhance_financial(request: FinancialAnalysisRequest):
 async def enhance_lead_scoring(request: LeadScoringRequest):
     """Enhance lead scoring with ML"""
     try:
-        result = enhancements.enhance_lead_scoring(request.lead_data)
+        result = await executor.run(
+            "enhance_lead_scoring",
+            registry.enhancements.enhance_lead_scoring,
+            request.lead_data,
+            request.similar_top_k
+        )
         return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post(
+    "/enhance/lead-scoring/batch",
+    openapi_extra=columnar.openapi_body(
+        LeadBatchRequest, "Table with id, description, company, notes and company_size columns"
+    ),
+)
+async def enhance_lead_scoring_batch(http_request: Request, store: bool = True):
+    """
+    Score many leads in one call
+
+    Accepts JSON (rows or columns) or an Arrow IPC / Parquet upload and
+    returns the scores as parallel arrays.
+    """
+    # Imported here so the router does not load the scoring stack at import time
+    from ..agents.enhancements import LEAD_FIELDS
+
+    content_type = http_request.headers.get("content-type")
+    try:
+        if columnar.is_columnar(content_type):
+            leads = columnar.read_columns(
+                await http_request.body(), content_type, [], optional=LEAD_FIELDS
+            )
+        else:
+            request = LeadBatchRequest.model_validate(await http_request.json())
+            leads = request.leads
+            store = request.store
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        return await executor.run(
+            "enhance_lead_scoring_batch",
+            registry.enhancements.score_leads_batch,
+            leads,
+            store,
+            timeout_s=float(os.getenv("LEAD_BATCH_TIMEOUT_S", "600"))
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.get("/leads")
+async def lead_store_summary():
+    """Number of stored lead embeddings"""
+    return {"leads": len(registry.enhancements.leads)}
+
+
+@router.post("/leads/similar")
+async def similar_leads(request: SimilarLeadsRequest):
+    """Find the stored leads most similar to a lead or to free text"""
+    try:
+        leads = await executor.run(
+            "leads_similar",
+            registry.enhancements.similar_leads,
+            request.lead_id,
+            request.text,
+            request.top_k
+        )
+        return {"similar_leads": leads}
+    except HTTPException:
+        raise
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/leads/delete")
+async def delete_leads(request: LeadDeleteRequest):
+    """Remove stored lead embeddings"""
+    try:
+        removed = registry.enhancements.leads.delete(request.ids)
+        return {"removed": removed}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/leads/duplicates")
+async def lead_duplicates(request: LeadDuplicatesRequest):
+    """Cluster near-duplicate leads across the whole store"""
+    try:
+        return await executor.run(
+            "leads_duplicates",
+            registry.enhancements.leads.duplicate_clusters,
+            request.threshold,
+            request.min_cluster_size,
+            request.method,
+            request.nprobe,
+            timeout_s=float(os.getenv("LEAD_DEDUPE_TIMEOUT_S", "3600"))
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/knowledge-bases")
+async def list_knowledge_bases():
+    """List stored knowledge-base collections"""
+    return {"knowledge_bases": registry.enhancements.knowledge_bases.list_collections()}
+
+
+@router.post("/knowledge-bases")
+async def create_knowledge_base(request: KnowledgeBaseCreateRequest):
+    """Create an empty knowledge-base collection"""
+    try:
+        registry.enhancements.knowledge_bases.create(request.name)
+        return {"name": request.name, "articles": 0}
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.delete("/knowledge-bases/{name}")
+async def drop_knowledge_base(name: str):
+    """Delete a knowledge-base collection"""
+    try:
+        registry.enhancements.knowledge_bases.drop(name)
+        return {"name": name, "deleted": True}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+
+@router.put("/knowledge-bases/{name}/articles")
+async def upsert_articles(name: str, request: ArticleUpsertRequest):
+    """Insert or update articles; only new or changed content is embedded"""
+    try:
+        counts = await executor.run(
+            "knowledge_base_upsert",
+            registry.enhancements.knowledge_bases.upsert,
+            name,
+            [article.model_dump() for article in request.articles]
+        )
+        return {"name": name, **counts}
+    except HTTPException:
+        raise
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/knowledge-bases/{name}/articles/delete")
+async def delete_articles(name: str, request: ArticleDeleteRequest):
+    """Remove articles from a knowledge-base collection"""
+    try:
+        removed = registry.enhancements.knowledge_bases.delete_articles(name, request.ids)
+        return {"name": name, "deleted": removed}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+
+@router.post("/knowledge-bases/{name}/rebuild")
+async def rebuild_knowledge_base(name: str):
+    """Re-embed a collection into a fresh index, refitting a quantized one"""
+    try:
+        return await executor.run(
+            "knowledge_base_rebuild",
+            registry.enhancements.knowledge_bases.rebuild,
+            name,
+            timeout_s=float(os.getenv("KNOWLEDGE_BASE_REBUILD_TIMEOUT_S", "600"))
+        )
+    except HTTPException:
+        raise
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/knowledge-bases/{name}/query")
+async def query_knowledge_base(name: str, request: KnowledgeBaseQueryRequest):
+    """Find the articles most relevant to a piece of text"""
+    try:
+        articles = await executor.run(
+            "knowledge_base_query",
+            registry.enhancements.knowledge_bases.query,
+            name,
+            request.text,
+            request.top_k
+        )
+        return {"name": name, "articles": articles}
+    except HTTPException:
+        raise
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/knowledge-bases/{name}/quantization-report")
+async def knowledge_base_quantization_report(name: str, request: QuantizationReportRequest):
+    """Memory saved versus recall@k lost by each vector storage mode on a collection"""
+    try:
+        return await executor.run(
+            "knowledge_base_quantization_report",
+            registry.enhancements.knowledge_bases.quantization_report,
+            name,
+            request.queries,
+            request.k,
+            request.sample_size,
+            timeout_s=float(os.getenv("QUANTIZATION_REPORT_TIMEOUT_S", "600"))
+        )
+    except HTTPException:
+        raise
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
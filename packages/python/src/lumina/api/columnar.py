@@ -0,0 +1,96 @@
+"""
+Arrow IPC and Parquet request bodies for the analysis endpoints
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Type
+import numpy as np
+from pydantic import BaseModel
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+ARROW_FILE_MEDIA_TYPE = "application/vnd.apache.arrow.file"
+PARQUET_MEDIA_TYPES = ("application/vnd.apache.parquet", "application/x-parquet")
+
+MEDIA_TYPES = (ARROW_STREAM_MEDIA_TYPE, ARROW_FILE_MEDIA_TYPE) + PARQUET_MEDIA_TYPES
+
+
+def _media_type(content_type: Optional[str]) -> str:
+    return (content_type or "").split(";")[0].strip().lower()
+
+
+def is_columnar(content_type: Optional[str]) -> bool:
+    """Whether a request body is an Arrow or Parquet upload"""
+    return _media_type(content_type) in MEDIA_TYPES
+
+
+def openapi_body(model: Type[BaseModel], description: str) -> Dict[str, Any]:
+    """OpenAPI request body for endpoints taking JSON or an Arrow/Parquet upload"""
+    binary = {"schema": {"type": "string", "format": "binary"}, "description": description}
+    return {
+        "requestBody": {
+            "content": {
+                "application/json": {"schema": model.model_json_schema()},
+                **{media_type: binary for media_type in MEDIA_TYPES},
+            },
+            "required": True,
+        }
+    }
+
+
+def read_columns(
+    body: bytes,
+    content_type: Optional[str],
+    names: List[str],
+    optional: Sequence[str] = ()
+) -> Dict[str, np.ndarray]:
+    """
+    Decode the named columns of an Arrow IPC (stream or file) or Parquet body
+
+    Parquet bodies only decode the requested columns. Numeric and timestamp
+    columns without nulls in a single chunk are returned as zero-copy views
+    of the Arrow buffers.
+
+    Args:
+        body: Raw request body
+        content_type: Content-Type header naming the format
+        names: Columns to extract
+        optional: Further columns extracted only when the body has them
+
+    Returns:
+        One NumPy array per column
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("pyarrow is required for Arrow and Parquet request bodies")
+
+    media_type = _media_type(content_type)
+    try:
+        if media_type == ARROW_STREAM_MEDIA_TYPE:
+            table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+        elif media_type == ARROW_FILE_MEDIA_TYPE:
+            table = pa.ipc.open_file(pa.py_buffer(body)).read_all()
+        elif media_type in PARQUET_MEDIA_TYPES:
+            schema = pq.read_schema(pa.BufferReader(body))
+            missing = [name for name in names if name not in schema.names]
+            if missing:
+                raise ValueError(f"Missing columns: {', '.join(missing)}")
+            present = [name for name in optional if name in schema.names]
+            table = pq.read_table(pa.BufferReader(body), columns=list(names) + present)
+        else:
+            raise ValueError(f"Unsupported columnar media type: {media_type}")
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Could not read {media_type} body: {e}")
+
+    missing = [name for name in names if name not in table.column_names]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    columns = {}
+    for name in list(names) + [name for name in optional if name in table.column_names]:
+        column = table.column(name)
+        if column.num_chunks == 1:
+            columns[name] = column.chunk(0).to_numpy(zero_copy_only=False)
+        else:
+            columns[name] = column.to_numpy()
+    return columns
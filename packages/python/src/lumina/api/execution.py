@@ -0,0 +1,215 @@
+"""
+Execution layer that keeps CPU-bound model work off the asyncio event loop
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+import asyncio
+import multiprocessing
+import os
+import time
+
+from fastapi import HTTPException
+
+
+class _Gate:
+    """Per-endpoint concurrency limit with a bounded wait queue"""
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.admitted = 0
+        self.running = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+
+class WorkExecutor:
+    """Dispatches blocking calls to bounded thread/process pools with backpressure"""
+
+    # Limits applied unless overridden; training and lead de-duplication are serialized
+    default_limits: Dict[str, Tuple[int, int]] = {
+        'classify_train': (1, 2),
+        'leads_duplicates': (1, 0),
+        'knowledge_base_quantization_report': (1, 0),
+        'knowledge_base_rebuild': (1, 0),
+        'support_cost_report': (1, 0),
+    }
+
+    def __init__(
+        self,
+        thread_workers: int = 4,
+        process_workers: int = 0,
+        timeout_s: float = 60.0,
+        limits: Optional[Dict[str, Tuple[int, int]]] = None
+    ):
+        """
+        Initialize executor
+
+        Args:
+            thread_workers: Threads for torch/NumPy work that releases the GIL
+            process_workers: Processes for pure-Python work (0 runs it on threads)
+            timeout_s: Default per-request timeout, including time spent queued
+            limits: Per-endpoint (max_concurrency, max_queue) overrides
+        """
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self.timeout_s = timeout_s
+        self.limits = {**self.default_limits, **(limits or {})}
+        self.thread_pool = ThreadPoolExecutor(
+            max_workers=thread_workers,
+            thread_name_prefix='lumina-work'
+        )
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._gates: Dict[str, _Gate] = {}
+
+    @classmethod
+    def from_env(cls) -> 'WorkExecutor':
+        """
+        Create an executor configured from EXECUTOR_* environment variables
+
+        EXECUTOR_LIMITS is a comma-separated list of endpoint=concurrency:queue,
+        e.g. "classify_train=1:2,enhance_financial=2:8".
+        """
+        limits = {}
+        for item in filter(None, os.getenv('EXECUTOR_LIMITS', '').split(',')):
+            name, _, value = item.partition('=')
+            concurrency, _, queue = value.partition(':')
+            limits[name.strip()] = (int(concurrency), int(queue or 0))
+
+        return cls(
+            thread_workers=int(os.getenv('EXECUTOR_THREAD_WORKERS', '4')),
+            process_workers=int(os.getenv('EXECUTOR_PROCESS_WORKERS', '0')),
+            timeout_s=float(os.getenv('EXECUTOR_TIMEOUT_S', '60')),
+            limits=limits
+        )
+
+    async def run(
+        self,
+        endpoint: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        pool: str = 'thread',
+        timeout_s: Optional[float] = None,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Run a blocking call for an endpoint without blocking the event loop
+
+        Args:
+            endpoint: Name used for the concurrency limit
+            fn: Callable to run (must be picklable for the process pool)
+            *args: Positional arguments for fn
+            pool: 'thread' or 'process'
+            timeout_s: Override of the default timeout
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            The value returned by fn
+
+        Raises:
+            HTTPException: 503 when the endpoint queue is full, 504 on timeout
+        """
+        gate = self._gate(endpoint)
+        timeout_s = self.timeout_s if timeout_s is None else timeout_s
+        deadline = time.monotonic() + timeout_s
+
+        # Admitted requests are either running or queued on the semaphore
+        if gate.admitted >= gate.max_concurrency + gate.max_queue:
+            gate.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail=f"Too many concurrent {endpoint} requests",
+                headers={"Retry-After": "1"}
+            )
+
+        gate.admitted += 1
+        try:
+            await asyncio.wait_for(gate.semaphore.acquire(), timeout_s)
+        except asyncio.TimeoutError:
+            gate.admitted -= 1
+            gate.timeouts += 1
+            raise HTTPException(status_code=504, detail=f"{endpoint} timed out while queued")
+        except BaseException:
+            gate.admitted -= 1
+            raise
+
+        def release(_: Any = None) -> None:
+            gate.admitted -= 1
+            gate.running -= 1
+            gate.semaphore.release()
+
+        # The slot is held until the work really finishes, even if the caller times out
+        gate.running += 1
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._pool(pool), partial(fn, *args, **kwargs))
+        except BaseException:
+            release()
+            raise
+
+        future.add_done_callback(release)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(future),
+                max(0.0, deadline - time.monotonic())
+            )
+        except asyncio.TimeoutError:
+            gate.timeouts += 1
+            raise HTTPException(status_code=504, detail=f"{endpoint} timed out")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-endpoint running/queued/rejected counters"""
+        return {
+            'thread_workers': self.thread_workers,
+            'process_workers': self.process_workers,
+            'timeout_s': self.timeout_s,
+            'endpoints': {
+                name: {
+                    'max_concurrency': gate.max_concurrency,
+                    'max_queue': gate.max_queue,
+                    'running': gate.running,
+                    'queued': gate.admitted - gate.running,
+                    'rejected': gate.rejected,
+                    'timeouts': gate.timeouts,
+                }
+                for name, gate in sorted(self._gates.items())
+            },
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker pools without waiting for in-flight work"""
+        self.thread_pool.shutdown(wait=False, cancel_futures=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _gate(self, endpoint: str) -> _Gate:
+        """Get or lazily create the gate for an endpoint"""
+        gate = self._gates.get(endpoint)
+        if gate is None:
+            concurrency, queue = self.limits.get(
+                endpoint,
+                (self.thread_workers, 4 * self.thread_workers)
+            )
+            gate = self._gates[endpoint] = _Gate(max(1, concurrency), max(0, queue))
+        return gate
+
+    def _pool(self, pool: str) -> Executor:
+        """Resolve a pool name, falling back to threads when processes are disabled"""
+        if pool == 'process' and self.process_workers > 0:
+            if self._process_pool is None:
+                # spawn avoids forking a parent that already holds torch/BLAS threads
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._process_pool
+        if pool not in ('thread', 'process'):
+            raise ValueError(f"Unknown pool: {pool}")
+        return self.thread_pool
+
+
+executor = WorkExecutor.from_env()
@@ -2,20 +2,28 @@
 FastAPI server for Python AI services
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field, ValidationError
 from typing import List, Optional, Dict, Any
+import asyncio
 import os
 from dotenv import load_dotenv
 
-from ..ai.embeddings import EmbeddingService
-from ..ai.classifier import TextClassifier
-from ..ai.analyzer import DataAnalyzer
-from . import agents
-
+# Load .env before the service modules read their configuration at import
 load_dotenv()
 
+from ..ai.batching import EmbeddingBatcher  # noqa: E402
+from ..ai.forecasting import MAX_FOLDS, MAX_PERIODS, MAX_SEASON_LENGTH  # noqa: E402
+from ..ai import vector_index  # noqa: E402
+from ..services import registry  # noqa: E402
+from . import agents  # noqa: E402
+from .execution import executor  # noqa: E402
+from . import columnar  # noqa: E402
+from . import streaming  # noqa: E402
+from . import wire  # noqa: E402
+
 app = FastAPI(title="Lumina AI Python Services", version="1.0.0")
 
 # Include agent enhancement routes
@@ -30,10 +38,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-embedding_service = EmbeddingService()
-classifier = TextClassifier()
-analyzer = DataAnalyzer()
+# Shared per-process services (also used by the agent router). They are
+# created lazily and warmed up in the background once the server is bound,
+# unless LUMINA_PRELOAD_MODELS asks for everything up front.
+if os.getenv("LUMINA_PRELOAD_MODELS", "").lower() in ("1", "true", "yes"):
+    registry.preload()
+
+embed_batcher = EmbeddingBatcher.from_env(registry.embedding_service, executor.thread_pool)
 
 
 # Request/Response models
@@ -50,16 +61,77 @@ class SimilarityRequest(BaseModel):
     embedding2: List[float]
 
 
+class SimilarityMatrixRequest(BaseModel):
+    queries: List[List[float]]
+    # Omit to compare the queries with each other
+    candidates: Optional[List[List[float]]] = None
+    # "cosine" when omitted; may also be given as a query parameter
+    metric: Optional[str] = None
+    # Return only pairs scoring at least this (at most, for euclidean distance)
+    threshold: Optional[float] = None
+
+
 class ClassifyRequest(BaseModel):
     text: str
+    # Embedding head to use instead of the TF-IDF classifier
+    head: Optional[str] = None
+
+
+class ClassifyBatchRequest(BaseModel):
+    texts: List[str]
+    top_k: int = 1
+    head: Optional[str] = None
+
+
+class SentimentBatchRequest(BaseModel):
+    texts: List[str]
+
+
+class LexiconRequest(BaseModel):
+    # Omitted fields take the built-in defaults
+    categories: Optional[Dict[str, Dict[str, float]]] = None
+    negations: Optional[List[str]] = None
+    negation_window: Optional[int] = None
+    negated: Optional[Dict[str, Optional[str]]] = None
 
 
 class TrainRequest(BaseModel):
     texts: List[str]
     labels: List[str]
+    # Train a linear head on the texts' embeddings (e.g. "sentiment") instead
+    head: Optional[str] = None
+
+
+class PartialTrainRequest(BaseModel):
+    texts: List[str]
+    labels: List[str]
+    classes: Optional[List[str]] = None
+    save: bool = False
+    # Replace a fully trained live model with a new incremental one
+    reset: bool = False
+
+
+class RollbackRequest(BaseModel):
+    version: Optional[str] = None
 
 
 class AnalyzeRequest(BaseModel):
+    # Either rows in `data`, or parallel `dates` and `values` columns
+    data: Optional[List[Dict[str, Any]]] = None
+    dates: Optional[List[Any]] = None
+    values: Optional[List[float]] = None
+    date_field: str = "date"
+    value_field: str = "value"
+
+
+class AnalyzeBatchRequest(BaseModel):
+    data: List[Dict[str, Any]]
+    series_field: str = "series_id"
+    date_field: str = "date"
+    value_field: str = "value"
+
+
+class SeriesPointsRequest(BaseModel):
     data: List[Dict[str, Any]]
     date_field: str = "date"
     value_field: str = "value"
@@ -68,12 +140,45 @@ class AnalyzeRequest(BaseModel):
 class AnomalyRequest(BaseModel):
     values: List[float]
     method: str = "iqr"
+    output: str = "records"
+    window: int = 30
+    threshold: Optional[float] = None
 
 
 class ForecastRequest(BaseModel):
     values: List[float]
-    periods: int = 7
+    periods: int = Field(7, ge=1, le=MAX_PERIODS)
+    method: str = "moving_average"
+    season_length: Optional[int] = Field(None, ge=2, le=MAX_SEASON_LENGTH)
+
+
+class ForecastBatchRequest(BaseModel):
+    series: Dict[str, List[float]]
+    periods: int = Field(7, ge=1, le=MAX_PERIODS)
     method: str = "moving_average"
+    season_length: Optional[int] = Field(None, ge=2, le=MAX_SEASON_LENGTH)
+
+
+class BacktestRequest(BaseModel):
+    values: List[float]
+    methods: List[str] = ["moving_average"]
+    horizon: int = Field(7, ge=1, le=MAX_PERIODS)
+    folds: int = Field(3, ge=1, le=MAX_FOLDS)
+    season_length: Optional[int] = Field(None, ge=2, le=MAX_SEASON_LENGTH)
+
+
+@app.on_event("startup")
+async def start_background_work():
+    """Start the embedding micro-batcher and warm models up after binding"""
+    await embed_batcher.start()
+    asyncio.get_running_loop().run_in_executor(executor.thread_pool, registry.warm_up)
+
+
+@app.on_event("shutdown")
+async def stop_workers():
+    """Stop the embedding micro-batcher and worker pools"""
+    await embed_batcher.stop()
+    executor.shutdown()
 
 
 @app.get("/health")
@@ -82,52 +187,448 @@ async def health():
     return {"status": "ok", "service": "lumina-ai-python"}
 
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 only once every model is loaded and warmed up"""
+    body = {"ready": registry.is_ready, "models": registry.status()}
+    return JSONResponse(body, status_code=200 if registry.is_ready else 503)
+
+
+def _response_dtype(http_request: Request) -> Optional[str]:
+    """Binary dtype requested via the Accept header, or None for JSON"""
+    try:
+        return wire.negotiate(http_request.headers.get("accept"))
+    except ValueError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
+
 @app.post("/ai/embed")
-async def embed(request: EmbedRequest):
-    """Generate embedding for text"""
+async def embed(request: EmbedRequest, http_request: Request):
+    """Generate embedding for text (JSON, or binary with Accept: application/octet-stream)"""
+    dtype = _response_dtype(http_request)
     try:
-        embedding = embedding_service.embed(request.text)
-        return {"embedding": embedding, "dimension": len(embedding)}
+        embedding = await asyncio.wait_for(
+            embed_batcher.embed(request.text),
+            executor.timeout_s
+        )
+        if dtype is not None:
+            return wire.binary_response(embedding.reshape(1, -1), dtype)
+        return {"embedding": embedding.tolist(), "dimension": len(embedding)}
+    except HTTPException:
+        raise
+    except asyncio.QueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many queued embed requests",
+            headers={"Retry-After": "1"}
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="embed timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/executor/stats")
+async def executor_stats():
+    """Worker pool and per-endpoint backpressure statistics"""
+    return executor.stats()
+
+
+@app.get("/ai/embed/stats")
+async def embed_stats():
+    """Embedding cache and micro-batcher statistics"""
+    return {"cache": registry.embedding_service.cache.stats(), "batcher": embed_batcher.stats()}
+
+
 @app.post("/ai/embed/batch")
-async def embed_batch(request: EmbedBatchRequest):
-    """Generate embeddings for multiple texts"""
+async def embed_batch(request: EmbedBatchRequest, http_request: Request):
+    """Generate embeddings for multiple texts (JSON or binary, see /ai/embed)"""
+    dtype = _response_dtype(http_request)
     try:
-        embeddings = embedding_service.embed_batch(request.texts)
-        return {"embeddings": embeddings, "count": len(embeddings)}
+        embeddings = await executor.run(
+            "embed_batch",
+            registry.embedding_service.embed_matrix,
+            request.texts
+        )
+        if dtype is not None:
+            return wire.binary_response(embeddings, dtype)
+        # JSONResponse skips jsonable_encoder's per-float walk of the nested lists
+        return JSONResponse({"embeddings": embeddings.tolist(), "count": len(embeddings)})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/ai/similarity")
-async def similarity(request: SimilarityRequest):
-    """Calculate similarity between two embeddings"""
+@app.post(
+    "/ai/embed/stream",
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                streaming.NDJSON_MEDIA_TYPE: {
+                    "schema": {"type": "string"},
+                    "description": 'One {"id": ..., "text": ...} object per line',
+                },
+            },
+            "required": True,
+        }
+    },
+)
+async def embed_stream(
+    http_request: Request,
+    chunk_size: int = 256,
+    resume_after: Optional[str] = None
+):
+    """
+    Embed an NDJSON stream of {id, text} records
+
+    Records are embedded chunk_size at a time and {id, embedding} lines are
+    streamed back as each chunk completes, so memory stays bounded by the
+    chunk size. Invalid records produce {id, error} lines; the stream ends
+    with a {"done": true, "last_id": ...} summary. Pass resume_after=<id>
+    to skip everything up to and including that record.
+    """
+    if not 1 <= chunk_size <= 4096:
+        raise HTTPException(status_code=400, detail="chunk_size must be between 1 and 4096")
+
+    async def embed_chunk(texts: List[str]):
+        return await executor.run(
+            "embed_stream",
+            registry.embedding_service.embed_matrix,
+            texts
+        )
+
+    records = streaming.iter_ndjson(http_request.stream())
+    return streaming.DuplexStreamingResponse(
+        streaming.embed_ndjson(records, embed_chunk, chunk_size, resume_after),
+        media_type=streaming.NDJSON_MEDIA_TYPE
+    )
+
+
+@app.post(
+    "/ai/similarity",
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {"schema": SimilarityRequest.model_json_schema()},
+                "application/octet-stream": {
+                    "schema": {"type": "string", "format": "binary"},
+                    "description": "2 x dimension matrix; X-Embedding-Shape header required",
+                },
+            },
+            "required": True,
+        }
+    },
+)
+async def similarity(http_request: Request):
+    """Calculate similarity between two embeddings (JSON or binary body)"""
+    try:
+        if wire.is_binary(http_request.headers.get("content-type")):
+            vectors = wire.decode_matrix(
+                await http_request.body(),
+                http_request.headers.get("content-type"),
+                http_request.headers.get("x-embedding-shape")
+            )
+            if len(vectors) != 2:
+                raise ValueError("Binary similarity body must contain exactly 2 rows")
+            embedding1, embedding2 = vectors
+        else:
+            request = SimilarityRequest.model_validate(await http_request.json())
+            embedding1, embedding2 = request.embedding1, request.embedding2
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
-        score = embedding_service.similarity(request.embedding1, request.embedding2)
+        score = registry.embedding_service.similarity(embedding1, embedding2)
         return {"similarity": score}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _merge_param(name: str, query_value: Any, body_value: Any) -> Any:
+    """Value of a setting given as a query parameter, a body field or both (must agree)"""
+    if query_value is not None and body_value is not None and query_value != body_value:
+        raise ValueError(f"{name} differs between the query string and the body")
+    return query_value if query_value is not None else body_value
+
+
+@app.post(
+    "/ai/similarity/matrix",
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {"schema": SimilarityMatrixRequest.model_json_schema()},
+                "application/octet-stream": {
+                    "schema": {"type": "string", "format": "binary"},
+                    "description": (
+                        "Queries followed by candidates; X-Embedding-Shape header required, "
+                        "query_rows parameter splits the two (all rows are queries if omitted)"
+                    ),
+                },
+            },
+            "required": True,
+        }
+    },
+)
+async def similarity_matrix(
+    http_request: Request,
+    metric: Optional[str] = None,
+    threshold: Optional[float] = None,
+    query_rows: Optional[int] = None
+):
+    """
+    Score every query against every candidate (JSON or binary body)
+
+    Without a threshold the dense matrix is returned (as binary when the
+    Accept header asks for it); with one, only the passing pairs are
+    returned as parallel rows/columns/scores arrays. The matrix is computed
+    in blocks, so only the output grows with the input size. metric and
+    threshold may come from the query string or the JSON body; giving both
+    with different values is rejected.
+    """
+    content_type = http_request.headers.get("content-type")
+    dtype = _response_dtype(http_request)
+    try:
+        if wire.is_binary(content_type):
+            matrix = wire.decode_matrix(
+                await http_request.body(),
+                content_type,
+                http_request.headers.get("x-embedding-shape")
+            )
+            if query_rows is None:
+                queries, candidates = matrix, None
+            elif 0 < query_rows < len(matrix):
+                queries, candidates = matrix[:query_rows], matrix[query_rows:]
+            else:
+                raise ValueError("query_rows must leave at least one query and one candidate")
+        else:
+            request = SimilarityMatrixRequest.model_validate(await http_request.json())
+            queries, candidates = request.queries, request.candidates
+            metric = _merge_param("metric", metric, request.metric)
+            threshold = _merge_param("threshold", threshold, request.threshold)
+        metric = metric or "cosine"
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        if threshold is None:
+            rows = len(queries)
+            columns = rows if candidates is None else len(candidates)
+            limit = int(os.getenv("SIMILARITY_MAX_DENSE_SCORES", "10000000"))
+            if rows * columns > limit:
+                raise ValueError(
+                    f"{rows}x{columns} matrix exceeds {limit} scores; pass a threshold"
+                )
+            scores = await executor.run(
+                "similarity_matrix", vector_index.similarity_matrix, queries, candidates, metric
+            )
+            if dtype is not None:
+                return wire.binary_response(scores, dtype)
+            return JSONResponse(
+                {"metric": metric, "shape": list(scores.shape), "scores": scores.tolist()}
+            )
+
+        rows, columns, scores = await executor.run(
+            "similarity_matrix",
+            vector_index.similarity_pairs,
+            queries,
+            candidates,
+            metric,
+            threshold,
+            max_pairs=int(os.getenv("SIMILARITY_MAX_PAIRS", "10000000"))
+        )
+        return JSONResponse({
+            "metric": metric,
+            "threshold": threshold,
+            "count": int(len(scores)),
+            "rows": rows.tolist(),
+            "columns": columns.tolist(),
+            "scores": scores.tolist(),
+        })
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/ai/classify/sentiment")
 async def classify_sentiment(request: ClassifyRequest):
     """Classify text sentiment"""
     try:
-        result = classifier.classify_sentiment(request.text)
+        result = registry.classifier.classify_sentiment(request.text)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/ai/classify/sentiment/batch")
+async def classify_sentiment_batch(request: SentimentBatchRequest):
+    """Classify the sentiment of many texts"""
+    try:
+        results = await executor.run(
+            "classify_sentiment_batch",
+            registry.classifier.classify_sentiment_batch,
+            request.texts
+        )
+        return {"results": results, "count": len(results)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/ai/lexicon")
+async def get_lexicon():
+    """Active sentiment and urgency lexicons"""
+    try:
+        return registry.lexicon.describe()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.put("/ai/lexicon")
+async def update_lexicon(request: LexiconRequest):
+    """Replace the lexicons (written to LEXICON_PATH when configured)"""
+    try:
+        config = request.model_dump(exclude_none=True)
+        return await executor.run("lexicon_update", registry.lexicon.update, config)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/ai/lexicon/reload")
+async def reload_lexicon():
+    """Recompile the lexicons from LEXICON_PATH"""
+    try:
+        return await executor.run("lexicon_reload", registry.lexicon.reload)
+    except HTTPException:
+        raise
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/ai/classify/train")
 async def train_classifier(request: TrainRequest):
-    """Train text classifier"""
+    """Train a new classifier (or embedding head) version and swap it in once fitted"""
+    try:
+        if request.head is not None:
+            model = await executor.run(
+                "classify_train",
+                registry.embedding_heads.train,
+                request.head,
+                request.texts,
+                request.labels
+            )
+            return {
+                "status": "trained",
+                "head": request.head,
+                "classes": model["classes"],
+                "version": model["version"],
+            }
+
+        model = await executor.run(
+            "classify_train",
+            registry.classifier.train,
+            request.texts,
+            request.labels
+        )
+        return {"status": "trained", "classes": model["classes"], "version": model["version"]}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/ai/classify/train/partial")
+async def partial_train_classifier(request: PartialTrainRequest):
+    """Update the live classifier with a mini-batch of labelled texts"""
     try:
-        classifier.train(request.texts, request.labels)
-        return {"status": "trained", "classes": classifier.classes_}
+        model = await executor.run(
+            "classify_partial_train",
+            registry.classifier.partial_train,
+            request.texts,
+            request.labels,
+            request.classes,
+            request.save,
+            request.reset
+        )
+        return {
+            "status": "updated",
+            "classes": model["classes"],
+            "version": model["version"],
+            "training_samples": model["training_samples"],
+            "batch": model["batch"],
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/ai/classify/train/history")
+async def classifier_training_history():
+    """Progressive-validation accuracy of each incremental batch"""
+    try:
+        return {"history": registry.classifier.training_history()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/ai/classify/heads")
+async def list_embedding_heads():
+    """Trained embedding heads"""
+    try:
+        return {"heads": registry.embedding_heads.describe()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/ai/classify/models")
+async def list_classifier_models():
+    """Stored classifier versions and the one currently serving"""
+    try:
+        return {
+            "active_version": registry.classifier.version,
+            "versions": registry.classifier.list_versions(),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/ai/classify/models/rollback")
+async def rollback_classifier(request: RollbackRequest):
+    """Reactivate a stored classifier version (default: the previous one)"""
+    try:
+        model = await executor.run(
+            "classify_rollback",
+            registry.classifier.rollback,
+            request.version
+        )
+        return {"status": "rolled_back", "version": model["version"], "classes": model["classes"]}
+    except HTTPException:
+        raise
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -136,51 +637,361 @@ async def train_classifier(request: TrainRequest):
 async def predict(request: ClassifyRequest):
     """Predict label for text"""
     try:
-        if not classifier.is_trained:
+        if request.head is not None:
+            return await executor.run(
+                "classify_predict",
+                registry.embedding_heads.classify_text,
+                request.head,
+                request.text
+            )
+        if not registry.classifier.is_trained:
             raise HTTPException(status_code=400, detail="Classifier not trained")
-        label = classifier.predict(request.text)
-        probabilities = classifier.predict_proba(request.text)
-        return {"label": label, "probabilities": probabilities}
+        return await executor.run("classify_predict", registry.classifier.classify, request.text)
+    except HTTPException:
+        raise
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/ai/classify/predict/batch")
+async def predict_batch(request: ClassifyBatchRequest):
+    """Predict labels for many texts with one vectorization pass"""
+    try:
+        if request.head is not None:
+            result = await executor.run(
+                "classify_predict_batch",
+                registry.embedding_heads.predict_batch,
+                request.head,
+                request.texts,
+                request.top_k
+            )
+        else:
+            if not registry.classifier.is_trained:
+                raise HTTPException(status_code=400, detail="Classifier not trained")
+            result = await executor.run(
+                "classify_predict_batch",
+                registry.classifier.predict_batch,
+                request.texts,
+                request.top_k
+            )
+        return JSONResponse({**result, "count": len(result["predictions"])})
+    except HTTPException:
+        raise
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post(
+    "/ai/analyze/timeseries",
+    openapi_extra=columnar.openapi_body(
+        AnalyzeRequest, "Table with date and value columns named by the query parameters"
+    ),
+)
+async def analyze_timeseries(
+    http_request: Request,
+    date_field: str = "date",
+    value_field: str = "value"
+):
+    """
+    Analyze time series data
+
+    Accepts JSON rows ({"data": [...]}), JSON columns ({"dates": [...],
+    "values": [...]}) or an Arrow IPC / Parquet upload.
+    """
+    content_type = http_request.headers.get("content-type")
+    try:
+        if columnar.is_columnar(content_type):
+            columns = columnar.read_columns(
+                await http_request.body(), content_type, [date_field, value_field]
+            )
+            call = (registry.analyzer.analyze_arrays, columns[date_field], columns[value_field])
+        else:
+            request = AnalyzeRequest.model_validate(await http_request.json())
+            if request.data is not None:
+                call = (
+                    registry.analyzer.analyze_time_series,
+                    request.data,
+                    request.date_field,
+                    request.value_field
+                )
+            elif request.dates is not None and request.values is not None:
+                call = (registry.analyzer.analyze_arrays, request.dates, request.values)
+            else:
+                raise ValueError("Provide 'data' rows or 'dates' and 'values' columns")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        return await executor.run("analyze_timeseries", *call, pool="process")
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post(
+    "/ai/analyze/timeseries/batch",
+    openapi_extra=columnar.openapi_body(
+        AnalyzeBatchRequest, "Long-format table; field names come from query parameters"
+    ),
+)
+async def analyze_timeseries_batch(
+    http_request: Request,
+    series_field: str = "series_id",
+    date_field: str = "date",
+    value_field: str = "value"
+):
+    """
+    Analyze many series in one call
+
+    Accepts JSON rows or an Arrow IPC / Parquet upload with one row per
+    (series, date, value); returns analyses keyed by series id.
+    """
+    content_type = http_request.headers.get("content-type")
+    try:
+        if columnar.is_columnar(content_type):
+            data = columnar.read_columns(
+                await http_request.body(), content_type, [series_field, date_field, value_field]
+            )
+        else:
+            request = AnalyzeBatchRequest.model_validate(await http_request.json())
+            data = request.data
+            series_field = request.series_field
+            date_field = request.date_field
+            value_field = request.value_field
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        results = await executor.run(
+            "analyze_timeseries_batch",
+            registry.analyzer.analyze_time_series_batch,
+            data,
+            series_field,
+            date_field,
+            value_field,
+            pool="process"
+        )
+        return {"series": results, "count": len(results)}
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/ai/analyze/timeseries")
-async def analyze_timeseries(request: AnalyzeRequest):
-    """Analyze time series data"""
+@app.get("/ai/timeseries")
+async def list_series():
+    """List incrementally maintained series"""
+    return {"series": registry.timeseries.list_series()}
+
+
+@app.post("/ai/timeseries/{series_id}/points")
+async def ingest_series_points(series_id: str, request: SeriesPointsRequest):
+    """
+    Append points to a series and return its updated analysis
+
+    Points within a request may arrive in any order, but none may be older
+    than the latest point already ingested.
+    """
     try:
-        result = analyzer.analyze_time_series(
+        return await executor.run(
+            "timeseries_ingest",
+            registry.timeseries.ingest,
+            series_id,
             request.data,
             request.date_field,
             request.value_field
         )
-        return result
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/ai/analyze/anomalies")
-async def detect_anomalies(request: AnomalyRequest):
-    """Detect anomalies in data"""
+@app.get("/ai/timeseries/{series_id}")
+async def get_series_analysis(series_id: str):
+    """Current analysis of a series, same shape as /ai/analyze/timeseries"""
     try:
-        anomalies = analyzer.detect_anomalies(request.values, request.method)
+        return registry.timeseries.analysis(series_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/ai/timeseries/{series_id}/snapshot")
+async def snapshot_series(series_id: str):
+    """Serializable accumulator state of a series"""
+    try:
+        return registry.timeseries.snapshot(series_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.put("/ai/timeseries/{series_id}/snapshot")
+async def restore_series(series_id: str, state: Dict[str, Any]):
+    """Replace a series with a snapshot taken earlier"""
+    try:
+        registry.timeseries.restore(series_id, state)
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid snapshot: {e}")
+    return {"series_id": series_id, "restored": True}
+
+
+@app.delete("/ai/timeseries/{series_id}")
+async def drop_series(series_id: str):
+    """Forget a series"""
+    try:
+        registry.timeseries.drop(series_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"series_id": series_id, "deleted": True}
+
+
+@app.post(
+    "/ai/analyze/anomalies",
+    openapi_extra=columnar.openapi_body(
+        AnomalyRequest, "Table with a value column named by the value_field query parameter"
+    ),
+)
+async def detect_anomalies(
+    http_request: Request,
+    value_field: str = "value",
+    method: str = "iqr",
+    output: str = "records",
+    window: int = 30,
+    threshold: Optional[float] = None
+):
+    """
+    Detect anomalies in data (methods: iqr, zscore, mad, rolling)
+
+    Accepts a JSON body ({"values": [...], "method": ...}) or an Arrow IPC /
+    Parquet upload, in which case the options come from query parameters.
+    """
+    content_type = http_request.headers.get("content-type")
+    try:
+        if columnar.is_columnar(content_type):
+            values = columnar.read_columns(
+                await http_request.body(), content_type, [value_field]
+            )[value_field]
+        else:
+            request = AnomalyRequest.model_validate(await http_request.json())
+            values = request.values
+            method = request.method
+            output = request.output
+            window = request.window
+            threshold = request.threshold
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        anomalies = await executor.run(
+            "analyze_anomalies",
+            registry.analyzer.detect_anomalies,
+            values,
+            method,
+            output,
+            window,
+            threshold,
+            pool="process"
+        )
+        if output == "columnar":
+            return {"anomalies": anomalies, "count": len(anomalies["indices"])}
         return {"anomalies": anomalies, "count": len(anomalies)}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/ai/analyze/forecast")
 async def forecast(request: ForecastRequest):
-    """Generate forecast"""
+    """Generate forecast (methods: see lumina.ai.forecasting.METHODS)"""
     try:
-        forecast_values = analyzer.forecast(
+        forecast_values = await executor.run(
+            "analyze_forecast",
+            registry.analyzer.forecast,
             request.values,
             request.periods,
-            request.method
+            request.method,
+            request.season_length,
+            pool="process"
         )
         return {"forecast": forecast_values, "periods": request.periods}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/ai/analyze/forecast/batch")
+async def forecast_batch(request: ForecastBatchRequest):
+    """Forecast many series in one call"""
+    try:
+        forecasts = await executor.run(
+            "analyze_forecast_batch",
+            registry.analyzer.forecast_batch,
+            request.series,
+            request.periods,
+            request.method,
+            request.season_length,
+            pool="process"
+        )
+        return {"forecasts": forecasts, "periods": request.periods, "count": len(forecasts)}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/ai/analyze/forecast/backtest")
+async def backtest_forecast(request: BacktestRequest):
+    """Rolling-origin MAE/MAPE for one or more forecasting methods"""
+    try:
+        return await executor.run(
+            "analyze_forecast_backtest",
+            registry.analyzer.backtest_forecast,
+            request.values,
+            request.methods,
+            request.horizon,
+            request.folds,
+            request.season_length,
+            pool="process"
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -0,0 +1,182 @@
+"""
+NDJSON streaming helpers for processing large record sets with bounded memory
+"""
+
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+import json
+import numpy as np
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body iterator is still reading the request body"""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # The stock response polls receive() for a disconnect while streaming,
+        # which would swallow request body chunks; Request.stream() already
+        # raises ClientDisconnect when the client goes away.
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+def _line(payload: Dict[str, Any]) -> bytes:
+    return (json.dumps(payload, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+async def iter_ndjson(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int = 1024 * 1024
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse an NDJSON byte stream one record at a time
+
+    Args:
+        chunks: Raw body chunks (e.g. Request.stream())
+        max_line_bytes: Longest accepted line; guards the line buffer
+
+    Yields:
+        Decoded records; malformed lines yield {'_error': ..., '_line': n}
+    """
+    buffer = b""
+    line_number = 0
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            line_number += 1
+            # A line that arrives whole in one chunk never sits in the buffer
+            if len(raw) > max_line_bytes:
+                raise ValueError(f"NDJSON line {line_number} exceeds {max_line_bytes} bytes")
+            if raw.strip():
+                yield _decode(raw, line_number)
+        if len(buffer) > max_line_bytes:
+            raise ValueError(f"NDJSON line {line_number + 1} exceeds {max_line_bytes} bytes")
+
+    if buffer.strip():
+        yield _decode(buffer, line_number + 1)
+
+
+def _decode(raw: bytes, line_number: int) -> Dict[str, Any]:
+    try:
+        record = json.loads(raw)
+    except ValueError as e:
+        return {"_error": f"Invalid JSON: {e}", "_line": line_number}
+    if not isinstance(record, dict):
+        return {"_error": "Record must be a JSON object", "_line": line_number}
+    return record
+
+
+async def process_ndjson(
+    records: AsyncIterator[Dict[str, Any]],
+    process_chunk: Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]],
+    chunk_size: int = 256,
+    resume_after: Optional[str] = None,
+    processed_key: str = "processed"
+) -> AsyncIterator[bytes]:
+    """
+    Process {id, text} records in fixed-size chunks and stream the result lines
+
+    Only one chunk of records and results is held at a time. Chunks are
+    processed in input order, so a client that loses the connection can
+    restart with resume_after set to the last id it received.
+
+    Args:
+        records: Parsed input records
+        process_chunk: Coroutine returning the output objects for a chunk
+        chunk_size: Records per process_chunk call
+        resume_after: Skip every record up to and including this id
+        processed_key: Name of the processed-record count in the summary line
+
+    Yields:
+        NDJSON lines, ending with a {'done': true, ...} summary line
+    """
+    skipping = resume_after is not None
+    pending: List[Dict[str, Any]] = []
+    processed = 0
+    errors = 0
+    last_id: Optional[str] = None
+
+    async def flush() -> AsyncIterator[bytes]:
+        nonlocal processed, last_id
+        for result in await process_chunk(pending):
+            yield _line(result)
+        processed += len(pending)
+        last_id = pending[-1]["id"]
+        pending.clear()
+
+    try:
+        async for record in records:
+            record_id = record.get("id")
+            if skipping:
+                # Errors before the resume point were reported by the earlier run
+                skipping = str(record_id) != resume_after
+                continue
+
+            if "_error" in record:
+                errors += 1
+                yield _line({"error": record["_error"], "line": record["_line"]})
+                continue
+
+            if record_id is None or not isinstance(record.get("text"), str):
+                errors += 1
+                yield _line({"id": record_id, "error": "Record needs an 'id' and a string 'text'"})
+                continue
+
+            pending.append({"id": str(record_id), "text": record["text"]})
+            if len(pending) >= chunk_size:
+                async for line in flush():
+                    yield line
+
+        if pending:
+            async for line in flush():
+                yield line
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band and stop
+        detail = getattr(e, "detail", None) or str(e)
+        yield _line({"error": detail, "last_id": last_id, "done": False})
+        return
+
+    yield _line({
+        "done": True,
+        processed_key: processed,
+        "errors": errors,
+        "last_id": last_id,
+        "resume_found": not skipping,
+    })
+
+
+def embed_ndjson(
+    records: AsyncIterator[Dict[str, Any]],
+    embed_chunk: Callable[[List[str]], Awaitable[np.ndarray]],
+    chunk_size: int = 256,
+    resume_after: Optional[str] = None
+) -> AsyncIterator[bytes]:
+    """
+    Embed {id, text} records in fixed-size chunks and stream {id, embedding} lines
+
+    Args:
+        records: Parsed input records
+        embed_chunk: Coroutine returning one embedding row per text
+        chunk_size: Records embedded per model call
+        resume_after: Skip every record up to and including this id
+
+    Returns:
+        NDJSON lines in input order, ending with a {'done': true, ...} summary line
+    """
+    async def embed(pending: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        vectors = await embed_chunk([record["text"] for record in pending])
+        return [
+            {"id": record["id"], "embedding": vector.tolist()}
+            for record, vector in zip(pending, vectors)
+        ]
+
+    return process_ndjson(records, embed, chunk_size, resume_after, "embedded")
@@ -0,0 +1,155 @@
+"""
+Binary wire formats for embedding matrices
+
+A binary body is a row-major little-endian matrix described by headers:
+
+    Content-Type: application/octet-stream; dtype=float32|float16|int8
+    X-Embedding-Shape: <rows>,<dimension>
+    X-Embedding-Dtype: float32|float16|int8
+
+int8 bodies start with one float32 scale per row, followed by the int8 codes;
+a row is decoded as codes * scale.
+"""
+
+from typing import Dict, Optional, Tuple
+import numpy as np
+from fastapi import Response
+
+BINARY_MEDIA_TYPE = "application/octet-stream"
+DTYPES = ("float32", "float16", "int8")
+
+
+def _media_params(header: str) -> Tuple[str, Dict[str, str]]:
+    """Split 'type/subtype; a=b' into the media type and its parameters"""
+    media_type, *params = [part.strip() for part in header.split(";")]
+    values = {}
+    for param in params:
+        key, _, value = param.partition("=")
+        values[key.strip().lower()] = value.strip().strip('"')
+    return media_type.lower(), values
+
+
+def _quality(params: Dict[str, str]) -> float:
+    """Weight of an Accept entry (q parameter, 1 when absent or malformed)"""
+    try:
+        return min(1.0, max(0.0, float(params.get("q", "1"))))
+    except ValueError:
+        return 1.0
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """
+    Pick the response encoding from an Accept header
+
+    The binary format is chosen only when it carries a higher q-value than
+    JSON (application/json, application/* or */*); JSON wins ties.
+
+    Args:
+        accept: Accept header value
+
+    Returns:
+        The binary dtype to send, or None for JSON
+    """
+    json_quality = 0.0
+    binary_quality = 0.0
+    binary_params: Dict[str, str] = {}
+    for candidate in filter(None, (part.strip() for part in (accept or "").split(","))):
+        media_type, params = _media_params(candidate)
+        quality = _quality(params)
+        if media_type == BINARY_MEDIA_TYPE:
+            if quality > binary_quality:
+                binary_quality, binary_params = quality, params
+        elif media_type in ("application/json", "application/*", "*/*"):
+            json_quality = max(json_quality, quality)
+
+    if binary_quality == 0.0 or binary_quality <= json_quality:
+        return None
+    dtype = binary_params.get("dtype", "float32")
+    if dtype not in DTYPES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+    return dtype
+
+
+def is_binary(content_type: Optional[str]) -> bool:
+    """Whether a request body uses the binary embedding format"""
+    return _media_params(content_type or "")[0] == BINARY_MEDIA_TYPE
+
+
+def encode_matrix(matrix: np.ndarray, dtype: str) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Serialize a 2-D matrix
+
+    Args:
+        matrix: Array of shape (rows, dimension)
+        dtype: 'float32', 'float16' or 'int8'
+
+    Returns:
+        Body bytes and the headers describing them
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if dtype == "float32":
+        body = matrix.astype("<f4", copy=False).tobytes()
+    elif dtype == "float16":
+        body = matrix.astype("<f2").tobytes()
+    elif dtype == "int8":
+        scales = (np.abs(matrix).max(axis=1, initial=0.0) / 127.0).astype("<f4")
+        safe = np.where(scales == 0, 1.0, scales)[:, None]
+        codes = np.clip(np.rint(matrix / safe), -127, 127).astype(np.int8)
+        body = scales.tobytes() + codes.tobytes()
+    else:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+    headers = {
+        "X-Embedding-Shape": f"{matrix.shape[0]},{matrix.shape[1]}",
+        "X-Embedding-Dtype": dtype,
+    }
+    return body, headers
+
+
+def decode_matrix(body: bytes, content_type: Optional[str], shape: Optional[str]) -> np.ndarray:
+    """
+    Parse a binary body into a float32 matrix
+
+    Args:
+        body: Raw request body
+        content_type: Content-Type header (dtype parameter defaults to float32)
+        shape: X-Embedding-Shape header, "<rows>,<dimension>"
+
+    Returns:
+        Float32 array of shape (rows, dimension)
+    """
+    dtype = _media_params(content_type or "")[1].get("dtype", "float32")
+    if dtype not in DTYPES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+    try:
+        rows, dimension = (int(part) for part in (shape or "").split(","))
+    except ValueError:
+        raise ValueError("X-Embedding-Shape header must be '<rows>,<dimension>'")
+
+    if dtype == "int8":
+        expected = rows * 4 + rows * dimension
+    else:
+        expected = rows * dimension * np.dtype(dtype).itemsize
+    if len(body) != expected:
+        raise ValueError(
+            f"Expected {expected} bytes for {rows}x{dimension} {dtype}, got {len(body)}"
+        )
+
+    if dtype == "int8":
+        scales = np.frombuffer(body, dtype="<f4", count=rows)
+        codes = np.frombuffer(body, dtype=np.int8, offset=rows * 4).reshape(rows, dimension)
+        return codes.astype(np.float32) * scales[:, None]
+
+    little_endian = "<f4" if dtype == "float32" else "<f2"
+    matrix = np.frombuffer(body, dtype=little_endian).reshape(rows, dimension)
+    return matrix.astype(np.float32, copy=False)
+
+
+def binary_response(matrix: np.ndarray, dtype: str) -> Response:
+    """Build an application/octet-stream response for a matrix"""
+    body, headers = encode_matrix(matrix, dtype)
+    return Response(
+        content=body,
+        media_type=f"{BINARY_MEDIA_TYPE}; dtype={dtype}",
+        headers=headers
+    )
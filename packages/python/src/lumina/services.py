@@ -0,0 +1,171 @@
+"""
+Per-process service registry so every router shares one instance of each model
+"""
+
+from typing import Any, Callable, Dict, Optional, TYPE_CHECKING
+import gc
+import os
+import threading
+import time
+
+if TYPE_CHECKING:
+    from .ai.embeddings import EmbeddingService
+    from .ai.classifier import TextClassifier
+    from .ai.analyzer import DataAnalyzer
+    from .agents.enhancements import AgentEnhancements
+    from .ai.timeseries import TimeSeriesStore
+    from .ai.lexicon import LexiconEngine
+    from .ai.embedding_heads import EmbeddingHeads
+
+
+class ServiceRegistry:
+    """Lazily creates and owns a single instance of each service"""
+
+    # Services reported by status(), in warm-up order
+    SERVICES = ('embedding_service', 'classifier', 'analyzer', 'enhancements')
+
+    def __init__(
+        self,
+        knowledge_base_dir: Optional[str] = None,
+        lead_store_dir: Optional[str] = None
+    ):
+        """
+        Initialize registry
+
+        Args:
+            knowledge_base_dir: Directory for persisted knowledge-base collections
+            lead_store_dir: Directory for persisted lead embeddings
+        """
+        self.knowledge_base_dir = knowledge_base_dir
+        self.lead_store_dir = lead_store_dir
+        self._instances: Dict[str, Any] = {}
+        self._status: Dict[str, Dict[str, Any]] = {
+            name: {'state': 'pending'} for name in self.SERVICES
+        }
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_env(cls) -> 'ServiceRegistry':
+        """Create a registry configured from environment variables"""
+        return cls(
+            knowledge_base_dir=os.getenv('KNOWLEDGE_BASE_DIR'),
+            lead_store_dir=os.getenv('LEAD_STORE_DIR')
+        )
+
+    @property
+    def embedding_service(self) -> 'EmbeddingService':
+        def create() -> 'EmbeddingService':
+            from .ai.embeddings import EmbeddingService
+            return EmbeddingService()
+        return self._get('embedding_service', create)
+
+    @property
+    def classifier(self) -> 'TextClassifier':
+        def create() -> 'TextClassifier':
+            from .ai.classifier import TextClassifier
+            from .ai.model_store import ClassifierModelStore
+            # Loads the active persisted model, if any, without retraining
+            return TextClassifier(store=ClassifierModelStore.from_env(), lexicon=self.lexicon)
+        return self._get('classifier', create)
+
+    @property
+    def lexicon(self) -> 'LexiconEngine':
+        def create() -> 'LexiconEngine':
+            from .ai.lexicon import LexiconEngine
+            return LexiconEngine.from_env()
+        return self._get('lexicon', create)
+
+    @property
+    def analyzer(self) -> 'DataAnalyzer':
+        def create() -> 'DataAnalyzer':
+            from .ai.analyzer import DataAnalyzer
+            return DataAnalyzer()
+        return self._get('analyzer', create)
+
+    @property
+    def enhancements(self) -> 'AgentEnhancements':
+        def create() -> 'AgentEnhancements':
+            from .agents.enhancements import AgentEnhancements
+            return AgentEnhancements(
+                embedding_service=self.embedding_service,
+                classifier=self.classifier,
+                analyzer=self.analyzer,
+                knowledge_base_dir=self.knowledge_base_dir,
+                heads=self.embedding_heads,
+                lead_store_dir=self.lead_store_dir
+            )
+        return self._get('enhancements', create)
+
+    @property
+    def embedding_heads(self) -> 'EmbeddingHeads':
+        def create() -> 'EmbeddingHeads':
+            from .ai.embedding_heads import EmbeddingHeads
+            return EmbeddingHeads.from_env(self.embedding_service)
+        return self._get('embedding_heads', create)
+
+    @property
+    def timeseries(self) -> 'TimeSeriesStore':
+        def create() -> 'TimeSeriesStore':
+            from .ai.timeseries import TimeSeriesStore
+            return TimeSeriesStore()
+        return self._get('timeseries', create)
+
+    def warm_up(self) -> None:
+        """
+        Create every service and load model weights, recording per-service
+        state and latency for the readiness probe
+        """
+        steps = {
+            'embedding_service': lambda: self.embedding_service.warm_up(),
+            'classifier': lambda: self.classifier,
+            'analyzer': lambda: self.analyzer,
+            'enhancements': lambda: self.enhancements,
+        }
+        for name in self.SERVICES:
+            status = self._status[name]
+            if status['state'] == 'ready':
+                continue
+
+            status.update(state='loading', error=None)
+            started = time.perf_counter()
+            try:
+                steps[name]()
+            except Exception as e:
+                status.update(state='failed', error=str(e))
+            else:
+                status['state'] = 'ready'
+            finally:
+                status['seconds'] = time.perf_counter() - started
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Per-service load state and warm-up latency"""
+        return {name: dict(status) for name, status in self._status.items()}
+
+    @property
+    def is_ready(self) -> bool:
+        return all(status['state'] == 'ready' for status in self._status.values())
+
+    def preload(self) -> None:
+        """
+        Load every service now and freeze the heap
+
+        Call before forking workers (e.g. gunicorn --preload) so model weights
+        are shared copy-on-write; gc.freeze() keeps the collector from touching,
+        and therefore copying, the preloaded objects.
+        """
+        self.warm_up()
+        gc.collect()
+        gc.freeze()
+
+    def _get(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Return the named instance, creating it once"""
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = self._instances[name] = factory()
+        return instance
+
+
+registry = ServiceRegistry.from_env()
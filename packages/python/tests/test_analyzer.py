@@ -0,0 +1,136 @@
+"""
+Tests for DataAnalyzer anomaly detection
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lumina.ai.analyzer import DataAnalyzer, PreparedSeries
+
+
+def _legacy_anomalies(values, method):
+    """The per-value anomaly rules detect_anomalies replaced, kept as a reference"""
+    values_array = np.array(values)
+    anomalies = []
+
+    if method == 'iqr':
+        q1 = np.percentile(values_array, 25)
+        q3 = np.percentile(values_array, 75)
+        iqr = q3 - q1
+        lower_bound = q1 - 1.5 * iqr
+        upper_bound = q3 + 1.5 * iqr
+
+        for idx, value in enumerate(values):
+            if value < lower_bound or value > upper_bound:
+                anomalies.append({
+                    'index': idx,
+                    'value': float(value),
+                    'type': 'outlier',
+                    'severity': 'high' if abs(value - np.median(values_array)) > 2 * iqr
+                    else 'medium'
+                })
+
+    elif method == 'zscore':
+        mean = np.mean(values_array)
+        std = np.std(values_array)
+
+        if std > 0:
+            z_scores = np.abs((values_array - mean) / std)
+
+            for idx, z_score in enumerate(z_scores):
+                if z_score > 3:
+                    anomalies.append({
+                        'index': idx,
+                        'value': float(values[idx]),
+                        'z_score': float(z_score),
+                        'type': 'outlier',
+                        'severity': 'high' if z_score > 4 else 'medium'
+                    })
+
+    return anomalies
+
+
+def _series(seed: int, size: int = 500) -> list:
+    rng = np.random.default_rng(seed)
+    values = rng.normal(100, 10, size)
+    spikes = rng.choice(size, size // 50, replace=False)
+    values[spikes] += rng.choice([-1, 1], len(spikes)) * rng.uniform(30, 90, len(spikes))
+    return values.tolist()
+
+
+SERIES = [
+    pytest.param(_series(0), id='normal-with-spikes'),
+    pytest.param(_series(1, 2000), id='long'),
+    pytest.param(np.random.default_rng(2).exponential(5, 300).tolist(), id='skewed'),
+    pytest.param([1.0, 2.0, 3.0, 2.0, 1.0], id='no-outliers'),
+    pytest.param([5.0] * 20, id='constant'),
+    pytest.param([5.0] * 20 + [50.0], id='flat-with-spike'),
+    pytest.param([7.0], id='single'),
+]
+
+
+@pytest.mark.parametrize('values', SERIES)
+@pytest.mark.parametrize('method', ['iqr', 'zscore'])
+def test_matches_legacy_rules(values, method):
+    expected = _legacy_anomalies(values, method)
+    found = DataAnalyzer().detect_anomalies(values, method=method)
+
+    assert [row['index'] for row in found] == [row['index'] for row in expected]
+    for row, reference in zip(found, expected):
+        assert row.keys() == reference.keys()
+        for key, value in reference.items():
+            assert row[key] == pytest.approx(value)
+
+
+@pytest.mark.parametrize('method', ['iqr', 'zscore', 'mad', 'rolling'])
+def test_columnar_output_matches_records(method):
+    values = _series(3)
+    analyzer = DataAnalyzer()
+    records = analyzer.detect_anomalies(values, method=method, window=20)
+    columns = analyzer.detect_anomalies(values, method=method, window=20, output='columnar')
+
+    assert columns['indices'] == [row['index'] for row in records]
+    assert columns['values'] == [row['value'] for row in records]
+    assert columns['severity'] == [row['severity'] for row in records]
+
+
+def test_mad_and_rolling_flag_injected_spikes():
+    values = np.sin(np.linspace(0, 20, 400)) * 5 + 100
+    values[[50, 200, 350]] += 40
+    analyzer = DataAnalyzer()
+
+    for method in ('mad', 'rolling'):
+        found = analyzer.detect_anomalies(values, method=method, window=30)
+        assert {50, 200, 350} <= {row['index'] for row in found}
+
+
+def test_threshold_overrides_method_default():
+    values = _series(4)
+    analyzer = DataAnalyzer()
+    default = analyzer.detect_anomalies(values, method='zscore')
+    strict = analyzer.detect_anomalies(values, method='zscore', threshold=5.0)
+
+    assert {row['index'] for row in strict} < {row['index'] for row in default}
+    assert all(row['z_score'] > 5.0 for row in strict)
+
+
+def test_prepared_series_reports_input_positions():
+    values = _series(5, 100)
+    dates = pd.date_range('2024-01-01', periods=100, freq='D')
+    order = np.random.default_rng(5).permutation(100)
+    shuffled_dates = dates[order]
+    shuffled_values = np.asarray(values)[order]
+
+    analyzer = DataAnalyzer()
+    found = analyzer.detect_anomalies_prepared(
+        PreparedSeries(shuffled_dates, shuffled_values), method='zscore'
+    )
+    expected = analyzer.detect_anomalies(shuffled_values, method='zscore')
+    assert [row['index'] for row in found] == [row['index'] for row in expected]
+
+
+@pytest.mark.parametrize('kwargs', [{'method': 'fourier'}, {'output': 'table'}])
+def test_unknown_options_raise(kwargs):
+    with pytest.raises(ValueError):
+        DataAnalyzer().detect_anomalies([1.0, 2.0, 3.0], **kwargs)
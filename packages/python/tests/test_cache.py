@@ -0,0 +1,90 @@
+"""
+Tests for the content-addressed embedding cache
+"""
+
+import numpy as np
+
+from lumina.ai.cache import EmbeddingCache, cache_key
+
+
+def _vectors(count: int, dim: int = 4) -> dict:
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((count, dim)).astype(np.float32)
+    return {cache_key('model', f'text {i}'): matrix[i] for i in range(count)}
+
+
+def test_cache_key_normalizes_whitespace():
+    assert cache_key('model', '  hello \n world ') == cache_key('model', 'hello world')
+    assert cache_key('model', 'hello') != cache_key('other', 'hello')
+
+
+def test_memory_tier_stays_within_byte_bound():
+    # Four float32 values per vector: room for exactly three entries
+    cache = EmbeddingCache(max_bytes=3 * 16)
+    items = _vectors(5)
+    cache.put_many(items)
+
+    stats = cache.stats()
+    assert stats['entries'] == 3
+    assert stats['bytes'] == 48 <= stats['max_bytes']
+    assert stats['evictions'] == 2
+
+    keys = list(items)
+    found = cache.get_many(keys)
+    # Least recently used entries are evicted first
+    assert set(found) == set(keys[2:])
+    for key in keys[2:]:
+        np.testing.assert_array_equal(found[key], items[key])
+
+
+def test_lookup_refreshes_recency():
+    cache = EmbeddingCache(max_bytes=2 * 16)
+    items = _vectors(3)
+    first, second, third = items
+    cache.put_many({first: items[first], second: items[second]})
+    cache.get_many([first])
+    cache.put_many({third: items[third]})
+
+    assert set(cache.get_many([first, second, third])) == {first, third}
+
+
+def test_vectors_larger_than_bound_are_not_cached():
+    cache = EmbeddingCache(max_bytes=8)
+    cache.put_many(_vectors(1))
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['bytes'] == 0
+
+
+def test_put_many_copies_rows_out_of_the_batch():
+    cache = EmbeddingCache()
+    matrix = np.ones((100, 4), dtype=np.float32)
+    cache.put_many({'key': matrix[0]})
+
+    stored = cache.get_many(['key'])['key']
+    assert stored.base is None
+    assert stored.nbytes == cache.stats()['bytes'] == 16
+    matrix[0] = 5.0
+    np.testing.assert_array_equal(stored, np.ones(4, dtype=np.float32))
+
+
+def test_hit_and_miss_counters():
+    cache = EmbeddingCache()
+    items = _vectors(2)
+    cache.put_many(items)
+    cache.get_many(list(items) + ['missing'])
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (2, 1)
+    assert stats['hit_rate'] == 2 / 3
+
+
+def test_persistent_tier_survives_clear(tmp_path):
+    cache = EmbeddingCache(max_bytes=1024, path=str(tmp_path / 'cache.db'))
+    items = _vectors(2)
+    cache.put_many(items)
+    cache.clear()
+
+    found = cache.get_many(list(items))
+    assert cache.stats()['disk_hits'] == 2
+    for key, vector in items.items():
+        np.testing.assert_array_equal(found[key], vector)
@@ -0,0 +1,128 @@
+"""
+Tests for knowledge-base collection persistence (snapshot plus append-only log)
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from lumina.agents.knowledge_base import KnowledgeBaseCollection
+
+DIMENSION = 16
+
+
+class HashEmbedder:
+    """Deterministic embedder: each text maps to a fixed pseudo-random vector"""
+
+    def __init__(self):
+        self.embedded = 0
+
+    def embed_matrix(self, texts):
+        self.embedded += len(texts)
+        rows = [
+            np.random.default_rng(
+                int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], 'little')
+            ).standard_normal(DIMENSION)
+            for text in texts
+        ]
+        return np.asarray(rows, dtype=np.float32).reshape(len(texts), DIMENSION)
+
+
+def _articles(*pairs):
+    return [{'id': article_id, 'content': content} for article_id, content in pairs]
+
+
+def _assert_same(loaded: KnowledgeBaseCollection, original: KnowledgeBaseCollection):
+    assert loaded.contents == original.contents
+    assert loaded.hashes == original.hashes
+    queries = HashEmbedder().embed_matrix(list(original.contents.values()))
+    assert loaded.search_batch(queries, 3) == original.search_batch(queries, 3)
+
+
+def test_writes_are_logged_and_replayed(tmp_path):
+    directory = str(tmp_path)
+    embedder = HashEmbedder()
+    collection = KnowledgeBaseCollection('faq', DIMENSION, directory=directory)
+    collection.save()
+
+    assert collection.upsert(_articles(('a', 'alpha'), ('b', 'beta')), embedder) == {
+        'inserted': 2, 'updated': 0, 'unchanged': 0
+    }
+    assert collection.upsert(_articles(('a', 'alpha'), ('b', 'beta two')), embedder) == {
+        'inserted': 0, 'updated': 1, 'unchanged': 1
+    }
+    assert collection.delete(['a', 'missing']) == 1
+    collection.upsert(_articles(('c', 'gamma')), embedder)
+    assert embedder.embedded == 4
+
+    # Only the log grew; the snapshot still holds the empty collection
+    with open(os.path.join(directory, 'faq.json')) as f:
+        assert json.load(f)['contents'] == {}
+    loaded = KnowledgeBaseCollection.load(directory, 'faq')
+    assert loaded.contents == {'b': 'beta two', 'c': 'gamma'}
+    _assert_same(loaded, collection)
+
+
+def test_log_is_compacted_into_a_new_snapshot(tmp_path):
+    directory = str(tmp_path)
+    embedder = HashEmbedder()
+    collection = KnowledgeBaseCollection('faq', DIMENSION, directory=directory, compact_after=4)
+    collection.save()
+    for batch in range(5):
+        collection.upsert(
+            _articles(*[(f'{batch}-{i}', f'text {batch} {i}') for i in range(3)]), embedder
+        )
+    collection.delete(['0-0'])
+
+    assert collection.snapshot > 1
+    snapshots = [name for name in os.listdir(directory) if name.endswith('.npz')]
+    assert snapshots == [f'faq.{collection.snapshot}.npz']
+    _assert_same(KnowledgeBaseCollection.load(directory, 'faq'), collection)
+
+
+def test_torn_log_writes_are_skipped(tmp_path):
+    directory = str(tmp_path)
+    embedder = HashEmbedder()
+    collection = KnowledgeBaseCollection('faq', DIMENSION, directory=directory)
+    collection.save()
+    collection.upsert(_articles(('a', 'alpha')), embedder)
+
+    with open(os.path.join(directory, 'faq.log.f32'), 'ab') as f:
+        f.write(b'\0' * 6)
+    with open(os.path.join(directory, 'faq.log.jsonl'), 'ab') as f:
+        f.write(b'{"id": "b", "content": "be')
+
+    loaded = KnowledgeBaseCollection.load(directory, 'faq')
+    assert loaded.contents == {'a': 'alpha'}
+
+    loaded.upsert(_articles(('c', 'gamma')), embedder)
+    reloaded = KnowledgeBaseCollection.load(directory, 'faq')
+    assert reloaded.contents == {'a': 'alpha', 'c': 'gamma'}
+    _assert_same(reloaded, loaded)
+
+
+def test_quantized_collection_round_trip(tmp_path):
+    directory = str(tmp_path)
+    embedder = HashEmbedder()
+    collection = KnowledgeBaseCollection(
+        'faq', DIMENSION, index_kind='quantized',
+        index_options={'storage': 'int8', 'min_train_size': 8}, directory=directory
+    )
+    collection.save()
+    collection.upsert(_articles(*[(str(i), f'article {i}') for i in range(20)]), embedder)
+
+    loaded = KnowledgeBaseCollection.load(directory, 'faq')
+    assert loaded.index_kind == 'quantized'
+    assert loaded.index_options == {'storage': 'int8', 'min_train_size': 8}
+    _assert_same(loaded, collection)
+
+
+def test_remove_files(tmp_path):
+    directory = str(tmp_path)
+    collection = KnowledgeBaseCollection('faq', DIMENSION, directory=directory)
+    collection.save()
+    collection.upsert(_articles(('a', 'alpha')), HashEmbedder())
+    collection.remove_files()
+    assert os.listdir(directory) == []
@@ -0,0 +1,118 @@
+"""
+Tests for the lead vector store and its snapshot + log persistence
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from lumina.agents.lead_store import LeadVectorStore, connected_components
+from lumina.ai.vector_index import normalize_rows
+
+DIMENSION = 8
+
+
+def _vectors(count: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((count, DIMENSION)).astype(np.float32)
+
+
+def _assert_same_contents(store: LeadVectorStore, expected: dict):
+    assert len(store) == len(expected)
+    for lead_id, vector in expected.items():
+        assert lead_id in store
+        np.testing.assert_allclose(
+            store.vector(lead_id), normalize_rows(vector[None])[0], rtol=1e-6
+        )
+
+
+def test_replay_after_compaction(tmp_path):
+    directory = str(tmp_path)
+    vectors = _vectors(40)
+    store = LeadVectorStore(directory, compact_after=10)
+    expected = {}
+
+    # Enough writes to compact several times, with more logged after the last one
+    for start in range(0, 30, 5):
+        ids = [f'lead-{row}' for row in range(start, start + 5)]
+        store.upsert(ids, vectors[start:start + 5])
+        expected.update(zip(ids, vectors[start:start + 5]))
+    store.upsert(['lead-3'], vectors[30:31])
+    expected['lead-3'] = vectors[30]
+    store.delete(['lead-7', 'lead-25', 'unknown'])
+    del expected['lead-7'], expected['lead-25']
+
+    assert os.path.exists(os.path.join(directory, 'snapshot.npz'))
+    assert os.path.getsize(os.path.join(directory, 'log.jsonl')) > 0
+    _assert_same_contents(LeadVectorStore(directory, compact_after=10), expected)
+
+    store.compact()
+    assert os.path.getsize(os.path.join(directory, 'log.jsonl')) == 0
+    _assert_same_contents(LeadVectorStore(directory), expected)
+
+
+def test_delete_everything_then_reopen(tmp_path):
+    store = LeadVectorStore(str(tmp_path), compact_after=2)
+    store.upsert(['a', 'b', 'c'], _vectors(3))
+    store.delete(['a', 'b', 'c'])
+
+    reopened = LeadVectorStore(str(tmp_path))
+    assert len(reopened) == 0
+    assert reopened.similar(_vectors(1)[0]) == []
+
+
+def test_replay_skips_torn_writes(tmp_path):
+    directory = str(tmp_path)
+    vectors = _vectors(4)
+    store = LeadVectorStore(directory)
+    store.upsert(['a', 'b'], vectors[:2])
+
+    # A crash mid-append leaves half a vector row and half a log line
+    with open(os.path.join(directory, 'log.f32'), 'ab') as f:
+        f.write(vectors[2].tobytes()[:10])
+    with open(os.path.join(directory, 'log.jsonl'), 'ab') as f:
+        f.write(b'{"id": "c", "ro')
+
+    reopened = LeadVectorStore(directory)
+    _assert_same_contents(reopened, {'a': vectors[0], 'b': vectors[1]})
+
+    # Appends after the crash line up again and survive another restart
+    reopened.upsert(['d'], vectors[3:4])
+    _assert_same_contents(
+        LeadVectorStore(directory), {'a': vectors[0], 'b': vectors[1], 'd': vectors[3]}
+    )
+
+
+def test_similar_excludes_the_query_lead():
+    vectors = _vectors(10)
+    store = LeadVectorStore()
+    store.upsert([f'lead-{row}' for row in range(10)], vectors)
+
+    found = store.similar(vectors[4], top_k=3, exclude='lead-4')
+    assert len(found) == 3
+    assert all(row['lead_id'] != 'lead-4' for row in found)
+    assert store.similar(vectors[4], top_k=1)[0]['lead_id'] == 'lead-4'
+
+
+@pytest.mark.parametrize('method', ['exact', 'ivf'])
+def test_duplicate_clusters(method):
+    base = _vectors(50)
+    noise = 0.01 * _vectors(50, seed=1)
+    ids = [f'lead-{row}' for row in range(50)]
+    store = LeadVectorStore(max_block_bytes=1024)
+    # lead-0..2 are near copies of one vector, lead-10/11 of another
+    base[1] = base[0] + noise[1]
+    base[2] = base[0] + noise[2]
+    base[11] = base[10] + noise[11]
+    store.upsert(ids, base)
+
+    result = store.duplicate_clusters(threshold=0.99, method=method, nprobe=4)
+    assert result['leads'] == 50
+    assert sorted(map(sorted, result['clusters'])) == [
+        ['lead-0', 'lead-1', 'lead-2'], ['lead-10', 'lead-11']
+    ]
+
+
+def test_connected_components_merges_chains():
+    labels = connected_components(6, np.array([0, 1, 4]), np.array([1, 2, 5]))
+    assert labels.tolist() == [0, 0, 0, 3, 4, 4]
@@ -0,0 +1,127 @@
+"""
+Tests for the NDJSON streaming helpers
+"""
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from lumina.api.streaming import embed_ndjson, iter_ndjson
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def _collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+def _records(*parts: bytes, max_line_bytes: int = 1024 * 1024) -> list:
+    return asyncio.run(_collect(iter_ndjson(_chunks(*parts), max_line_bytes)))
+
+
+def test_records_split_across_chunks():
+    records = _records(b'{"id": 1, "te', b'xt": "a"}\n{"id"', b': 2}\r\n\n  \n{"id": 3}')
+    assert records == [{'id': 1, 'text': 'a'}, {'id': 2}, {'id': 3}]
+
+
+def test_malformed_lines_are_reported_with_line_numbers():
+    records = _records(b'{"id": 1}\n{oops\n\n[1, 2]\n"text"\n{"id": 2}\n')
+
+    assert records[0] == {'id': 1}
+    assert records[1]['_line'] == 2 and records[1]['_error'].startswith('Invalid JSON')
+    assert records[2] == {'_error': 'Record must be a JSON object', '_line': 4}
+    assert records[3] == {'_error': 'Record must be a JSON object', '_line': 5}
+    assert records[4] == {'id': 2}
+
+
+def test_unterminated_final_line_is_decoded():
+    assert _records(b'{"id": 1}\n{"id"', b': 2}') == [{'id': 1}, {'id': 2}]
+    assert _records(b'{"id": 1}\n{"id"')[1]['_line'] == 2
+
+
+def test_oversized_line_split_across_chunks():
+    big = b'{"text": "' + b'x' * 100 + b'"}\n'
+    with pytest.raises(ValueError, match='line 2 exceeds 64 bytes'):
+        _records(b'{"id": 1}\n', big[:50], big[50:], max_line_bytes=64)
+
+
+@pytest.mark.parametrize('parts', [
+    # Whole line inside one chunk
+    [b'{"id": 1}\n{"text": "' + b'x' * 100 + b'"}\n{"id": 3}\n'],
+    # Buffered tail under the limit, completed by the next chunk
+    [b'{"id": 1}\n{"text": "' + b'x' * 40, b'x' * 60 + b'"}\n'],
+])
+def test_oversized_complete_line(parts):
+    records = []
+
+    async def consume():
+        async for record in iter_ndjson(_chunks(*parts), max_line_bytes=64):
+            records.append(record)
+
+    with pytest.raises(ValueError, match='line 2 exceeds 64 bytes'):
+        asyncio.run(consume())
+    # Records before the oversized line were already delivered
+    assert records == [{'id': 1}]
+
+
+def test_line_at_the_limit_is_accepted():
+    line = b'{"text": "' + b'x' * 52 + b'"}'
+    assert len(line) == 64
+    assert _records(line + b'\n', max_line_bytes=64) == [{'text': 'x' * 52}]
+
+
+def _embed(lines: bytes, **kwargs) -> list:
+    calls = []
+
+    async def embed_chunk(texts):
+        calls.append(len(texts))
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+    output = asyncio.run(_collect(embed_ndjson(iter_ndjson(_chunks(lines)), embed_chunk, **kwargs)))
+    return [json.loads(line) for line in output], calls
+
+
+def test_embed_ndjson_chunks_and_reports_bad_records():
+    body = b''.join(
+        json.dumps({'id': i, 'text': f't{i}'}).encode() + b'\n' for i in range(5)
+    ) + b'{"id": 9}\n{broken\n'
+    lines, calls = _embed(body, chunk_size=2)
+
+    assert calls == [2, 2, 1]
+    # Errors are reported as they are read; the last partial chunk is flushed at the end
+    assert [line['id'] for line in lines[:4]] == ['0', '1', '2', '3']
+    assert lines[4] == {'id': 9, 'error': "Record needs an 'id' and a string 'text'"}
+    assert lines[5]['line'] == 7
+    assert lines[6]['id'] == '4'
+    assert lines[-1] == {
+        'done': True, 'embedded': 5, 'errors': 2, 'last_id': '4', 'resume_found': True
+    }
+
+
+def test_embed_ndjson_resumes_after_an_id():
+    body = b''.join(
+        json.dumps({'id': i, 'text': 't'}).encode() + b'\n' for i in range(5)
+    )
+    lines, _ = _embed(body, resume_after='2')
+    assert [line['id'] for line in lines[:-1]] == ['3', '4']
+    assert lines[-1]['resume_found'] is True
+
+    lines, _ = _embed(body, resume_after='missing')
+    assert lines == [{
+        'done': True, 'embedded': 0, 'errors': 0, 'last_id': None, 'resume_found': False
+    }]
+
+
+def test_oversized_line_ends_the_stream_in_band():
+    body = b'{"id": 1, "text": "a"}\n' + b'{"text": "' + b'x' * (2 * 1024 * 1024) + b'"}\n'
+    lines, _ = _embed(body, chunk_size=1)
+    assert lines[0]['id'] == '1'
+    assert lines[1]['done'] is False
+    assert lines[1]['last_id'] == '1'
+    assert 'line 2 exceeds' in lines[1]['error']
+    assert len(lines) == 2
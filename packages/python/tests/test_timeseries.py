@@ -0,0 +1,101 @@
+"""
+Tests for the incremental time-series accumulator
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lumina.ai.analyzer import DataAnalyzer
+from lumina.ai.timeseries import P2Quantile, TimeSeriesAccumulator
+
+
+def _points(count: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2024-01-01', periods=count, freq='D')
+    values = np.linspace(0, 50, count) + rng.normal(0, 5, count)
+    return [{'date': date.isoformat(), 'value': float(value)} for date, value in zip(dates, values)]
+
+
+def test_matches_batch_analysis():
+    points = _points(120)
+    accumulator = TimeSeriesAccumulator()
+    for start in range(0, 120, 25):
+        accumulator.extend(points[start:start + 25])
+
+    incremental = accumulator.analysis()
+    batch = DataAnalyzer().analyze_time_series(points)
+    assert incremental['total_records'] == batch['total_records']
+    assert incremental['date_range'] == batch['date_range']
+    assert incremental['trend'] == batch['trend']
+    for key in ('mean', 'std', 'min', 'max'):
+        assert incremental['statistics'][key] == pytest.approx(batch['statistics'][key])
+    assert incremental['seasonality'] == pytest.approx(batch['seasonality'])
+
+
+def test_p2_median_tracks_exact_median():
+    values = np.random.default_rng(1).normal(10, 3, 5000)
+    estimator = P2Quantile(0.5)
+    for value in values:
+        estimator.add(float(value))
+    assert estimator.value() == pytest.approx(np.median(values), abs=0.1)
+
+
+def test_timezones_are_normalized_to_utc():
+    accumulator = TimeSeriesAccumulator()
+    accumulator.extend([
+        {'date': '2024-03-01T00:00:00+05:00', 'value': 1},
+        {'date': '2024-03-01T00:00:00', 'value': 2},
+    ])
+    accumulator.add(pd.Timestamp('2024-03-01T09:00:00', tz='America/New_York'), 3)
+
+    assert accumulator.analysis()['date_range'] == {
+        'start': '2024-02-29T19:00:00', 'end': '2024-03-01T14:00:00'
+    }
+    with pytest.raises(ValueError):
+        accumulator.add('2024-03-01T15:00:00+02:00', 4)
+
+
+@pytest.mark.parametrize('value', [float('nan'), float('inf'), '-inf', 'NaN'])
+def test_non_finite_values_are_rejected(value):
+    accumulator = TimeSeriesAccumulator()
+    accumulator.add('2024-01-01', 1.0)
+    with pytest.raises(ValueError):
+        accumulator.add('2024-01-02', value)
+    with pytest.raises(ValueError):
+        accumulator.extend([
+            {'date': '2024-01-03', 'value': 2.0},
+            {'date': '2024-01-04', 'value': value},
+        ])
+
+    # Rejected points leave the state untouched
+    statistics = accumulator.analysis()['statistics']
+    assert accumulator.count == 1
+    assert statistics['mean'] == statistics['median'] == 1.0
+
+
+def test_out_of_order_batches_are_rejected_whole():
+    accumulator = TimeSeriesAccumulator()
+    accumulator.extend(_points(10))
+    with pytest.raises(ValueError):
+        accumulator.extend([{'date': '2030-01-01', 'value': 1}, {'date': '2023-01-01', 'value': 1}])
+    assert accumulator.count == 10
+
+
+@pytest.mark.parametrize('row', [{'value': 1}, {'date': '2024-01-01'}, {'date': None, 'value': 1}])
+def test_malformed_points_raise_value_error(row):
+    with pytest.raises(ValueError):
+        TimeSeriesAccumulator().extend([row])
+
+
+def test_snapshot_restore_continues_the_series():
+    points = _points(60)
+    full = TimeSeriesAccumulator()
+    full.extend(points)
+
+    half = TimeSeriesAccumulator()
+    half.extend(points[:30])
+    restored = TimeSeriesAccumulator.restore(half.snapshot())
+    restored.extend(points[30:])
+
+    assert restored.analysis() == full.analysis()
@@ -0,0 +1,169 @@
+"""
+Tests for the exact, IVF and quantized vector indexes
+"""
+
+import numpy as np
+import pytest
+
+from lumina.ai.vector_index import (
+    STORAGES,
+    ExactIndex,
+    IVFIndex,
+    QuantizedIndex,
+    VectorIndex,
+    create_index,
+    load_index,
+    normalize_rows,
+    recall_report,
+)
+
+DIMENSION = 32
+
+
+def _clustered(count: int, clusters: int = 40, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, DIMENSION))
+    points = centers[rng.integers(clusters, size=count)]
+    return (points + 0.3 * rng.standard_normal((count, DIMENSION))).astype(np.float32)
+
+
+def _ids(count: int) -> list:
+    return [f'doc-{row}' for row in range(count)]
+
+
+INDEXES = [
+    pytest.param(lambda: ExactIndex(DIMENSION), id='exact'),
+    pytest.param(lambda: IVFIndex(DIMENSION, min_train_size=100_000), id='ivf-pending'),
+    pytest.param(lambda: IVFIndex(DIMENSION, min_train_size=64), id='ivf-trained'),
+    pytest.param(lambda: IVFIndex(DIMENSION, nlist=8, nprobe=2), id='ivf-fixed-nlist'),
+] + [
+    pytest.param(
+        lambda storage=storage, rescore=rescore: QuantizedIndex(
+            DIMENSION, storage=storage, rescore=rescore, min_train_size=64
+        ),
+        id=f'quantized-{storage}-rescore{rescore}'
+    )
+    for storage in STORAGES
+    for rescore in (0, 4)
+] + [
+    pytest.param(
+        lambda: QuantizedIndex(DIMENSION, storage='int8', min_train_size=100_000),
+        id='quantized-int8-pending'
+    ),
+]
+
+
+def test_exact_search_matches_brute_force():
+    vectors = _clustered(300)
+    queries = _clustered(10, seed=1)
+    index = ExactIndex(DIMENSION)
+    index.build(_ids(300), vectors)
+
+    scores = normalize_rows(queries) @ normalize_rows(vectors).T
+    for query, row, result in zip(queries, scores, index.search_batch(queries, k=5)):
+        expected = np.argsort(-row)[:5]
+        assert [item_id for item_id, _ in result] == [f'doc-{i}' for i in expected]
+        np.testing.assert_allclose([score for _, score in result], row[expected], rtol=1e-5)
+        assert [item_id for item_id, _ in index.search(query, k=5)] == [
+            item_id for item_id, _ in result
+        ]
+
+
+@pytest.mark.parametrize('make', INDEXES)
+def test_save_load_round_trip(tmp_path, make):
+    vectors = _clustered(500)
+    queries = _clustered(20, seed=1)
+    index = make()
+    index.add(_ids(500), vectors)
+    index.remove(['doc-3', 'doc-250', 'missing'])
+    index.add(['doc-7'], vectors[8:9])
+
+    path = str(tmp_path / 'index.npz')
+    index.save(path)
+    loaded = load_index(path)
+
+    assert type(loaded) is type(index)
+    assert len(loaded) == len(index) == 498
+    assert 'doc-3' not in loaded and 'doc-7' in loaded
+    np.testing.assert_array_equal(loaded.get('doc-7'), index.get('doc-7'))
+    assert loaded.search_batch(queries, k=10) == index.search_batch(queries, k=10)
+
+    # The loaded index keeps accepting writes like the original
+    loaded.add(['new'], vectors[:1])
+    index.add(['new'], vectors[:1])
+    assert loaded.search_batch(queries, k=10) == index.search_batch(queries, k=10)
+
+
+def test_ivf_recall_against_exact():
+    vectors = _clustered(4000)
+    queries = _clustered(100, seed=1)
+    ids = _ids(4000)
+
+    reference = ExactIndex(DIMENSION)
+    reference.build(ids, vectors)
+    index = IVFIndex(DIMENSION, nprobe=8)
+    index.build(ids, vectors)
+
+    report = recall_report(index, reference, queries, k=10)
+    assert index.is_trained
+    assert report['vectors'] == 4000
+    assert report['recall'] >= 0.9
+
+
+def test_ivf_with_every_list_probed_is_exact():
+    vectors = _clustered(1000)
+    queries = _clustered(20, seed=1)
+    reference = ExactIndex(DIMENSION)
+    reference.build(_ids(1000), vectors)
+    index = IVFIndex(DIMENSION, nlist=16, nprobe=16)
+    index.build(_ids(1000), vectors)
+
+    assert recall_report(index, reference, queries, k=10)['recall'] == 1.0
+
+
+def test_ivf_trains_once_enough_rows_arrive():
+    vectors = _clustered(300)
+    index = IVFIndex(DIMENSION, min_train_size=200, retrain_growth=2.0)
+    index.add(_ids(150), vectors[:150])
+    assert not index.is_trained
+
+    index.add(_ids(300)[150:], vectors[150:])
+    assert index.is_trained
+    assert len(index) == 300
+    assert index.search(vectors[42], k=1)[0][0] == 'doc-42'
+
+
+@pytest.mark.parametrize('storage, minimum', [('float16', 0.95), ('int8', 0.95), ('pca', 0.5)])
+def test_quantized_rescoring_recovers_recall(storage, minimum):
+    vectors = _clustered(2000)
+    queries = _clustered(50, seed=1)
+    ids = _ids(2000)
+    reference = ExactIndex(DIMENSION)
+    reference.build(ids, vectors)
+
+    coarse = QuantizedIndex(DIMENSION, storage=storage, pca_dimension=16)
+    coarse.build(ids, vectors)
+    rescored = QuantizedIndex(DIMENSION, storage=storage, pca_dimension=16, rescore=8)
+    rescored.build(ids, vectors)
+
+    coarse_recall = recall_report(coarse, reference, queries)['recall']
+    rescored_recall = recall_report(rescored, reference, queries)['recall']
+    assert rescored_recall >= coarse_recall
+    assert rescored_recall >= minimum
+
+
+def test_create_index_rejects_unknown_kind():
+    assert isinstance(create_index('ivf', DIMENSION, nprobe=4), IVFIndex)
+    with pytest.raises(ValueError):
+        create_index('hnsw', DIMENSION)
+
+
+def test_incomplete_subclass_cannot_be_created():
+    class Partial(VectorIndex):
+        kind = 'partial'
+
+        def __len__(self):
+            return 0
+
+    with pytest.raises(TypeError):
+        Partial(DIMENSION)
@@ -0,0 +1,72 @@
+"""
+Tests for Accept negotiation and the binary embedding wire format
+"""
+
+import numpy as np
+import pytest
+
+from lumina.api.wire import decode_matrix, encode_matrix, negotiate
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, None),
+    ("", None),
+    ("application/json", None),
+    ("*/*", None),
+    ("application/octet-stream", "float32"),
+    ("application/octet-stream; dtype=float16", "float16"),
+    ('application/octet-stream; dtype="int8"', "int8"),
+    ("Application/Octet-Stream; DTYPE=int8", "int8"),
+    # JSON wins ties, whatever the order
+    ("application/octet-stream, application/json", None),
+    ("application/json, application/octet-stream", None),
+    ("application/octet-stream, */*", None),
+    # q-values decide otherwise
+    ("application/json;q=0.5, application/octet-stream", "float32"),
+    ("application/octet-stream;q=0.9, application/json;q=0.8", "float32"),
+    ("application/octet-stream;q=0.5, application/json", None),
+    ("application/octet-stream;dtype=int8, application/*;q=0.1", "int8"),
+    ("application/octet-stream;q=0", None),
+    ("application/octet-stream;q=0, application/json;q=0", None),
+    # The highest-weighted binary entry supplies the dtype
+    (
+        "application/octet-stream;dtype=int8;q=0.4, application/octet-stream;dtype=float16",
+        "float16",
+    ),
+    # Malformed q counts as 1 and out-of-range q is clamped
+    ("application/octet-stream;q=abc, application/json;q=0.9", "float32"),
+    ("application/octet-stream;q=7, application/json", None),
+    ("text/html, application/octet-stream;dtype=float16", "float16"),
+])
+def test_negotiate(accept, expected):
+    assert negotiate(accept) == expected
+
+
+def test_negotiate_rejects_unknown_dtype():
+    with pytest.raises(ValueError):
+        negotiate("application/octet-stream; dtype=float64")
+
+
+def test_negotiate_ignores_unknown_dtype_when_json_wins():
+    assert negotiate("application/octet-stream;dtype=float64;q=0.1, application/json") is None
+
+
+@pytest.mark.parametrize("dtype, tolerance", [("float32", 0), ("float16", 1e-3), ("int8", 1e-2)])
+def test_matrix_round_trip(dtype, tolerance):
+    matrix = np.random.default_rng(0).uniform(-1, 1, (5, 8)).astype(np.float32)
+    matrix[2] = 0.0
+    body, headers = encode_matrix(matrix, dtype)
+    assert headers["X-Embedding-Shape"] == "5,8"
+
+    content_type = f"application/octet-stream; dtype={headers['X-Embedding-Dtype']}"
+    decoded = decode_matrix(body, content_type, headers["X-Embedding-Shape"])
+    assert decoded.dtype == np.float32
+    np.testing.assert_allclose(decoded, matrix, atol=tolerance)
+
+
+def test_decode_rejects_wrong_length_and_shape():
+    body, _ = encode_matrix(np.zeros((2, 3)), "float32")
+    with pytest.raises(ValueError):
+        decode_matrix(body[:-1], "application/octet-stream", "2,3")
+    with pytest.raises(ValueError):
+        decode_matrix(body, "application/octet-stream", "2x3")